@@ -0,0 +1,266 @@
+"""
+Analytics Module for HALog
+Rolling statistics, trends and anomaly scores of parameter series
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from core.pyramid import MINUTE
+
+try:
+    import numba
+except ImportError:
+    # Optional: without it EWMA runs as a blockwise numpy recurrence
+    numba = None
+
+# Default span of the trailing window of rolling statistics (nanoseconds)
+ROLLING_WINDOW = 60 * MINUTE
+
+# Default half-life of the exponentially weighted moving average (nanoseconds)
+EWMA_HALFLIFE = 15 * MINUTE
+
+# Most decay, in natural-log units of weight, spanned by one vectorised block of
+# the numpy EWMA; keeps the weights of the block and their inverses in float64 range
+EWMA_BLOCK_DECAY = 500.0
+
+# Residual scores above this are conventionally treated as outliers
+ANOMALY_THRESHOLD = 3.5
+
+# Anomaly scoring methods accepted by anomaly_scores
+ANOMALY_METHODS = ('residual', 'isolation_forest')
+
+# Scale of the median absolute deviation to the standard deviation of normal data
+MAD_SCALE = 1.4826
+
+# Trailing-window mean and standard deviation of each row, and the rows in its window
+RollingStats = namedtuple('RollingStats', ['mean', 'std', 'rows'])
+
+# Per-row analytics of one parameter, all arrays aligned with timestamps
+ParameterAnalytics = namedtuple('ParameterAnalytics', ['parameter', 'timestamps', 'mean', 'std',
+                                                       'ewma', 'zscore', 'score'])
+
+def rolling_stats(series, window=ROLLING_WINDOW):
+    """
+    Mean and standard deviation of the row averages in a trailing time window
+    
+    Each row's window holds the rows stamped after its time minus window, up
+    to and including itself, so irregular sampling is handled. Windows are
+    found by binary search and summed with prefix sums, which takes O(n)
+    however long the window is.
+    
+    Args:
+        series (ParameterSeries): Time-sorted rows of one parameter
+        window (int): Window length in nanoseconds
+        
+    Returns:
+        RollingStats: Per-row mean, sample standard deviation (NaN for windows
+        of one row) and row count
+    """
+    values = np.asarray(series.avg, dtype=np.float64)
+    timestamps = np.asarray(series.timestamps)
+    if len(values) == 0:
+        return RollingStats(np.empty(0), np.empty(0), np.empty(0, dtype=np.int64))
+        
+    # Centre the values first so the prefix sums of squares keep their precision
+    centred = values - values.mean()
+    sums = np.concatenate(([0.0], np.cumsum(centred)))
+    squares = np.concatenate(([0.0], np.cumsum(centred * centred)))
+    
+    stops = np.arange(1, len(values) + 1)
+    starts = np.searchsorted(timestamps, timestamps - window, side='right')
+    rows = stops - starts
+    
+    total = sums[stops] - sums[starts]
+    mean = total / rows
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = (squares[stops] - squares[starts] - total * mean) / (rows - 1)
+    std = np.sqrt(np.maximum(variance, 0.0))
+    std[rows < 2] = np.nan
+    
+    return RollingStats(mean + values.mean(), std, rows)
+
+def rolling_zscores(series, window=ROLLING_WINDOW, stats=None):
+    """
+    Deviation of each row average from its trailing window, in standard deviations
+    
+    Args:
+        series (ParameterSeries): Time-sorted rows of one parameter
+        window (int): Window length in nanoseconds
+        stats (RollingStats): Rolling statistics already computed for window
+        
+    Returns:
+        numpy.ndarray: Z-score per row; 0 where the window has no spread
+    """
+    if stats is None:
+        stats = rolling_stats(series, window)
+    values = np.asarray(series.avg, dtype=np.float64)
+    spread = np.isfinite(stats.std) & (stats.std > 0)
+    return np.divide(values - stats.mean, stats.std, out=np.zeros(len(values)), where=spread)
+
+def ewma(series, halflife=EWMA_HALFLIFE):
+    """
+    Exponentially weighted moving average of the row averages
+    
+    The weight of a row halves every halflife of log time, so gaps in the
+    log decay the average as much as the rows they replace would have. Runs
+    as a compiled loop when numba is installed, otherwise as blocks of
+    vectorised numpy; both give the same result.
+    
+    Args:
+        series (ParameterSeries): Time-sorted rows of one parameter
+        halflife (int): Half-life in nanoseconds
+        
+    Returns:
+        numpy.ndarray: Smoothed value per row
+    """
+    values = np.asarray(series.avg, dtype=np.float64)
+    timestamps = np.asarray(series.timestamps)
+    if numba is not None:
+        return _ewma_kernel(values, timestamps, float(halflife))
+    return _ewma_blocks(values, timestamps, float(halflife))
+
+def anomaly_scores(series, method='residual', window=ROLLING_WINDOW, halflife=EWMA_HALFLIFE,
+                   stats=None, smoothed=None):
+    """
+    Score how unusual each row of a parameter is
+    
+    'residual' compares each row average with the EWMA of the rows before it
+    and scales the error by the robust spread (median absolute deviation) of
+    all errors, so a score is roughly a z-score that the outliers themselves
+    cannot inflate; ANOMALY_THRESHOLD is the usual cut-off.
+    
+    'isolation_forest' fits scikit-learn's IsolationForest to the row average,
+    min-max range, rolling z-score and EWMA error of every row, and scores
+    rows between 0 and 1 (above about 0.6 is unusual).
+    
+    Args:
+        series (ParameterSeries): Time-sorted rows of one parameter
+        method (str): One of ANOMALY_METHODS
+        window (int): Rolling window in nanoseconds (isolation_forest features)
+        halflife (int): EWMA half-life in nanoseconds
+        stats (RollingStats): Rolling statistics already computed for window
+        smoothed (numpy.ndarray): EWMA already computed for halflife
+        
+    Returns:
+        numpy.ndarray: Score per row, higher is more unusual
+        
+    Raises:
+        ValueError: If the method is unknown
+        ImportError: If isolation_forest is chosen without scikit-learn
+    """
+    if method not in ANOMALY_METHODS:
+        raise ValueError(f"Unknown anomaly method {method!r}, expected one of {', '.join(ANOMALY_METHODS)}")
+        
+    values = np.asarray(series.avg, dtype=np.float64)
+    if len(values) == 0:
+        return np.empty(0)
+        
+    if smoothed is None:
+        smoothed = ewma(series, halflife)
+    # One step ahead: each row against the average of the rows before it
+    errors = values - np.concatenate(([values[0]], smoothed[:-1]))
+    
+    if method == 'residual':
+        return _robust_scores(errors)
+        
+    from sklearn.ensemble import IsolationForest
+    
+    features = np.column_stack((
+        values,
+        np.asarray(series.max, dtype=np.float64) - np.asarray(series.min, dtype=np.float64),
+        rolling_zscores(series, window, stats),
+        errors
+    ))
+    forest = IsolationForest(n_estimators=100, random_state=0).fit(features)
+    return -forest.score_samples(features)
+
+def analyze_series(series, window=ROLLING_WINDOW, halflife=EWMA_HALFLIFE, method='residual'):
+    """
+    Rolling statistics, EWMA, z-scores and anomaly scores of one parameter
+    
+    Args:
+        series (ParameterSeries): Time-sorted rows of one parameter
+        window (int): Rolling window in nanoseconds
+        halflife (int): EWMA half-life in nanoseconds
+        method (str): Anomaly scoring method, one of ANOMALY_METHODS
+        
+    Returns:
+        ParameterAnalytics: Per-row results aligned with series.timestamps
+    """
+    stats = rolling_stats(series, window)
+    smoothed = ewma(series, halflife)
+    return ParameterAnalytics(
+        series.parameter,
+        series.timestamps,
+        stats.mean,
+        stats.std,
+        smoothed,
+        rolling_zscores(series, window, stats),
+        anomaly_scores(series, method, window, halflife, stats, smoothed)
+    )
+
+def analyze_dataset(dataset, window=ROLLING_WINDOW, halflife=EWMA_HALFLIFE, method='residual'):
+    """Run analyze_series on every parameter of a dataset, in parameter order"""
+    return [analyze_series(dataset.series(parameter), window, halflife, method)
+            for parameter in dataset.parameters]
+
+def _robust_scores(errors):
+    """Absolute deviation of each error from their median, in robust standard deviations"""
+    deviations = np.abs(errors - np.median(errors))
+    scale = MAD_SCALE * np.median(deviations)
+    if scale == 0:
+        # Over half the errors are identical; fall back to the mean deviation
+        scale = 1.2533 * deviations.mean()
+    if scale == 0:
+        return np.zeros(len(errors))
+    return deviations / scale
+
+def _ewma_kernel(values, timestamps, halflife):
+    """Time-decayed EWMA as a plain loop, compiled by numba when it is installed"""
+    smoothed = np.empty(len(values))
+    if len(values) == 0:
+        return smoothed
+    decay = np.log(2.0) / halflife
+    level = values[0]
+    smoothed[0] = level
+    for i in range(1, len(values)):
+        alpha = 1.0 - np.exp(-decay * (timestamps[i] - timestamps[i - 1]))
+        level += alpha * (values[i] - level)
+        smoothed[i] = level
+    return smoothed
+
+def _ewma_blocks(values, timestamps, halflife):
+    """
+    Time-decayed EWMA of _ewma_kernel, vectorised over blocks of rows
+    
+    After row s, level_i = w_i * (level_s + sum of alpha_j * x_j / w_j over
+    rows s+1..i), with w_i = exp(-decay * (t_i - t_s)), so a block is one
+    cumulative sum. Blocks span at most EWMA_BLOCK_DECAY of decay, so w and
+    1 / w stay representable; a longer gap between two rows is one step.
+    """
+    smoothed = np.empty(len(values))
+    if len(values) == 0:
+        return smoothed
+    decay = np.log(2.0) / halflife
+    alphas = -np.expm1(-decay * np.diff(timestamps))
+    span = int(EWMA_BLOCK_DECAY / decay)
+    smoothed[0] = values[0]
+    
+    start = 0  # Last row whose level is known
+    while start < len(values) - 1:
+        stop = int(np.searchsorted(timestamps, timestamps[start] + span, side='right'))
+        if stop == start + 1:
+            smoothed[stop] = smoothed[start] + alphas[start] * (values[stop] - smoothed[start])
+            start = stop
+            continue
+            
+        rows = slice(start + 1, stop)
+        weights = np.exp(-decay * (timestamps[rows] - timestamps[start]))
+        smoothed[rows] = weights * (smoothed[start] + np.cumsum(alphas[start:stop - 1] * values[rows] / weights))
+        start = stop - 1
+    return smoothed
+
+if numba is not None:
+    _ewma_kernel = numba.njit(cache=True, nogil=True)(_ewma_kernel)
\ No newline at end of file
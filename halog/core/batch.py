@@ -0,0 +1,250 @@
+"""
+Batch Processing Module for HALog
+Non-interactive summaries and plots for many log files at once
+"""
+
+import csv
+import glob
+import json
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from core.data_processor import DataProcessor
+from core.file_handler import FileHandler
+from core.parse_cache import ParseCache
+from core.report import REPORT_TITLE, PdfReport, report_pages, save_png_set
+
+# Column order of summary.csv: one row per file and parameter
+SUMMARY_FIELDS = ['file', 'bytes', 'seconds', 'error', 'plot_error', 'parameter', 'records', 'samples',
+                  'start', 'end', 'min', 'max', 'mean']
+
+# Outcome of run_batch: per-file results in input order, wall-clock seconds
+# and the summary files written
+BatchReport = namedtuple('BatchReport', ['results', 'seconds', 'outputs'])
+
+def expand_inputs(inputs, extensions=None):
+    """
+    Resolve files, glob patterns and directories into log file paths
+    
+    Directories are searched recursively for supported extensions; files
+    and patterns are taken as given. Paths are returned sorted and without
+    duplicates, so repeated runs process files in the same order.
+    
+    Args:
+        inputs (iterable): File paths, glob patterns or directories
+        extensions (iterable): Extensions to collect from directories
+            (default: those accepted by FileHandler)
+            
+    Returns:
+        list: Absolute paths of the files to process
+    """
+    extensions = tuple(extensions or FileHandler().supported_extensions)
+    paths = set()
+    
+    for item in inputs:
+        matches = glob.glob(item, recursive=True) if glob.has_magic(item) else [item]
+        for match in matches:
+            if os.path.isdir(match):
+                for root, _, names in os.walk(match):
+                    paths.update(os.path.join(root, name) for name in names
+                                 if os.path.splitext(name)[1].lower() in extensions)
+            elif os.path.isfile(match):
+                paths.add(match)
+                
+    return sorted(os.path.abspath(path) for path in paths)
+
+def summarize_dataset(dataset):
+    """
+    Summary statistics of every parameter in a dataset
+    
+    Args:
+        dataset (LogDataset): Processed log data
+        
+    Returns:
+        list: One dict per parameter with records, samples, start, end,
+        min, max and the sample-weighted mean
+    """
+    summaries = []
+    for parameter in dataset.parameters:
+        series = dataset.series(parameter)
+        if len(series.timestamps) == 0:
+            continue
+            
+        counts = series.count.astype(np.float64)
+        samples = counts.sum()
+        mean = np.dot(series.avg, counts) / samples if samples else float(series.avg.mean())
+        
+        summaries.append({
+            'parameter': parameter,
+            'records': len(series.timestamps),
+            'samples': int(samples),
+            'start': pd.Timestamp(series.timestamps[0]).isoformat(),
+            'end': pd.Timestamp(series.timestamps[-1]).isoformat(),
+            'min': _shortest(series.min.min()),
+            'max': _shortest(series.max.max()),
+            'mean': round(float(mean), 6)
+        })
+    return summaries
+
+def _shortest(value):
+    """Shortest decimal float that reads back as the same float32 value"""
+    return float(str(np.float32(value)))
+
+def process_batch_file(file_path, use_cache=True, cache_dir=None, plot_format=None, output_stem=None):
+    """
+    Ingest one file, summarize it and optionally plot it
+    
+    Runs in a worker process, so failures are returned rather than raised.
+    PNG plots are rendered here, on the worker's own report figure; PDF pages
+    are returned as decimated line data for the parent to write in order. A
+    plot that fails is recorded in plot_error and keeps the file's statistics.
+    
+    Args:
+        file_path (str): Path to the log file
+        use_cache (bool): Read and write the parse cache
+        cache_dir (str): Parse cache directory (default: ParseCache default)
+        plot_format (str): 'png', 'pdf' or None for no plots
+        output_stem (str): Path prefix of PNG plots
+        
+    Returns:
+        dict: file, bytes, seconds, error (None on success), plot_error
+        (None if every plot was written), parameters (see summarize_dataset),
+        plots (PNG paths) and, for PDF, pages (see report_pages)
+    """
+    started = time.perf_counter()
+    result = {'file': file_path, 'bytes': 0, 'seconds': 0.0, 'error': None, 'plot_error': None,
+              'parameters': [], 'plots': []}
+    if plot_format == 'pdf':
+        result['pages'] = []
+    
+    try:
+        result['bytes'] = os.path.getsize(file_path)
+        processor = DataProcessor(cache=ParseCache(cache_dir) if use_cache else None)
+        dataset = processor.ingest(file_path, file_handler=FileHandler(), sample_fallback=False).dataset
+        
+        result['parameters'] = summarize_dataset(dataset)
+    except Exception as e:
+        # Any failure, including a parser error, belongs to this file only
+        result['error'] = str(e)
+    else:
+        try:
+            if plot_format == 'png':
+                plot_errors = []
+                result['plots'] = save_png_set(dataset, output_stem, errors=plot_errors)
+                result['plot_error'] = "; ".join(plot_errors) or None
+            elif plot_format == 'pdf':
+                result['pages'] = report_pages(dataset, f"{REPORT_TITLE} ({os.path.basename(file_path)})")
+        except Exception as e:
+            result['plot_error'] = str(e)
+            
+    result['seconds'] = round(time.perf_counter() - started, 6)
+    return result
+
+def output_stems(file_paths, output_dir):
+    """
+    Plot path prefixes in output_dir, one per file
+    
+    Files sharing a base name get numbered prefixes so their plots do not
+    overwrite each other.
+    """
+    stems = []
+    used = set()
+    for file_path in file_paths:
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        candidate, number = name, 2
+        while candidate in used:
+            candidate, number = f"{name}_{number}", number + 1
+        used.add(candidate)
+        stems.append(os.path.join(output_dir, candidate))
+    return stems
+
+def run_batch(inputs, output_dir, workers=1, use_cache=True, cache_dir=None, plot_format='png',
+              formats=('json', 'csv'), progress_callback=None):
+    """
+    Process many log files and write their summaries to output_dir
+    
+    Args:
+        inputs (iterable): File paths, glob patterns or directories
+        output_dir (str): Directory for summary.json, summary.csv and plots
+        workers (int): Files processed in parallel (1 processes in-line)
+        use_cache (bool): Read and write the parse cache
+        cache_dir (str): Parse cache directory (default: ParseCache default)
+        plot_format (str): 'png' for one image per file and parameter, 'pdf'
+            for a single report.pdf, or None for no plots
+        formats (iterable): Summary formats to write: 'json' and/or 'csv'
+        progress_callback (callable): Called with each file result as it finishes
+        
+    Returns:
+        BatchReport: Results in input order, seconds taken and output paths
+    """
+    started = time.perf_counter()
+    file_paths = expand_inputs(inputs)
+    os.makedirs(output_dir, exist_ok=True)
+    
+    stems = output_stems(file_paths, output_dir) if plot_format == 'png' else [None] * len(file_paths)
+    jobs = [(file_path, use_cache, cache_dir, plot_format, stem) for file_path, stem in zip(file_paths, stems)]
+    results = [None] * len(jobs)
+    
+    outputs = []
+    pdf = PdfReport(os.path.join(output_dir, 'report.pdf')) if plot_format == 'pdf' and jobs else None
+    written = 0  # Leading results whose PDF pages are written
+    
+    try:
+        for index, result in _run_jobs(jobs, workers):
+            results[index] = result
+            if progress_callback:
+                progress_callback(result)
+                
+            # PDF pages follow input order whatever order files finish in
+            while written < len(results) and results[written] is not None:
+                if pdf is not None:
+                    pdf.add_pages(results[written].pop('pages'))
+                written += 1
+    finally:
+        if pdf is not None:
+            pdf.close()
+            outputs.append(pdf.output_file)
+            
+    
+    if 'json' in formats:
+        outputs.append(write_summary_json(results, os.path.join(output_dir, 'summary.json')))
+    if 'csv' in formats:
+        outputs.append(write_summary_csv(results, os.path.join(output_dir, 'summary.csv')))
+        
+    return BatchReport(results, time.perf_counter() - started, outputs)
+
+def _run_jobs(jobs, workers):
+    """Yield (index, result) of process_batch_file jobs as they finish"""
+    if workers > 1 and len(jobs) > 1:
+        # Spawn keeps workers independent of GUI threads and matches Windows behaviour
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=context) as pool:
+            futures = {pool.submit(process_batch_file, *job): index for index, job in enumerate(jobs)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+    else:
+        for index, job in enumerate(jobs):
+            yield index, process_batch_file(*job)
+            
+def write_summary_json(results, output_file):
+    """Write batch results as a JSON list; returns output_file"""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    return output_file
+
+def write_summary_csv(results, output_file):
+    """Write batch results with one row per file and parameter; returns output_file"""
+    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        for result in results:
+            file_fields = {key: result[key] for key in ('file', 'bytes', 'seconds', 'error', 'plot_error')}
+            for summary in result['parameters'] or [{}]:
+                writer.writerow({**file_fields, **summary})
+    return output_file
\ No newline at end of file
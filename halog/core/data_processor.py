@@ -5,14 +5,90 @@ Handles parsing and processing of LINAC log files
 
 import pandas as pd
 import numpy as np
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+import hashlib
+import multiprocessing
 import re
 import os
+import time
+import traceback
+import warnings
+
+from core.dataset import LogDataset
+from core.file_handler import BufferReader, MappedFile
+from core.progress import LoadCancelled
+from core.summary import StreamingSummary
+from core.timing import StageTimer
+
+# Default read budget for streaming ingest (bytes per block)
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+
+# Line-oriented formats that can be split into blocks and parsed independently
+BLOCK_FORMATS = ('timestamp_stats', 'detailed_log')
+
+# Partial results while parsing: the first after one block, then at most one
+# per PARTIAL_INTERVAL seconds, and never more often than every
+# PARTIAL_COST_RATIO times the seconds the previous one took to build
+PARTIAL_INTERVAL = 1.0
+PARTIAL_COST_RATIO = 4
+
+# Bytes hashed at the start and end of a parsed region to recognise appends
+APPEND_CHECK_SIZE = 64 * 1024
+
+# What load_dataset remembers to resume a log that is only appended to:
+# the result for bytes [0, offset), its summary (kept in memory only) and
+# checksums of that region's edges
+ParseState = namedtuple('ParseState', ['file_format', 'offset', 'mtime_ns', 'head_checksum', 'tail_checksum',
+                                       'dataset', 'summary'], defaults=(None,))
+
+# Outcome of DataProcessor.ingest: file_format is None for a cache hit
+IngestResult = namedtuple('IngestResult', ['dataset', 'file_format', 'timings', 'summary'])
+
+# Fixed timestamp layout shared by the line-oriented log formats
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Whitespace separated fields of a timestamp_stats line
+TIMESTAMP_STATS_FIELDS = ['date', 'time', 'parameter', 'count', 'min', 'max', 'avg']
+
+# Per-line pattern used when a block cannot be tokenized in bulk
+TIMESTAMP_STATS_PATTERN = re.compile(
+    r'(\d{4}-\d{2}-\d{2})\s+(\d{2}:\d{2}:\d{2})\s+(\w+)\s+(\d+)\s+(\d+\.\d+)\s+(\d+\.\d+)\s+(\d+\.\d+)'
+)
+
+# Full-token patterns used to validate bulk tokenized columns
+TIMESTAMP_STATS_TOKENS = {
+    'date': re.compile(r'\d{4}-\d{2}-\d{2}'),
+    'time': re.compile(r'\d{2}:\d{2}:\d{2}'),
+    'parameter': re.compile(r'\w+'),
+    'count': re.compile(r'\d+'),
+    'min': re.compile(r'\d+\.\d+'),
+    'max': re.compile(r'\d+\.\d+'),
+    'avg': re.compile(r'\d+\.\d+'),
+}
+
+# Per-line pattern of the detailed_log format
+DETAILED_LOG_PATTERN = re.compile(r'\[([^\]]+)\]\s*([^:]+):\s*([0-9.]+)')
+
+# DETAILED_LOG_PATTERN for a whole raw block: anchored at every line start
+# (after \n, \r\n or bare \r) and never matching across a line break
+DETAILED_LOG_LINES = re.compile(
+    rb'(?:^|(?<=\r))[ \t\f\v]*\[([^\]\r\n]+)\][ \t\f\v]*([^:\r\n]+):[ \t\f\v]*([0-9.]+)', re.MULTILINE
+)
 
 class DataProcessor:
     """Processes LINAC log files and extracts statistical data"""
     
-    def __init__(self):
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, workers=1, value_columns=None, cache=None, cancel_token=None):
+        self.chunk_size = chunk_size        # Bytes read and parsed per block
+        self.workers = workers              # Worker processes for block parsing (1 = serial)
+        self.value_columns = value_columns  # CSV value columns (None = detect by name)
+        self.cache = cache                  # Optional ParseCache used by load_dataset
+        self.cancel_token = cancel_token    # Optional CancelToken checked between blocks
+        self.parse_states = {}              # ParseState per absolute path, for append-only re-parsing
+        self._mapped = None                 # Map shared by the steps of open_file
         self.supported_formats = [
             'timestamp_stats',  # Format: YYYY-MM-DD HH:MM:SS parameter count min max avg
             'simple_csv',       # Format: timestamp,parameter,value
@@ -25,7 +101,8 @@ class DataProcessor:
         
         Args:
             file_path (str): Path to the log file
-            progress_callback (callable): Optional callback for progress updates
+            progress_callback (callable): Optional callback for progress updates,
+                called with (bytes_done, total_bytes)
             
         Returns:
             pandas.DataFrame: Processed data with min, max, avg columns
@@ -33,33 +110,324 @@ class DataProcessor:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
             
-        # Determine file format
-        file_format = self.detect_format(file_path)
+        # Read every step through one map of the file
+        with self.open_file(file_path) as mapped:
+            size = mapped.size
+            
+            # Determine file format
+            file_format = self.detect_format(file_path)
+            
+            if progress_callback:
+                progress_callback(0, size)
+                
+            # Process based on detected format
+            if file_format == 'timestamp_stats':
+                data = self.process_timestamp_stats(file_path, progress_callback)
+            elif file_format == 'simple_csv':
+                data = self.process_simple_csv(file_path, progress_callback)
+            elif file_format == 'detailed_log':
+                data = self.process_detailed_log(file_path, progress_callback)
+            else:
+                # Fallback: try to create sample data for demonstration
+                data = self.create_sample_data()
+                
+        if progress_callback:
+            progress_callback(size, size)
+            
+        return data
+        
+    def load_dataset(self, file_path, progress_callback=None):
+        """
+        Process a LINAC log file into the compact multi-parameter model
+        
+        Unlike process_file, the parameter and sample count of every record
+        are kept, so each parameter can be analysed separately. See ingest
+        for caching and incremental loading.
+        
+        Args:
+            file_path (str): Path to the log file
+            progress_callback (callable): Optional callback for progress updates,
+                called with (bytes_done, total_bytes)
+            
+        Returns:
+            LogDataset: Statistics per parameter (sample data if nothing was parsed)
+        """
+        return self.ingest(file_path, progress_callback).dataset
+        
+    def ingest(self, file_path, progress_callback=None, file_handler=None, sample_fallback=True, partial_callback=None):
+        """
+        Validate, detect and parse a file through a single open handle
+        
+        The file is mapped once and every stage reads from that map. Only
+        worker processes (workers > 1) map the file again on their own.
+        
+        When a ParseCache is configured, an unchanged file is loaded from the
+        cache. A line-oriented log that has only grown since it was last
+        loaded (by this processor, or by any processor through the cache) is
+        resumed: just the appended bytes are parsed and merged into the
+        previous result. A truncated, rotated or rewritten file is parsed in
+        full.
+        
+        Summary statistics are accumulated block by block while parsing (see
+        core.summary), so they are ready with the dataset. A cache hit or
+        sample data is summarized from the dataset instead.
+        
+        Args:
+            file_path (str): Path to the log file
+            progress_callback (callable): Optional callback for progress updates,
+                called with (bytes_done, total_bytes) of the bytes to parse
+            file_handler (FileHandler): Validates the open file first when given
+            sample_fallback (bool): Return sample data for a file without
+                records instead of raising ValueError
+            partial_callback (callable): Optional callback given a LogDataset
+                of the records parsed so far, about once a second while a
+                line-oriented file is parsed; the final dataset is only returned
+                
+        Returns:
+            IngestResult: Dataset, detected format, seconds spent per stage
+            and the StreamingSummary of the dataset
+            
+        Raises:
+            ValueError: If file_handler rejects the file, or the file holds no
+                records and sample_fallback is off
+            LoadCancelled: If the processor's cancel_token was cancelled; no
+                partial result is cached
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+            
+        timer = StageTimer()
         
+        # The map is a snapshot: bytes appended while parsing are left for the next load
+        with self.open_file(file_path) as mapped:
+            size = mapped.size
+            timer.lap('open')
+            
+            if file_handler is not None:
+                is_valid, message = file_handler.validate_mapped(mapped)
+                timer.lap('validate')
+                if not is_valid:
+                    raise ValueError(f"File validation failed: {message}")
+                    
+            settings = {'value_columns': self.value_columns}
+            identity = self.cache.file_identity(file_path, settings, mapped) if self.cache else None
+            dataset = self.cache.load(file_path, identity) if self.cache else None
+            state = self.find_parse_state(file_path, identity) if dataset is None else None
+            timer.lap('cache')
+            
+            if dataset is not None:
+                summary = StreamingSummary.from_dataset(dataset)
+                if progress_callback:
+                    progress_callback(size, size)
+                return IngestResult(dataset, None, timer.timings, summary)
+                
+            self.check_cancelled()
+            if state is not None and self.is_appended(file_path, state, size):
+                file_format = state.file_format
+                timer.lap('detect')
+                if progress_callback:
+                    progress_callback(0, size - state.offset)
+                    
+                on_parts = None
+                if partial_callback:
+                    def on_parts(parts):
+                        partial_callback(self.merge_datasets(file_format, [state.dataset] + [LogDataset.from_records(part) for part in parts]))
+                        
+                # Copied, so a cancelled resume leaves the state's summary as it was
+                summary = state.summary.copy() if state.summary is not None else StreamingSummary.from_dataset(state.dataset)
+                parts = self.parse_records(file_path, file_format, progress_callback, state.offset, size, on_parts, summary)
+                dataset = self.merge_datasets(file_format, [state.dataset] + [LogDataset.from_records(part) for part in parts])
+                if len(dataset) < len(state.dataset) + sum(len(part) for part in parts):
+                    # Records straddling the resume point were merged into one
+                    summary = StreamingSummary.from_dataset(dataset)
+            else:
+                file_format = self.detect_format(file_path)
+                timer.lap('detect')
+                
+                if progress_callback:
+                    progress_callback(0, size)
+                    
+                on_parts = None
+                if partial_callback:
+                    def on_parts(parts):
+                        if parts:
+                            partial_callback(LogDataset.concat(LogDataset.from_records(part) for part in parts))
+                            
+                summary = StreamingSummary()
+                parts = self.parse_records(file_path, file_format, progress_callback, end=size,
+                                           partial_callback=on_parts, summary=summary)
+                dataset = LogDataset.concat(LogDataset.from_records(part) for part in parts) if parts else None
+            timer.lap('parse')
+            
+            # Last chance to stop before the result is cached
+            self.check_cancelled()
+            if dataset is not None:
+                state = self.record_parse_state(file_path, file_format, size, dataset, summary)
+                if self.cache:
+                    self.cache.store(file_path, dataset, identity,
+                                     state and state._replace(dataset=None, summary=None)._asdict())
+                timer.lap('store')
+            elif sample_fallback:
+                dataset = LogDataset.from_records(self.create_sample_data(), default_parameter='sample')
+                summary = StreamingSummary.from_dataset(dataset)
+            else:
+                raise ValueError(f"No records found in {os.path.basename(file_path)}")
+                
         if progress_callback:
-            progress_callback(10)
+            progress_callback(size, size)
+            
+        return IngestResult(dataset, file_format, timer.timings, summary)
+        
+    def check_cancelled(self):
+        """Raise LoadCancelled if the processor's cancel_token was cancelled"""
+        if self.cancel_token is not None:
+            self.cancel_token.check()
             
-        # Process based on detected format
+    @contextmanager
+    def open_file(self, file_path):
+        """
+        Keep one read-only map of a file open for every step that reads it
+        
+        Inside the block, detection, partitioning, parsing and the cache use
+        this map instead of reopening the file. Nested calls for the same
+        file share it.
+        
+        Yields:
+            MappedFile: The shared map
+        """
+        if self._mapped is not None and self._mapped.file_path == file_path:
+            yield self._mapped
+            return
+            
+        previous = self._mapped
+        with MappedFile(file_path) as mapped:
+            self._mapped = mapped
+            try:
+                yield mapped
+            finally:
+                self._mapped = previous
+                
+    def find_parse_state(self, file_path, identity=None):
+        """Return the last ParseState of a file, from memory or from the cache"""
+        state = self.parse_states.get(os.path.abspath(file_path))
+        if state is None and self.cache and identity:
+            saved = self.cache.load_state(file_path, identity)
+            if saved is not None:
+                fields, dataset = saved
+                state = ParseState(**dict(fields, dataset=dataset))
+                
+        return state
+        
+    def is_appended(self, file_path, state, size):
+        """
+        Check whether a file still starts with the region a ParseState covers
+        
+        Args:
+            file_path (str): Path to the log file
+            state (ParseState): State recorded by an earlier load
+            size (int): Current size of the file
+            
+        Returns:
+            bool: True if the file is unchanged or has only been appended to
+        """
+        if size < state.offset:
+            return False  # Truncated
+        with self.open_file(file_path) as mapped:
+            if size == state.offset and mapped.stat().st_mtime_ns != state.mtime_ns:
+                return False  # Rewritten in place
+            return self._edge_checksums(mapped, state.offset) == (state.head_checksum, state.tail_checksum)
+            
+    def record_parse_state(self, file_path, file_format, size, dataset, summary=None):
+        """
+        Remember the result for bytes [0, size) of a file so appends can be resumed
+        
+        Only line-oriented formats whose parsed region ends on a line break
+        get a state; anything else is parsed in full on its next load.
+        
+        Returns:
+            ParseState: The recorded state, or None
+        """
+        key = os.path.abspath(file_path)
+        self.parse_states.pop(key, None)
+        
+        if file_format not in BLOCK_FORMATS or size == 0:
+            return None
+            
+        with self.open_file(file_path) as mapped:
+            if mapped.size < size or mapped.view(size - 1, size).tobytes() not in (b'\n', b'\r'):
+                return None
+            head_checksum, tail_checksum = self._edge_checksums(mapped, size)
+            mtime_ns = mapped.stat().st_mtime_ns
+            
+        state = ParseState(file_format, size, mtime_ns, head_checksum, tail_checksum, dataset, summary)
+        self.parse_states[key] = state
+        return state
+        
+    def merge_datasets(self, file_format, datasets):
+        """Merge the datasets of consecutive parts of one file"""
+        if file_format == 'detailed_log':
+            # A timestamp's samples may straddle the boundary between parts
+            return LogDataset.merge(datasets)
+        return LogDataset.concat(datasets)
+        
+    def _edge_checksums(self, mapped, offset):
+        """Hash the first and last APPEND_CHECK_SIZE bytes before offset"""
+        checksums = []
+        for start, end in ((0, min(offset, APPEND_CHECK_SIZE)), (max(0, offset - APPEND_CHECK_SIZE), offset)):
+            with mapped.view(start, end) as region:
+                checksums.append(hashlib.blake2b(region, digest_size=16).hexdigest())
+        return tuple(checksums)
+        
+    def parse_records(self, file_path, file_format, progress_callback=None, start=0, end=None, partial_callback=None,
+                      summary=None):
+        """
+        Parse a file into record frames that keep parameter and count
+        
+        Args:
+            file_path (str): Path to the log file
+            file_format (str): Format returned by detect_format
+            progress_callback (callable): Optional callback for progress updates,
+                called with (bytes_done, total_bytes)
+            start (int): Byte offset where parsing starts (BLOCK_FORMATS only)
+            end (int): Byte offset where parsing stops (BLOCK_FORMATS only)
+            partial_callback (callable): Optional callback given the frames
+                parsed so far, now and then while parsing (BLOCK_FORMATS only)
+            summary (StreamingSummary): Optional summary the records are
+                added to as they are parsed
+            
+        Returns:
+            list: Non-empty frames indexed by timestamp with parameter, count,
+            min, max and avg columns
+        """
         if file_format == 'timestamp_stats':
-            data = self.process_timestamp_stats(file_path, progress_callback)
-        elif file_format == 'simple_csv':
-            data = self.process_simple_csv(file_path, progress_callback)
+            on_parts = None
+            if partial_callback:
+                def on_parts(parts):
+                    partial_callback([part for part in parts if not part.empty])
+                    
+            try:
+                parts = self.reduce_blocks(file_path, file_format, progress_callback, start, end, on_parts, summary)
+            except LoadCancelled:
+                raise
+            except Exception as e:
+                raise Exception(f"Error processing timestamp_stats format: {str(e)}")
+            return [part for part in parts if not part.empty]
         elif file_format == 'detailed_log':
-            data = self.process_detailed_log(file_path, progress_callback)
+            records = self.detailed_log_records(file_path, progress_callback, start, end, partial_callback, summary)
+        elif file_format == 'simple_csv':
+            records = self.simple_csv_records(file_path, progress_callback)
+            if summary is not None and records is not None:
+                summary.add_records(records)
         else:
-            # Fallback: try to create sample data for demonstration
-            data = self.create_sample_data()
+            records = None
             
-        if progress_callback:
-            progress_callback(100)
-            
-        return data
+        return [records] if records is not None and not records.empty else []
         
     def detect_format(self, file_path):
         """Detect the format of the log file by examining first few lines"""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = [f.readline().strip() for _ in range(5)]
+            with self.open_file(file_path) as mapped:
+                lines = [line.strip() for line in mapped.head_lines(5)]
                 
             # Check for timestamp_stats format
             for line in lines:
@@ -83,151 +451,461 @@ class DataProcessor:
             
     def process_timestamp_stats(self, file_path, progress_callback=None):
         """Process files with timestamp and statistics format"""
-        data_records = []
+        parts = self.parse_records(file_path, 'timestamp_stats', progress_callback)
+        
+        if parts:
+            return pd.concat([part[['min', 'max', 'avg']] for part in parts])  # Return only the statistical columns
+        else:
+            return self.create_sample_data()
+            
+    def reduce_blocks(self, file_path, file_format, progress_callback=None, start=0, end=None, partial_callback=None,
+                      summary=None):
+        """
+        Parse a line-oriented file block by block into partial results
         
+        Blocks are parsed in order on the calling thread, or spread over a
+        process pool when workers > 1. Both paths use the same block
+        boundaries, so their partial results are identical. The cancel token
+        is checked after every block; on cancellation, blocks not yet started
+        in the pool are dropped.
+        
+        Args:
+            file_path (str): Path to the log file
+            file_format (str): One of BLOCK_FORMATS
+            progress_callback (callable): Optional callback for progress updates,
+                called with (bytes_done, total_bytes) after every block
+            partial_callback (callable): Optional callback given the partial
+                results so far while blocks remain (see PARTIAL_INTERVAL)
+            summary (StreamingSummary): Optional summary each block's records
+                are added to as the block arrives (timestamp_stats only: a
+                detailed log's blocks hold partial groups)
+            
+        Returns:
+            list: Partial results in file order, one per block
+        """
+        ranges = self.split_line_ranges(file_path, start, end)
+        total_size = ranges[-1][1] - start if ranges else 0
+        
+        blocks = None
+        if self.workers > 1 and len(ranges) > 1:
+            results = self._reduce_ranges_parallel(file_path, file_format, ranges)
+        else:
+            blocks = self.iter_line_blocks(file_path, start, end)
+            results = (self.reduce_block(block, file_format) for block, _ in blocks)
+            
+        parts = []
+        next_partial = 0.0
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
+            for (_, block_end), part in zip(ranges, results):
+                parts.append(part)
+                if summary is not None:
+                    summary.add_records(part)
+                self.check_cancelled()
                 
-            total_lines = len(lines)
-            
-            for i, line in enumerate(lines):
-                if progress_callback and i % 1000 == 0:
-                    progress_callback(10 + int(80 * i / total_lines))
-                    
-                line = line.strip()
-                if not line:
-                    continue
+                if progress_callback:
+                    progress_callback(block_end - start, total_size)
                     
-                # Parse line: YYYY-MM-DD HH:MM:SS parameter count min max avg
-                match = re.match(
-                    r'(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\s+(\w+)\s+(\d+)\s+(\d+\.\d+)\s+(\d+\.\d+)\s+(\d+\.\d+)',
-                    line
-                )
+                if partial_callback and len(parts) < len(ranges) and time.perf_counter() >= next_partial:
+                    started = time.perf_counter()
+                    partial_callback(list(parts))
+                    finished = time.perf_counter()
+                    next_partial = finished + max(PARTIAL_INTERVAL, PARTIAL_COST_RATIO * (finished - started))
+        except BaseException as e:
+            # The frames of a failed parse still hold views of its block, and
+            # the map cannot be closed while any view is alive
+            traceback.clear_frames(e.__traceback__)
+            raise
+        finally:
+            # Release the map, or the pool's pending blocks, without waiting for garbage collection
+            results.close()
+            if blocks is not None:
+                blocks.close()
+            
+        return parts
+        
+    def reduce_block(self, block, file_format):
+        """Parse one block and reduce it to the partial result kept between blocks"""
+        if file_format == 'timestamp_stats':
+            # Parameter names repeat on every line, so keep them as categories
+            records = self.parse_timestamp_stats_block(block)
+            records['parameter'] = records['parameter'].astype('category')
+            return records
+        elif file_format == 'detailed_log':
+            # Per (timestamp, parameter) partial statistics
+            return self.grouped_stats(self.parse_detailed_log_block(block), ['timestamp', 'parameter'])
+        else:
+            raise ValueError(f"Format cannot be parsed in blocks: {file_format}")
+            
+    def _reduce_ranges_parallel(self, file_path, file_format, ranges):
+        """Reduce byte ranges in a process pool, yielding results in file order"""
+        # Spawn keeps workers independent of GUI threads and matches Windows behaviour
+        context = multiprocessing.get_context('spawn')
+        
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(ranges)), mp_context=context) as pool:
+            futures = [
+                pool.submit(_reduce_line_range, file_path, file_format, start, end, self.chunk_size)
+                for start, end in ranges
+            ]
+            try:
+                for future in futures:
+                    yield future.result()
+            finally:
+                # When the caller stops early, only blocks already running are waited for
+                for future in futures:
+                    future.cancel()
                 
-                if match:
-                    timestamp_str, parameter, count, min_val, max_val, avg_val = match.groups()
-                    timestamp = pd.to_datetime(timestamp_str)
-                    
-                    data_records.append({
-                        'timestamp': timestamp,
-                        'parameter': parameter,
-                        'count': int(count),
-                        'min': float(min_val),
-                        'max': float(max_val),
-                        'avg': float(avg_val)
-                    })
+    def split_line_ranges(self, file_path, start=0, end=None):
+        """
+        Split a file into byte ranges that start and end on line boundaries
+        
+        Range edges are found by moving each multiple of chunk_size forward to
+        the next line start, so the split depends only on the file content
+        and the chunk budget.
+        
+        Args:
+            file_path (str): Path to the log file
+            start (int): Byte offset of the first range
+            end (int): Byte offset where the last range ends (None = end of file)
+            
+        Returns:
+            list: (start, end) byte offsets, in file order
+        """
+        bounds = [start]
+        
+        with self.open_file(file_path) as mapped:
+            size = mapped.size if end is None else min(end, mapped.size)
+            for offset in range(start + self.chunk_size, size, self.chunk_size):
+                bound = mapped.line_start(offset)
+                if bound > bounds[-1] and bound < size:
+                    bounds.append(bound)
                     
-        except Exception as e:
-            raise Exception(f"Error processing timestamp_stats format: {str(e)}")
+        if size > bounds[-1]:
+            bounds.append(size)
             
-        if data_records:
-            df = pd.DataFrame(data_records)
-            df.set_index('timestamp', inplace=True)
-            return df[['min', 'max', 'avg']]  # Return only the statistical columns
-        else:
-            return self.create_sample_data()
+        return list(zip(bounds[:-1], bounds[1:]))
+        
+    def iter_line_blocks(self, file_path, start=0, end=None):
+        """
+        Scan a memory-mapped file as a sequence of blocks made of whole lines
+        
+        Blocks follow split_line_ranges and are memoryviews of the map, so no
+        block is copied or decoded up front. Pages of finished blocks are
+        released, keeping resident memory near one block.
+        
+        Args:
+            file_path (str): Path to the log file
+            start (int): Byte offset where scanning starts
+            end (int): Byte offset where scanning stops (None = end of file)
             
+        Yields:
+            tuple: (block memoryview, file offset where the block ends); the
+            view is only valid until the next block is requested
+        """
+        ranges = self.split_line_ranges(file_path, start, end)
+        
+        with self.open_file(file_path) as mapped:
+            for start, end in ranges:
+                with mapped.view(start, end) as block:
+                    yield block, end
+                mapped.release(end)
+                
+    def parse_timestamp_stats_block(self, data):
+        """
+        Parse a block of timestamp_stats lines in bulk
+        
+        The whole block is split into fields by the C tokenizer and every
+        column is converted with a single vectorized call. Blocks containing
+        lines the tokenizer cannot represent exactly (comments aside) are
+        parsed line by line instead, so the result is always the same.
+        
+        Args:
+            data (bytes-like): Raw file content made of complete lines
+            
+        Returns:
+            pandas.DataFrame: Records indexed by timestamp with parameter,
+            count, min, max and avg columns
+        """
+        columns = self._tokenize_timestamp_stats(data)
+        if columns is None:
+            columns = self._match_timestamp_stats(data)
+            
+        return self._build_timestamp_stats_records(columns)
+        
+    def _tokenize_timestamp_stats(self, data):
+        """Split all lines into fields at once, or return None if any line does not fit"""
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', pd.errors.ParserWarning)
+                table = pd.read_csv(
+                    BufferReader(data),
+                    sep=r'\s+',
+                    header=None,
+                    names=TIMESTAMP_STATS_FIELDS,
+                    usecols=range(len(TIMESTAMP_STATS_FIELDS)),
+                    dtype=str,
+                    comment='#',
+                    engine='c',
+                    encoding='utf-8',
+                    encoding_errors='ignore',
+                    keep_default_na=False,
+                    na_values=[''],
+                )
+        except (pd.errors.ParserError, pd.errors.EmptyDataError, ValueError):
+            return None
+            
+        # Short lines leave the trailing field empty
+        if table['avg'].isna().any():
+            return None
+            
+        # Validate distinct tokens only - logs repeat dates, names and values heavily
+        for field, pattern in TIMESTAMP_STATS_TOKENS.items():
+            if not all(pattern.fullmatch(token) for token in pd.unique(table[field])):
+                return None
+                
+        return table
+        
+    def _match_timestamp_stats(self, data):
+        """Extract fields line by line with the timestamp_stats pattern"""
+        text = str(data, 'utf-8', errors='ignore')
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+        
+        rows = []
+        for line in text.split('\n'):
+            match = TIMESTAMP_STATS_PATTERN.match(line.strip())
+            if match:
+                rows.append(match.groups())
+                
+        return pd.DataFrame(rows, columns=TIMESTAMP_STATS_FIELDS, dtype=object)
+        
+    def _build_timestamp_stats_records(self, columns):
+        """Convert string columns into typed records with one parse per column"""
+        timestamps = pd.to_datetime(
+            columns['date'] + ' ' + columns['time'], format=TIMESTAMP_FORMAT
+        )
+        
+        records = pd.DataFrame({
+            'timestamp': timestamps.values,
+            'parameter': columns['parameter'].values,
+            'count': columns['count'].astype('int64').values,
+            'min': columns['min'].astype('float64').values,
+            'max': columns['max'].astype('float64').values,
+            'avg': columns['avg'].astype('float64').values,
+        })
+        records.set_index('timestamp', inplace=True)
+        return records
+        
     def process_simple_csv(self, file_path, progress_callback=None):
         """Process simple CSV files"""
+        records = self.simple_csv_records(file_path, progress_callback)
+        
+        if records is None or records.empty:
+            return self.create_sample_data()
+        elif records['parameter'].nunique() > 1:
+            return records[['parameter', 'min', 'max', 'avg']]
+        else:
+            return records[['min', 'max', 'avg']]
+            
+    def simple_csv_records(self, file_path, progress_callback=None):
+        """Aggregate a CSV file into records, or return None if it cannot be interpreted"""
         try:
-            df = pd.read_csv(file_path)
+            with self.open_file(file_path) as mapped, BufferReader(mapped.view()) as reader:
+                df = pd.read_csv(reader)
             
             if progress_callback:
-                progress_callback(50)
+                progress_callback(mapped.size, mapped.size)
                 
             # Try to identify timestamp and value columns
             timestamp_col = None
-            value_col = None
+            value_cols = []
             
             for col in df.columns:
                 if 'time' in col.lower() or 'date' in col.lower():
                     timestamp_col = col
                 elif 'value' in col.lower() or 'measure' in col.lower():
-                    value_col = col
+                    value_cols.append(col)
                     
-            if timestamp_col and value_col:
+            if self.value_columns:
+                value_cols = [col for col in self.value_columns if col in df.columns]
+                
+            if timestamp_col and value_cols:
                 df[timestamp_col] = pd.to_datetime(df[timestamp_col])
                 df.set_index(timestamp_col, inplace=True)
                 
                 # Create statistical summary
-                result_data = []
-                for timestamp in df.index.unique():
-                    values = df.loc[timestamp, value_col] if isinstance(df.loc[timestamp, value_col], pd.Series) else [df.loc[timestamp, value_col]]
-                    result_data.append({
-                        'min': min(values),
-                        'max': max(values),
-                        'avg': sum(values) / len(values)
-                    })
-                    
-                result_df = pd.DataFrame(result_data, index=df.index.unique())
-                return result_df
+                return self.aggregate_by_timestamp(df, value_cols)
             else:
-                return self.create_sample_data()
+                return None
                 
         except Exception:
-            return self.create_sample_data()
+            return None
+            
+    def aggregate_by_timestamp(self, df, value_columns):
+        """
+        Compute min, max and mean of value columns per timestamp
+        
+        All rows are grouped once by their timestamp index (in order of first
+        appearance), so the cost grows linearly with the number of rows.
+        
+        Args:
+            df (pandas.DataFrame): Samples indexed by timestamp
+            value_columns (list): Numeric columns to summarize
             
+        Returns:
+            pandas.DataFrame: parameter (the value column name), count, min,
+            max and avg per timestamp, grouped by value column
+        """
+        stats = df.groupby(level=0, sort=False)[list(value_columns)].agg(['count', 'min', 'max', 'mean'])
+        
+        parts = []
+        for col in value_columns:
+            part = stats[col].rename(columns={'mean': 'avg'})
+            part.columns.name = None
+            part.insert(0, 'parameter', col)
+            parts.append(part)
+            
+        return pd.concat(parts)
+        
     def process_detailed_log(self, file_path, progress_callback=None):
         """Process detailed log files with bracketed timestamps"""
-        data_records = []
+        records = self.detailed_log_records(file_path, progress_callback)
         
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-                
-            total_lines = len(lines)
+        if records is not None:
+            return records[['parameter', 'min', 'max', 'avg']]
+        else:
+            return self.create_sample_data()
             
-            for i, line in enumerate(lines):
-                if progress_callback and i % 1000 == 0:
-                    progress_callback(10 + int(80 * i / total_lines))
-                    
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                # Parse line: [timestamp] parameter: value
-                match = re.match(r'\[([^\]]+)\]\s*([^:]+):\s*([0-9.]+)', line)
+    def detailed_log_records(self, file_path, progress_callback=None, start=0, end=None, partial_callback=None,
+                             summary=None):
+        """
+        Aggregate a detailed log (or bytes start:end of it) into records, or return None if it holds no samples
+        
+        A timestamp's samples may be split between blocks, so its record is
+        only complete once all blocks are combined, and the records are
+        added to summary then.
+        """
+        on_partials = None
+        if partial_callback:
+            def on_partials(partials):
+                records = self.grouped_stats_records(partials)
+                partial_callback([] if records is None else [records])
                 
-                if match:
-                    timestamp_str, parameter, value_str = match.groups()
-                    
-                    try:
-                        timestamp = pd.to_datetime(timestamp_str)
-                        value = float(value_str)
-                        
-                        data_records.append({
-                            'timestamp': timestamp,
-                            'parameter': parameter.strip(),
-                            'value': value
-                        })
-                    except (ValueError, pd.errors.ParserError):
-                        continue
-                        
+        try:
+            partials = self.reduce_blocks(file_path, 'detailed_log', progress_callback, start, end, on_partials)
+        except LoadCancelled:
+            raise
         except Exception as e:
             raise Exception(f"Error processing detailed_log format: {str(e)}")
             
-        if data_records:
-            df = pd.DataFrame(data_records)
-            df.set_index('timestamp', inplace=True)
+        records = self.grouped_stats_records(partials)
+        if summary is not None and records is not None:
+            summary.add_records(records)
+        return records
+        
+    def grouped_stats_records(self, partials):
+        """Combine per-block grouped stats of a detailed log into records, or return None if there are none"""
+        partials = [partial for partial in partials if not partial.empty]
+        if not partials:
+            return None
             
-            # Group by parameter and create statistics
-            result_data = []
-            for timestamp in df.index.unique():
-                timestamp_data = df.loc[df.index == timestamp]
-                values = timestamp_data['value'].values
-                
-                result_data.append({
-                    'min': np.min(values),
-                    'max': np.max(values),
-                    'avg': np.mean(values)
-                })
-                
-            result_df = pd.DataFrame(result_data, index=df.index.unique())
-            return result_df
-        else:
-            return self.create_sample_data()
+        # Timestamps can straddle block boundaries, so combine the partials
+        stats = self.combine_grouped_stats(partials)
+        
+        records = pd.DataFrame({
+            'parameter': stats.index.get_level_values('parameter'),
+            'count': stats['count'].values,
+            'min': stats['min'].values,
+            'max': stats['max'].values,
+            'avg': (stats['sum'] / stats['count']).values
+        }, index=stats.index.get_level_values('timestamp'))
+        
+        # Keep each parameter's rows together, in order of first appearance,
+        # and the names as categories so they are not hashed again downstream
+        codes, names = pd.factorize(records['parameter'])
+        records['parameter'] = pd.Categorical.from_codes(codes, names)
+        return records.iloc[np.argsort(codes, kind='stable')]
+        
+    def grouped_stats(self, samples, keys, value_column='value'):
+        """
+        Reduce samples to min, max, sum and count per key in one grouped pass
+        
+        Partial results from different blocks can be merged with
+        combine_grouped_stats, so the engine works on streamed input.
+        
+        Args:
+            samples (pandas.DataFrame): One row per sample
+            keys (list): Columns identifying a group, e.g. timestamp and parameter
+            value_column (str): Column holding the sample values
             
+        Returns:
+            pandas.DataFrame: min, max, sum, count indexed by the keys
+        """
+        return samples.groupby(keys, sort=False)[value_column].agg(['min', 'max', 'sum', 'count'])
+        
+    def combine_grouped_stats(self, partials):
+        """Merge grouped_stats results whose groups may overlap"""
+        combined = pd.concat(partials)
+        return combined.groupby(level=list(range(combined.index.nlevels)), sort=False).agg(
+            {'min': 'min', 'max': 'max', 'sum': 'sum', 'count': 'sum'}
+        )
+        
+    def parse_detailed_log_block(self, data):
+        """
+        Parse a block of detailed_log lines into individual samples
+        
+        The block is matched as raw bytes in one pass and only the distinct
+        timestamps and parameter names are decoded.
+        
+        Args:
+            data (bytes-like): Raw file content made of complete lines
+            
+        Returns:
+            pandas.DataFrame: One row per sample with timestamp, parameter
+            and value columns
+        """
+        # Parse lines: [timestamp] parameter: value - fields stay raw bytes
+        rows = DETAILED_LOG_LINES.findall(data)
+        timestamps = [row[0] for row in rows]
+        parameters = [row[1] for row in rows]
+        values = [row[2] for row in rows]
+        
+        samples = pd.DataFrame({
+            'timestamp': self._parse_timestamps(timestamps),
+            'parameter': self._decode_names(parameters),
+            'value': self._parse_values(values)
+        })
+        
+        # Lines whose timestamp or value cannot be parsed are skipped
+        return samples.dropna(subset=['timestamp', 'value'])
+        
+    def _parse_timestamps(self, strings):
+        """Parse raw free-form timestamps, decoding and converting each distinct one once"""
+        codes, uniques = pd.factorize(np.asarray(strings, dtype=object))
+        uniques = [unique.decode('utf-8', errors='ignore') for unique in uniques]
+        parsed = pd.to_datetime(pd.Series(uniques, dtype=object), format=TIMESTAMP_FORMAT, errors='coerce')
+        
+        # Anything not in the fixed layout goes through the flexible parser
+        for i in np.flatnonzero(parsed.isna().values):
+            try:
+                parsed.iloc[i] = pd.to_datetime(uniques[i])
+            except (ValueError, pd.errors.ParserError):
+                pass
+                
+        return pd.Series(parsed.values.take(codes))
+        
+    def _decode_names(self, names):
+        """Decode and strip raw names, once per distinct name"""
+        codes, uniques = pd.factorize(np.asarray(names, dtype=object))
+        decoded = np.array([unique.decode('utf-8', errors='ignore').strip() for unique in uniques], dtype=object)
+        return pd.Series(decoded.take(codes), dtype=object)
+        
+    def _parse_values(self, values):
+        """Convert raw numeric fields to float64, with NaN for malformed ones"""
+        try:
+            return pd.Series(np.array(values, dtype=bytes).astype(np.float64))
+        except ValueError:
+            # Only a malformed value such as "1.2.3" lands here
+            return pd.to_numeric(pd.Series([value.decode('ascii') for value in values], dtype=object), errors='coerce')
+        
     def create_sample_data(self):
         """Create sample data for demonstration when file parsing fails"""
         # Generate sample LINAC water system data
@@ -256,4 +934,44 @@ class DataProcessor:
             })
             
         df = pd.DataFrame(data, index=dates)
-        return df
\ No newline at end of file
+        return df
+
+def _reduce_line_range(file_path, file_format, start, end, chunk_size):
+    """Parse one byte range of a log file in a worker process"""
+    with MappedFile(file_path) as mapped, mapped.view(start, end) as block:
+        return DataProcessor(chunk_size=chunk_size).reduce_block(block, file_format)
+
+def benchmark_workers(file_path, worker_counts=(1, 2, 4, 8), chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Time process_file for several worker counts
+    
+    Args:
+        file_path (str): Path to the log file
+        worker_counts (iterable): Worker counts to try; the first is the baseline
+        chunk_size (int): Block size shared by every run
+        
+    Returns:
+        list: One dict per run with workers, seconds, speedup and whether the
+        output is identical to the baseline run
+    """
+    results = []
+    baseline = None
+    
+    for workers in worker_counts:
+        processor = DataProcessor(chunk_size=chunk_size, workers=workers)
+        
+        started = time.perf_counter()
+        data = processor.process_file(file_path)
+        elapsed = time.perf_counter() - started
+        
+        if baseline is None:
+            baseline = (elapsed, data)
+            
+        results.append({
+            'workers': workers,
+            'seconds': elapsed,
+            'speedup': baseline[0] / elapsed if elapsed > 0 else float('inf'),
+            'identical': data.equals(baseline[1])
+        })
+        
+    return results
\ No newline at end of file
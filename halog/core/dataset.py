@@ -0,0 +1,266 @@
+"""
+Columnar Dataset Module for HALog
+Compact multi-parameter storage of processed LINAC log statistics
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Column dtypes of the compact model
+TIMESTAMP_DTYPE = np.int64    # Nanoseconds since the epoch
+CODE_DTYPE = np.uint16        # Index into LogDataset.parameters
+VALUE_DTYPE = np.float32      # min, max, avg statistics
+COUNT_DTYPE = np.uint32       # Samples behind each row
+
+# Zero-copy view of one parameter's rows
+ParameterSeries = namedtuple('ParameterSeries', ['parameter', 'timestamps', 'min', 'max', 'avg', 'count'])
+
+class LogDataset:
+    """
+    Per-parameter statistics stored as parallel numpy columns
+    
+    Rows are sorted by parameter code and then by timestamp, so the rows of
+    one parameter form a contiguous slice that can be viewed without copying.
+    """
+    
+    def __init__(self, parameters, codes, timestamps, min_values, max_values, avg_values, counts):
+        self.parameters = list(parameters)
+        
+        if not _is_sorted(codes, timestamps):
+            order = np.lexsort((timestamps, codes))
+            codes, timestamps = codes[order], timestamps[order]
+            min_values, max_values = min_values[order], max_values[order]
+            avg_values, counts = avg_values[order], counts[order]
+            
+        self.codes = np.ascontiguousarray(codes, dtype=CODE_DTYPE)
+        self.timestamps = np.ascontiguousarray(timestamps, dtype=TIMESTAMP_DTYPE)
+        self.min = np.ascontiguousarray(min_values, dtype=VALUE_DTYPE)
+        self.max = np.ascontiguousarray(max_values, dtype=VALUE_DTYPE)
+        self.avg = np.ascontiguousarray(avg_values, dtype=VALUE_DTYPE)
+        self.count = np.ascontiguousarray(counts, dtype=COUNT_DTYPE)
+        
+        # Row range of each parameter: rows offsets[i]:offsets[i + 1]
+        self.offsets = np.searchsorted(self.codes, np.arange(len(self.parameters) + 1), side='left')
+        
+    @classmethod
+    def from_records(cls, records, default_parameter='value'):
+        """
+        Build a dataset from a records frame
+        
+        Args:
+            records (pandas.DataFrame): Rows indexed by timestamp with min, max
+                and avg columns, plus optional parameter and count columns
+            default_parameter (str): Name used when there is no parameter column
+            
+        Returns:
+            LogDataset: Compact copy of the records
+        """
+        if 'parameter' in records.columns:
+            codes, parameters = pd.factorize(records['parameter'])
+        else:
+            codes, parameters = np.zeros(len(records), dtype=CODE_DTYPE), [default_parameter]
+            
+        if 'count' in records.columns:
+            counts = records['count'].to_numpy()
+        else:
+            counts = np.ones(len(records), dtype=COUNT_DTYPE)
+            
+        return cls(
+            [str(parameter) for parameter in parameters],
+            codes,
+            _to_nanoseconds(records.index),
+            records['min'].to_numpy(),
+            records['max'].to_numpy(),
+            records['avg'].to_numpy(),
+            counts
+        )
+        
+    @classmethod
+    def concat(cls, datasets):
+        """Combine datasets, merging parameters that share a name"""
+        datasets = list(datasets)
+        if not datasets:
+            return cls.empty()
+        if len(datasets) == 1:
+            return datasets[0]
+            
+        parameters = []
+        positions = {}
+        codes = []
+        
+        for dataset in datasets:
+            mapping = np.empty(len(dataset.parameters), dtype=CODE_DTYPE)
+            for i, parameter in enumerate(dataset.parameters):
+                if parameter not in positions:
+                    positions[parameter] = len(parameters)
+                    parameters.append(parameter)
+                mapping[i] = positions[parameter]
+            codes.append(mapping[dataset.codes])
+            
+        return cls(
+            parameters,
+            np.concatenate(codes),
+            np.concatenate([dataset.timestamps for dataset in datasets]),
+            np.concatenate([dataset.min for dataset in datasets]),
+            np.concatenate([dataset.max for dataset in datasets]),
+            np.concatenate([dataset.avg for dataset in datasets]),
+            np.concatenate([dataset.count for dataset in datasets])
+        )
+        
+    @classmethod
+    def merge(cls, datasets):
+        """
+        Combine datasets of per-timestamp aggregates
+        
+        Rows sharing a parameter and timestamp become one row with the lowest
+        min, the highest max, the summed count and the count-weighted average.
+        """
+        dataset = cls.concat(datasets)
+        if len(dataset) < 2:
+            return dataset
+            
+        # Rows are sorted by (code, timestamp), so equal keys are adjacent
+        new_key = (np.diff(dataset.codes) != 0) | (np.diff(dataset.timestamps) != 0)
+        starts = np.flatnonzero(np.concatenate(([True], new_key)))
+        if len(starts) == len(dataset):
+            return dataset
+            
+        counts = np.add.reduceat(dataset.count.astype(np.uint64), starts)
+        totals = np.add.reduceat(dataset.avg.astype(np.float64) * dataset.count, starts)
+        
+        return cls(
+            dataset.parameters,
+            dataset.codes[starts],
+            dataset.timestamps[starts],
+            np.minimum.reduceat(dataset.min, starts),
+            np.maximum.reduceat(dataset.max, starts),
+            totals / counts,
+            counts
+        )
+        
+    @classmethod
+    def union(cls, datasets):
+        """
+        Combine datasets that may repeat each other's rows
+        
+        Meant for logs whose time ranges overlap, such as rotated files that
+        both hold the records around the rotation. Rows repeated exactly
+        (same parameter, timestamp and statistics) are kept once; remaining
+        rows sharing a parameter and timestamp are partial aggregates and are
+        combined as in merge().
+        """
+        datasets = list(datasets)
+        dataset = cls.concat(datasets)
+        if len(datasets) < 2 or len(dataset) < 2:
+            return dataset
+            
+        same_key = (np.diff(dataset.codes) == 0) & (np.diff(dataset.timestamps) == 0)
+        if not same_key.any():
+            return dataset
+            
+        # Sort on every column so exact repeats are adjacent
+        columns = (dataset.count, dataset.avg, dataset.max, dataset.min, dataset.timestamps, dataset.codes)
+        order = np.lexsort(columns)
+        repeat = np.ones(len(dataset) - 1, dtype=bool)
+        for column in columns:
+            ordered = column[order]
+            repeat &= ordered[1:] == ordered[:-1]
+        rows = order[np.concatenate(([True], ~repeat))]
+        
+        return cls.merge([cls(
+            dataset.parameters,
+            dataset.codes[rows],
+            dataset.timestamps[rows],
+            dataset.min[rows],
+            dataset.max[rows],
+            dataset.avg[rows],
+            dataset.count[rows]
+        )])
+        
+    @classmethod
+    def empty(cls):
+        """Create a dataset without rows"""
+        return cls([], np.empty(0, CODE_DTYPE), np.empty(0, TIMESTAMP_DTYPE), np.empty(0, VALUE_DTYPE),
+                   np.empty(0, VALUE_DTYPE), np.empty(0, VALUE_DTYPE), np.empty(0, COUNT_DTYPE))
+                   
+    def __len__(self):
+        return len(self.timestamps)
+        
+    @property
+    def nbytes(self):
+        """Memory used by the column arrays"""
+        return sum(column.nbytes for column in self.columns().values())
+        
+    def columns(self):
+        """Return the column arrays by name"""
+        return {
+            'codes': self.codes,
+            'timestamps': self.timestamps,
+            'min': self.min,
+            'max': self.max,
+            'avg': self.avg,
+            'count': self.count
+        }
+        
+    def series(self, parameter):
+        """
+        Return the rows of one parameter as views into the columns
+        
+        Args:
+            parameter (str): Parameter name
+            
+        Returns:
+            ParameterSeries: Time-sorted arrays sharing memory with the dataset
+        """
+        code = self.parameters.index(parameter)
+        rows = slice(self.offsets[code], self.offsets[code + 1])
+        
+        return ParameterSeries(
+            parameter,
+            self.timestamps[rows],
+            self.min[rows],
+            self.max[rows],
+            self.avg[rows],
+            self.count[rows]
+        )
+        
+    def time_range(self):
+        """Return the first and last timestamp as pandas Timestamps"""
+        if len(self) == 0:
+            return None, None
+        return pd.Timestamp(self.timestamps.min()), pd.Timestamp(self.timestamps.max())
+        
+    def to_frame(self, parameter=None):
+        """
+        Expand the dataset (or one parameter) into a pandas DataFrame
+        
+        Returns:
+            pandas.DataFrame: parameter, count, min, max, avg indexed by timestamp
+        """
+        if parameter is not None:
+            series = self.series(parameter)
+            names = np.full(len(series.timestamps), parameter, dtype=object)
+        else:
+            series = ParameterSeries(None, self.timestamps, self.min, self.max, self.avg, self.count)
+            names = np.asarray(self.parameters, dtype=object)[self.codes] if self.parameters else np.empty(0, dtype=object)
+            
+        frame = pd.DataFrame({
+            'parameter': pd.Categorical(names, categories=self.parameters),
+            'count': series.count,
+            'min': series.min.astype(np.float64),
+            'max': series.max.astype(np.float64),
+            'avg': series.avg.astype(np.float64)
+        }, index=pd.DatetimeIndex(series.timestamps.view('datetime64[ns]'), name='timestamp'))
+        return frame
+
+def _is_sorted(codes, timestamps):
+    """Check in one pass whether rows are already ordered by code, then timestamp"""
+    code_steps = np.diff(codes.astype(np.int64))
+    time_steps = np.diff(timestamps)
+    return bool(np.all(code_steps >= 0) and np.all((code_steps > 0) | (time_steps >= 0)))
+
+def _to_nanoseconds(index):
+    """Convert a datetime-like index to int64 nanoseconds since the epoch"""
+    return np.asarray(pd.DatetimeIndex(index)).astype('datetime64[ns]').view(TIMESTAMP_DTYPE)
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""
+Downsampling Module for HALog
+Display-aware decimation of long time series before plotting
+"""
+
+import numpy as np
+
+def m4_indices(timestamps, values, buckets, start=None, end=None):
+    """
+    Select the rows needed to draw a line at a given horizontal resolution
+    
+    The time range is split into equal buckets (one per pixel column) and the
+    first, last, minimum and maximum row of every bucket are kept. A line
+    through these rows covers the same pixels as a line through all rows, so
+    spikes and extremes stay visible while at most 4 * buckets rows remain.
+    
+    Args:
+        timestamps (numpy.ndarray): Sorted int64 timestamps
+        values (numpy.ndarray): Values at the timestamps
+        buckets (int): Number of buckets, normally the plot width in pixels
+        start (int): Time where the buckets begin (default: first timestamp)
+        end (int): Time where the buckets end (default: last timestamp);
+            rows outside start:end join the first or last bucket
+            
+    Returns:
+        numpy.ndarray: Sorted row indices to plot
+    """
+    count = len(values)
+    if count <= 4 * buckets:
+        return np.arange(count)
+        
+    # Rows are time-sorted, so each bucket is a contiguous row range
+    start = timestamps[0] if start is None else start
+    end = timestamps[-1] if end is None else end
+    edges = start + np.arange(1, buckets) * (float(end - start) / buckets)
+    bounds = np.unique(np.concatenate(([0], np.searchsorted(timestamps, edges), [count])))
+    
+    # One argmin/argmax per bucket: a single pass over the rows and no
+    # temporaries the size of the series
+    keep = np.empty((len(bounds) - 1, 4), dtype=np.int64)
+    for i, (first, stop) in enumerate(zip(bounds[:-1].tolist(), bounds[1:].tolist())):
+        segment = values[first:stop]
+        keep[i] = (first, stop - 1, first + segment.argmin(), first + segment.argmax())
+        
+    return np.unique(keep)
+
+def downsample_series(series, buckets, start=None, end=None):
+    """
+    Decimate the avg, min and max lines of a parameter series
+    
+    Args:
+        series (ParameterSeries): Rows of one parameter
+        buckets (int): Number of buckets, normally the plot width in pixels
+        start (int): Visible time range start (default: first timestamp)
+        end (int): Visible time range end (default: last timestamp)
+        
+    Returns:
+        dict: (timestamps, values) to plot for 'avg', 'min' and 'max'
+    """
+    lines = {}
+    for name in ('avg', 'min', 'max'):
+        values = getattr(series, name)
+        rows = m4_indices(series.timestamps, values, buckets, start, end)
+        lines[name] = (series.timestamps[rows], values[rows])
+    return lines
\ No newline at end of file
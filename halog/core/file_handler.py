@@ -3,10 +3,19 @@ File Handler Module for HALog
 Handles file operations and validation
 """
 
+import io
 import os
+import re
+import mmap
 import mimetypes
 from pathlib import Path
 
+# Any line terminator (\n, \r\n or bare \r)
+LINE_BREAK = re.compile(rb'[\r\n]')
+
+# One complete line terminator, as recognised by universal newlines
+LINE_END = re.compile(rb'\r\n|\r|\n')
+
 class FileHandler:
     """Handles file operations for LINAC log files"""
     
@@ -42,8 +51,8 @@ class FileHandler:
             
         # Check if file is readable
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                f.read(100)  # Try to read first 100 characters
+            with open(file_path, 'rb') as f:
+                f.read(100)  # Try to read the first 100 bytes
         except Exception as e:
             return False, f"Cannot read file: {str(e)}"
             
@@ -71,4 +80,139 @@ class FileHandler:
             'modified': stat.st_mtime,
             'extension': Path(file_path).suffix.lower(),
             'mime_type': mimetypes.guess_type(file_path)[0]
-        }
\ No newline at end of file
+        }
+            
+    def validate_mapped(self, mapped):
+        """
+        Validate a file that is already open, without opening it again
+        
+        Args:
+            mapped (MappedFile): Open file
+            
+        Returns:
+            tuple: (is_valid, error_message)
+        """
+        file_ext = Path(mapped.file_path).suffix.lower()
+        if file_ext not in self.supported_extensions:
+            return False, f"Unsupported file type: {file_ext}"
+            
+        if mapped.size > self.max_file_size:
+            return False, f"File too large: {mapped.size / (1024*1024):.1f}MB (max: {self.max_file_size / (1024*1024):.1f}MB)"
+            
+        # Check that the content can be read (the map faults the first page in)
+        try:
+            with mapped.view(0, 100) as head:
+                head.tobytes()
+        except Exception as e:
+            return False, f"Cannot read file: {str(e)}"
+            
+        return True, "File is valid"
+        
+    def open_mapped(self, file_path):
+        """
+        Open a file for zero-copy reading
+        
+        Args:
+            file_path (str): Path to the file
+            
+        Returns:
+            MappedFile: Read-only memory map of the file
+        """
+        return MappedFile(file_path)
+
+class MappedFile:
+    """
+    Read-only memory map of a file
+    
+    Blocks are handed out as memoryview slices of the map, so parsers work on
+    the operating system's page cache instead of a decoded copy of the file.
+    Use as a context manager; views must be released before the map closes.
+    """
+    
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._file = open(file_path, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
+        
+        # Zero-length files cannot be mapped
+        if self.size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._map = b''
+            
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        
+    def close(self):
+        """Unmap the file and close its handle"""
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+        
+    def stat(self):
+        """Return os.stat_result of the open file without another lookup by path"""
+        return os.fstat(self._file.fileno())
+        
+    def view(self, start=0, end=None):
+        """Return bytes start:end as a memoryview without copying"""
+        end = self.size if end is None else end
+        return memoryview(self._map)[start:end]
+        
+    def line_start(self, offset):
+        """Return the first line start at or after offset"""
+        if offset <= 0:
+            return 0
+            
+        match = LINE_BREAK.search(self._map, offset - 1)
+        return match.end() if match else self.size
+        
+    def head_lines(self, count):
+        """Decode the first count lines, splitting on any line terminator"""
+        lines = []
+        position = 0
+        
+        while len(lines) < count and position < self.size:
+            match = LINE_END.search(self._map, position)
+            end = match.start() if match else self.size
+            lines.append(self._map[position:end].decode('utf-8', errors='ignore'))
+            position = match.end() if match else self.size
+            
+        return lines
+        
+    def release(self, end):
+        """
+        Drop the mapped pages before end from this process
+        
+        The pages stay in the page cache, so resident memory follows the
+        block being parsed rather than everything read so far.
+        """
+        if not isinstance(self._map, mmap.mmap) or not hasattr(mmap, 'MADV_DONTNEED'):
+            return
+            
+        length = end - end % mmap.PAGESIZE
+        if length > 0:
+            self._map.madvise(mmap.MADV_DONTNEED, 0, length)
+
+class BufferReader(io.RawIOBase):
+    """Binary file object over a bytes-like buffer that copies only what is read"""
+    
+    def __init__(self, buffer):
+        super().__init__()
+        self._view = memoryview(buffer).cast('B')
+        self._position = 0
+        
+    def readable(self):
+        return True
+        
+    def readinto(self, target):
+        size = min(len(target), len(self._view) - self._position)
+        target[:size] = self._view[self._position:self._position + size]
+        self._position += size
+        return size
+        
+    def close(self):
+        self._view.release()
+        super().close()
\ No newline at end of file
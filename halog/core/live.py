@@ -0,0 +1,250 @@
+"""
+Live Monitoring Module for HALog
+Following a log file as it is written, keeping a moving window of its rows
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from core.data_processor import BLOCK_FORMATS, DEFAULT_CHUNK_SIZE, DataProcessor
+from core.dataset import COUNT_DTYPE, TIMESTAMP_DTYPE, VALUE_DTYPE, LogDataset, ParameterSeries
+from core.pyramid import MINUTE
+
+# Seconds between checks of a followed file once it has been read to the end
+LIVE_POLL_INTERVAL = 0.5
+
+# Most bytes parsed per poll, so catching up on a large file is done in steps
+TAIL_READ_LIMIT = DEFAULT_CHUNK_SIZE
+
+# Default span of log time kept in a LiveBuffer
+DEFAULT_RETENTION_MINUTES = 60
+
+# Columns of a SeriesBuffer, in ParameterSeries order
+SERIES_COLUMNS = (('timestamps', TIMESTAMP_DTYPE), ('min', VALUE_DTYPE), ('max', VALUE_DTYPE),
+                  ('avg', VALUE_DTYPE), ('count', COUNT_DTYPE))
+
+class LogTailer:
+    """
+    Parses the lines appended to a log file since the previous poll
+    
+    Only complete lines are parsed; a line still being written is left for
+    the next poll. A file that shrinks or is replaced (log rotation) is read
+    again from the start.
+    """
+    
+    def __init__(self, file_path, read_limit=TAIL_READ_LIMIT):
+        self.file_path = file_path
+        self.read_limit = read_limit
+        self.processor = DataProcessor()
+        self.file_format = None
+        self.offset = 0      # Bytes of the file parsed so far
+        self.inode = None    # Identity of the file being followed
+        self.behind = False  # Whether the last poll stopped at read_limit
+        
+    def poll(self):
+        """
+        Parse the complete lines added since the last poll
+        
+        Returns:
+            LogDataset: The new rows, or None if there are none yet
+            
+        Raises:
+            ValueError: If the file is not a line-oriented log format
+        """
+        self.behind = False
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            # Between a rotation's rename and the new file's creation
+            return None
+            
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            self.offset = 0
+        self.inode = stat.st_ino
+        
+        if stat.st_size <= self.offset:
+            return None
+            
+        if self.file_format is None:
+            file_format = self.processor.detect_format(self.file_path)
+            if file_format == 'unknown':
+                # Possibly too few lines written yet to tell
+                return None
+            if file_format not in BLOCK_FORMATS:
+                raise ValueError(f"Only line-oriented logs can be followed, not {file_format} files")
+            self.file_format = file_format
+            
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(min(stat.st_size - self.offset, self.read_limit))
+            
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return None
+        self.offset += end
+        self.behind = len(data) == self.read_limit
+        
+        part = self.processor.reduce_block(memoryview(data)[:end], self.file_format)
+        if self.file_format == 'detailed_log':
+            part = self.processor.grouped_stats_records([part])
+        if part is None or part.empty:
+            return None
+        return LogDataset.from_records(part)
+
+class SeriesBuffer:
+    """
+    The rows of one parameter in preallocated columns
+    
+    Rows are appended at the end and dropped from the front by moving a head
+    index, so both are amortized O(1) per row and the live rows are always
+    one contiguous slice that can be viewed without copying. The columns are
+    compacted or grown only when the end of the allocation is reached.
+    """
+    
+    def __init__(self, parameter, capacity=1024):
+        self.parameter = parameter
+        self.columns = [np.empty(capacity, dtype=dtype) for _, dtype in SERIES_COLUMNS]
+        self.head = 0  # First live row
+        self.tail = 0  # One past the last live row
+        
+    def __len__(self):
+        return self.tail - self.head
+        
+    def series(self):
+        """Return the live rows as a ParameterSeries of views"""
+        return ParameterSeries(self.parameter, *(column[self.head:self.tail] for column in self.columns))
+        
+    def append(self, series):
+        """
+        Add time-sorted rows after the existing ones
+        
+        A first row stamped with the last row's time continues its aggregate
+        (a detailed log's samples can be split between polls) and is combined
+        with it. Rows older than the last row are merged in with a full
+        re-sort, which only happens if the log goes back in time.
+        
+        Returns:
+            bool: Whether rows before the previous last row changed
+        """
+        rows = [np.asarray(getattr(series, name)) for name, _ in SERIES_COLUMNS]
+        if len(rows[0]) == 0:
+            return False
+            
+        if len(self):
+            last = self.tail - 1
+            if rows[0][0] < self.columns[0][last]:
+                self._merge(series)
+                return True
+            if rows[0][0] == self.columns[0][last]:
+                self._combine_last(*(column[0] for column in rows[1:]))
+                rows = [column[1:] for column in rows]
+                
+        count = len(rows[0])
+        self._reserve(count)
+        for column, values in zip(self.columns, rows):
+            column[self.tail:self.tail + count] = values
+        self.tail += count
+        return False
+        
+    def trim(self, start):
+        """Drop the rows stamped before start"""
+        self.head += int(np.searchsorted(self.columns[0][self.head:self.tail], start, side='left'))
+        
+    def _reserve(self, count):
+        """Make room for count more rows after tail"""
+        capacity = len(self.columns[0])
+        if self.tail + count <= capacity:
+            return
+            
+        live = len(self)
+        if live + count > capacity // 2:
+            capacity = 2 * (live + count)
+        columns = [np.empty(capacity, dtype=column.dtype) for column in self.columns]
+        for new, old in zip(columns, self.columns):
+            new[:live] = old[self.head:self.tail]
+        self.columns, self.head, self.tail = columns, 0, live
+        
+    def _combine_last(self, min_value, max_value, avg_value, count):
+        """Fold one aggregate row into the last row"""
+        _, mins, maxes, avgs, counts = self.columns
+        last = self.tail - 1
+        total = int(counts[last]) + int(count)
+        if total:
+            avgs[last] = (float(avgs[last]) * int(counts[last]) + float(avg_value) * int(count)) / total
+        mins[last] = min(mins[last], min_value)
+        maxes[last] = max(maxes[last], max_value)
+        counts[last] = total
+        
+    def _merge(self, series):
+        """Replace the live rows by their merge with out-of-order rows"""
+        parts = []
+        for part in (self.series(), series):
+            codes = np.zeros(len(part.timestamps), dtype=np.uint16)
+            parts.append(LogDataset([self.parameter], codes, *part[1:]))
+        merged = LogDataset.merge(parts).series(self.parameter)
+        
+        self.head = self.tail = 0
+        self.append(merged)
+
+class LiveBuffer:
+    """
+    A moving window over the rows of a followed log
+    
+    Keeps the rows of every parameter that lie within retention of the
+    newest timestamp seen, measured in log time rather than wall-clock time.
+    Offers the parameters, series() and time_range() of a LogDataset, so it
+    can be plotted like one.
+    """
+    
+    def __init__(self, retention=DEFAULT_RETENTION_MINUTES * MINUTE):
+        self.retention = retention  # Nanoseconds
+        self.buffers = {}
+        self.newest = None
+        
+    @property
+    def parameters(self):
+        """Parameters that have rows in the window"""
+        return [parameter for parameter, buffer in self.buffers.items() if len(buffer)]
+        
+    def __len__(self):
+        return sum(len(buffer) for buffer in self.buffers.values())
+        
+    def append(self, dataset):
+        """
+        Add the rows of a dataset and drop the rows that fall out of the window
+        
+        Returns:
+            set: Parameters whose rows changed before their previous last row,
+            besides the rows dropped from the front
+        """
+        rewritten = set()
+        for parameter in dataset.parameters:
+            series = dataset.series(parameter)
+            if len(series.timestamps) == 0:
+                continue
+            if parameter not in self.buffers:
+                self.buffers[parameter] = SeriesBuffer(parameter)
+            if self.buffers[parameter].append(series):
+                rewritten.add(parameter)
+            
+            newest = int(series.timestamps[-1])
+            self.newest = newest if self.newest is None else max(self.newest, newest)
+            
+        if self.newest is not None:
+            for buffer in self.buffers.values():
+                buffer.trim(self.newest - self.retention)
+        return rewritten
+        
+    def series(self, parameter):
+        """Return the rows of one parameter in the window as views"""
+        return self.buffers[parameter].series()
+        
+    def time_range(self):
+        """Return the first and last timestamp in the window as pandas Timestamps"""
+        series = [self.series(parameter) for parameter in self.parameters]
+        if not series:
+            return None, None
+        return (pd.Timestamp(min(int(rows.timestamps[0]) for rows in series)),
+                pd.Timestamp(max(int(rows.timestamps[-1]) for rows in series)))
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""
+Parse Cache Module for HALog
+Persistent on-disk cache of processed log files
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from core.dataset import LogDataset
+from core.file_handler import MappedFile
+
+# Bump when the stored layout or the parse semantics change
+CACHE_VERSION = 2
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.halog', 'cache')
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024  # Evict least recently used entries above 2 GB
+FINGERPRINT_SAMPLE = 64 * 1024              # Bytes hashed from the start, middle and end
+ENTRY_SUFFIX = '.npz'
+
+class ParseCache:
+    """
+    Stores processed datasets as uncompressed numpy archives
+    
+    Each source file has one entry, named after its absolute path. The entry
+    records the file size, modification time and a content fingerprint; once
+    any of them no longer matches the entry is stale and is replaced by the
+    next store. An entry may also carry the parse state needed to resume a
+    log that has only been appended to.
+    """
+    
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or os.environ.get('HALOG_CACHE_DIR') or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        
+    def load(self, file_path, identity):
+        """
+        Return the cached dataset of a file
+        
+        Args:
+            file_path (str): Path to the source log file
+            identity (dict): Current file_identity of the file
+            
+        Returns:
+            LogDataset: Cached dataset, or None on a miss or a stale entry
+        """
+        entry = self._read(file_path, lambda saved, state: saved == identity)
+        if entry is None:
+            return None
+            
+        # Mark the entry as recently used for LRU eviction
+        os.utime(self.entry_path(file_path))
+        return entry['dataset']
+        
+    def load_state(self, file_path, identity):
+        """
+        Return the parse state saved for an earlier version of a file
+        
+        The entry only has to match the file's path and processor settings,
+        so the state of a log that has grown since can be resumed.
+        
+        Args:
+            file_path (str): Path to the source log file
+            identity (dict): Current file_identity of the file
+            
+        Returns:
+            tuple: (state dict, LogDataset), or None if no state was saved
+        """
+        def resumable(saved, state):
+            return state is not None and all(saved.get(key) == identity[key] for key in ('version', 'path', 'settings'))
+            
+        entry = self._read(file_path, resumable)
+        if entry is None:
+            return None
+            
+        return entry['state'], entry['dataset']
+        
+    def store(self, file_path, dataset, identity, state=None):
+        """
+        Save a processed dataset for a file and evict old entries
+        
+        Args:
+            file_path (str): Path to the source log file
+            dataset (LogDataset): Processed result
+            identity (dict): file_identity taken before the file was parsed
+            state (dict): Optional JSON-serialisable parse state for resuming
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry_path = self.entry_path(file_path)
+        
+        # Write to a temporary file first so readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    identity=np.array(json.dumps(identity)),
+                    state=np.array(json.dumps(state)),
+                    parameters=np.array(dataset.parameters, dtype=str),
+                    **dataset.columns()
+                )
+            os.replace(temp_path, entry_path)
+        except OSError as e:
+            print(f"Could not write cache entry {entry_path}: {e}")
+            self._remove(temp_path)
+            return
+            
+        self.evict()
+        
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_bytes"""
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = os.stat(entry)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+            
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(entry)
+            total -= size
+            
+    def clear(self):
+        """Remove every cache entry"""
+        for entry in self._entries():
+            self._remove(entry)
+            
+    def size(self):
+        """Total size of the cache entries in bytes"""
+        return sum(os.path.getsize(entry) for entry in self._entries())
+        
+    def entry_path(self, file_path):
+        """Location of the cache entry for a source file"""
+        key = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key + ENTRY_SUFFIX)
+        
+    def file_identity(self, file_path, settings=None, mapped=None):
+        """
+        Describe the current state of a source file
+        
+        Args:
+            file_path (str): Path to the source log file
+            settings (dict): Processor settings the result depends on
+            mapped (MappedFile): Already open map of the file, to avoid reopening it
+            
+        Returns:
+            dict: Path, size, mtime, content fingerprint and processor settings
+        """
+        if mapped is None:
+            with MappedFile(file_path) as mapped:
+                return self.file_identity(file_path, settings, mapped)
+                
+        return {
+            'version': CACHE_VERSION,
+            'path': os.path.abspath(file_path),
+            'size': mapped.size,
+            'mtime_ns': mapped.stat().st_mtime_ns,
+            'fingerprint': self.fingerprint(mapped),
+            'settings': settings or {}
+        }
+        
+    @staticmethod
+    def fingerprint(mapped):
+        """Hash samples from the start, middle and end of a mapped file"""
+        digest = hashlib.blake2b(digest_size=16)
+        size = mapped.size
+        offsets = sorted({0, max(0, size // 2 - FINGERPRINT_SAMPLE // 2), max(0, size - FINGERPRINT_SAMPLE)})
+        
+        for offset in offsets:
+            with mapped.view(offset, offset + FINGERPRINT_SAMPLE) as sample:
+                digest.update(sample)
+                
+        return digest.hexdigest()
+        
+    def _read(self, file_path, accept):
+        """
+        Read the entry of a file if accept(identity, state) approves it
+        
+        The column arrays are only loaded for accepted entries. Entries that
+        cannot be read are discarded.
+        """
+        entry_path = self.entry_path(file_path)
+        if not os.path.exists(entry_path):
+            return None
+            
+        try:
+            with np.load(entry_path, allow_pickle=False) as entry:
+                identity = json.loads(str(entry['identity']))
+                state = json.loads(str(entry['state']))
+                if not accept(identity, state):
+                    return None
+                    
+                return {
+                    'identity': identity,
+                    'state': state,
+                    'dataset': LogDataset(
+                        [str(parameter) for parameter in entry['parameters']],
+                        entry['codes'],
+                        entry['timestamps'],
+                        entry['min'],
+                        entry['max'],
+                        entry['avg'],
+                        entry['count']
+                    )
+                }
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Discarding unreadable cache entry {entry_path}: {e}")
+            self._remove(entry_path)
+            return None
+            
+    def _entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                if name.endswith(ENTRY_SUFFIX)]
+                
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
\ No newline at end of file
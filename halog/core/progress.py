@@ -0,0 +1,74 @@
+"""
+Progress Module for HALog
+Throttled byte progress and cooperative cancellation of long loads
+"""
+
+import threading
+import time
+
+# Shortest time between forwarded progress updates (at most 10 per second)
+PROGRESS_INTERVAL = 0.1
+
+class LoadCancelled(Exception):
+    """Raised inside a load that was asked to stop"""
+
+class CancelToken:
+    """
+    Stop flag shared between a load and whoever started it
+    
+    The load calls check() between units of work, so cancelling takes
+    effect at the next block boundary rather than immediately. A
+    multiprocessing Event can be given to share the flag with worker
+    processes.
+    """
+    
+    def __init__(self, event=None):
+        self._event = event if event is not None else threading.Event()
+        
+    def cancel(self):
+        """Ask the load to stop"""
+        self._event.set()
+        
+    @property
+    def cancelled(self):
+        """Whether cancel() was called"""
+        return self._event.is_set()
+        
+    def wait(self, timeout):
+        """Sleep up to timeout seconds, waking early on cancel; returns cancelled"""
+        return self._event.wait(timeout)
+        
+    def check(self):
+        """Raise LoadCancelled if cancel() was called"""
+        if self._event.is_set():
+            raise LoadCancelled("Loading was cancelled")
+
+class ProgressThrottle:
+    """
+    Forward (bytes_done, total_bytes) progress at a limited rate
+    
+    Updates arriving within interval seconds of the last forwarded one are
+    dropped, except the final update (bytes_done >= total_bytes), which is
+    forwarded so the receiver sees the load complete. A final update that
+    repeats one already forwarded, with no progress in between (a parser and
+    the ingest around it both reporting completion), is dropped as well.
+    """
+    
+    def __init__(self, callback, interval=PROGRESS_INTERVAL):
+        self.callback = callback
+        self.interval = interval
+        self._last = None
+        self._complete = False  # Whether a final update was the last one received
+        
+    def __call__(self, bytes_done, total_bytes):
+        now = time.monotonic()
+        if bytes_done >= total_bytes:
+            if self._complete:
+                return
+            self._complete = True
+        else:
+            self._complete = False
+            if self._last is not None and now - self._last < self.interval:
+                return
+        self._last = now
+        self.callback(bytes_done, total_bytes)
\ No newline at end of file
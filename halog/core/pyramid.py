@@ -0,0 +1,144 @@
+"""
+Rollup Pyramid Module for HALog
+Multi-resolution time rollups of a parameter series for zooming and panning
+"""
+
+import numpy as np
+
+from core.dataset import COUNT_DTYPE, VALUE_DTYPE, ParameterSeries
+
+MINUTE = 60 * 10**9  # Nanoseconds
+
+# Bucket widths of the rollup levels above the raw rows: 1 min, 10 min, 1 h, 1 day
+ROLLUP_WIDTHS = (MINUTE, 10 * MINUTE, 60 * MINUTE, 24 * 60 * MINUTE)
+
+def rollup(series, width):
+    """
+    Aggregate a series into fixed time buckets
+    
+    Each bucket holds the lowest min, the highest max, the summed count and
+    the count-weighted mean of its rows, and is stamped with its start time.
+    
+    Args:
+        series (ParameterSeries): Time-sorted rows
+        width (int): Bucket width in nanoseconds
+        
+    Returns:
+        ParameterSeries: One row per non-empty bucket
+    """
+    if len(series.timestamps) == 0:
+        return series
+        
+    keys = series.timestamps // width
+    starts = np.flatnonzero(np.diff(keys, prepend=keys[0] - 1))
+    
+    counts = np.add.reduceat(series.count.astype(np.uint64), starts)
+    totals = np.add.reduceat(series.avg.astype(np.float64) * series.count, starts)
+    
+    return ParameterSeries(
+        series.parameter,
+        keys[starts] * width,
+        np.minimum.reduceat(series.min, starts),
+        np.maximum.reduceat(series.max, starts),
+        (totals / counts).astype(VALUE_DTYPE),
+        counts.astype(COUNT_DTYPE)
+    )
+
+def _extend_rollup(level, finer, width):
+    """
+    Bring a rollup level up to date with the grown finer level it came from
+    
+    Args:
+        level (ParameterSeries): Previous rollup of the finer level
+        finer (ParameterSeries): The grown finer level
+        width (int): Bucket width in nanoseconds
+        
+    Returns:
+        ParameterSeries: Rollup of finer
+    """
+    if len(level.timestamps) == 0 or len(finer.timestamps) == 0:
+        return rollup(finer, width)
+        
+    # The first bucket may have lost rows and the last one gained some;
+    # every bucket strictly between them is complete and unchanged
+    first = int(finer.timestamps[0]) // width * width
+    last = int(level.timestamps[-1])
+    if first >= last:
+        return rollup(finer, width)
+        
+    head = rollup(_rows(finer, 0, np.searchsorted(finer.timestamps, first + width, side='left')), width)
+    kept = _rows(level, np.searchsorted(level.timestamps, first, side='right'), len(level.timestamps) - 1)
+    tail = rollup(_rows(finer, np.searchsorted(finer.timestamps, last, side='left'), len(finer.timestamps)), width)
+    columns = zip(*(part[1:] for part in (head, kept, tail)))
+    return ParameterSeries(level.parameter, *(np.concatenate(parts) for parts in columns))
+
+def _rows(series, start, stop):
+    """Rows [start, stop) of a series as views"""
+    return ParameterSeries(series.parameter, *(column[start:stop] for column in series[1:]))
+
+class RollupPyramid:
+    """
+    A parameter series together with coarser rollups of itself
+    
+    Level 0 is the series itself; every further level is rolled up from the
+    one below. Levels that would not at least halve the row count are left
+    out, so a short series costs almost nothing extra.
+    """
+    
+    def __init__(self, series, widths=ROLLUP_WIDTHS):
+        self.widths = widths
+        self.levels = [(0, series)]
+        self._add_levels(widths)
+        
+    def extend(self, series):
+        """
+        Follow a series that gained rows at its end and lost rows at its start
+        
+        Only the first and last bucket of each rollup level and the buckets
+        opened by the new rows are rolled up again; the complete buckets in
+        between are copied as they are. Levels left out so far can only be
+        added above the coarsest one.
+        
+        Args:
+            series (ParameterSeries): The grown series; its rows before the
+                previous last row must be unchanged
+        """
+        levels = [(0, series)]
+        for width, level in self.levels[1:]:
+            levels.append((width, _extend_rollup(level, levels[-1][1], width)))
+        self.levels = levels
+        coarsest = self.levels[-1][0]
+        self._add_levels([width for width in self.widths if width > coarsest])
+        
+    def _add_levels(self, widths):
+        """Roll up the coarsest level into every width that at least halves its rows"""
+        for width in widths:
+            finer = self.levels[-1][1]
+            level = rollup(finer, width)
+            if len(level.timestamps) * 2 <= len(finer.timestamps):
+                self.levels.append((width, level))
+                
+    def window(self, start, end, max_rows):
+        """
+        Fetch the rows covering a time window at the finest affordable level
+        
+        One row on either side of the window is included so lines run to
+        the plot edges.
+        
+        Args:
+            start (int): Window start in nanoseconds
+            end (int): Window end in nanoseconds
+            max_rows (int): Most rows wanted; the coarsest level is used if
+                no level fits
+                
+        Returns:
+            tuple: (bucket width in nanoseconds, 0 for raw rows;
+            ParameterSeries of views into that level)
+        """
+        for width, level in self.levels:
+            low = max(int(np.searchsorted(level.timestamps, start, side='left')) - 1, 0)
+            high = int(np.searchsorted(level.timestamps, end, side='right')) + 1
+            if high - low <= max_rows:
+                break
+                
+        return width, ParameterSeries(level.parameter, *(column[low:high] for column in level[1:]))
\ No newline at end of file
@@ -0,0 +1,150 @@
+"""
+Query Module for HALog
+Indexed statistics of a loaded dataset over arbitrary time windows
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Statistics of one parameter in a time window; min, max and mean are None
+# when the window holds no rows
+WindowStats = namedtuple('WindowStats', ['parameter', 'start', 'end', 'records', 'samples', 'min', 'max', 'mean'])
+
+class SeriesIndex:
+    """
+    Range statistics of one parameter series in O(log n) per query
+    
+    Rows are found by binary search on the sorted timestamps. Record and
+    sample counts and the count-weighted mean come from prefix sums; min and
+    max come from min/max trees whose level k holds the extreme of each run
+    of 2**k rows, so any row range is covered by at most two nodes per level.
+    """
+    
+    def __init__(self, series):
+        self.series = series
+        self.sample_sums = np.concatenate(([0], np.cumsum(series.count, dtype=np.uint64)))
+        self.value_sums = np.concatenate(([0.0], np.cumsum(series.avg.astype(np.float64) * series.count)))
+        self.min_levels = _extreme_levels(series.min, np.minimum, np.inf)
+        self.max_levels = _extreme_levels(series.max, np.maximum, -np.inf)
+        
+    def rows(self, start=None, end=None):
+        """Row range [first, stop) of the rows stamped from start to end inclusive"""
+        timestamps = self.series.timestamps
+        first = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+        stop = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side='right'))
+        return first, max(first, stop)
+        
+    def stats(self, start=None, end=None):
+        """
+        Statistics of the rows stamped from start to end inclusive
+        
+        Args:
+            start (int): Window start in nanoseconds (None = first row)
+            end (int): Window end in nanoseconds (None = last row)
+            
+        Returns:
+            WindowStats: Records, samples, lowest min, highest max and the
+            sample-weighted mean of the window
+        """
+        first, stop = self.rows(start, end)
+        if first == stop:
+            return WindowStats(self.series.parameter, start, end, 0, 0, None, None, None)
+            
+        samples = int(self.sample_sums[stop] - self.sample_sums[first])
+        if samples:
+            mean = (self.value_sums[stop] - self.value_sums[first]) / samples
+        else:
+            mean = float(self.series.avg[first:stop].mean())
+            
+        return WindowStats(
+            self.series.parameter,
+            start,
+            end,
+            stop - first,
+            samples,
+            float(_range_extreme(self.min_levels, first, stop, min, np.inf)),
+            float(_range_extreme(self.max_levels, first, stop, max, -np.inf)),
+            float(mean)
+        )
+
+class DatasetIndex:
+    """
+    Time-window statistics of every parameter of a LogDataset
+    
+    A parameter's SeriesIndex is built on its first query, which takes one
+    pass over its rows; every query after that is a few binary searches.
+    """
+    
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self._indexes = {}
+        
+    @property
+    def parameters(self):
+        return self.dataset.parameters
+        
+    def index(self, parameter):
+        """Return the SeriesIndex of a parameter, building it on first use"""
+        if parameter not in self._indexes:
+            self._indexes[parameter] = SeriesIndex(self.dataset.series(parameter))
+        return self._indexes[parameter]
+        
+    def stats(self, parameter, start=None, end=None):
+        """
+        Statistics of one parameter in a time window
+        
+        Args:
+            parameter (str): Parameter name
+            start: Window start: nanoseconds, a timestamp string, a datetime
+                or a pandas Timestamp (None = first row)
+            end: Window end, inclusive, in the same forms (None = last row)
+            
+        Returns:
+            WindowStats: Statistics of the window
+        """
+        return self.index(parameter).stats(to_nanoseconds(start), to_nanoseconds(end))
+        
+    def summary(self, start=None, end=None):
+        """Statistics of every parameter in a time window, in parameter order"""
+        return [self.stats(parameter, start, end) for parameter in self.parameters]
+
+def format_window_stats(stats):
+    """Format WindowStats as one line, e.g. 'flow: 12 records, min 1.00, max 3.00, mean 2.00'"""
+    if stats.records == 0:
+        return f"{stats.parameter}: no records"
+    return (f"{stats.parameter}: {stats.records} records, min {stats.min:.2f}, "
+            f"max {stats.max:.2f}, mean {stats.mean:.2f}")
+
+def to_nanoseconds(value):
+    """Convert a time to int64 nanoseconds since the epoch; None stays None"""
+    if value is None or isinstance(value, (int, np.integer)):
+        return value
+    return pd.Timestamp(value).value
+
+def _extreme_levels(values, reduce, fill):
+    """Levels of a min or max tree, from the values themselves upwards"""
+    levels = [values]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        if len(level) % 2:
+            level = np.append(level, level.dtype.type(fill))
+        levels.append(reduce(level[0::2], level[1::2]))
+    return levels
+
+def _range_extreme(levels, first, stop, pick, fill):
+    """Extreme of rows [first, stop) from a min or max tree"""
+    result = fill
+    for level in levels:
+        if first >= stop:
+            break
+        if first & 1:
+            result = pick(result, level[first])
+            first += 1
+        if stop & 1:
+            stop -= 1
+            result = pick(result, level[stop])
+        first >>= 1
+        stop >>= 1
+    return result
\ No newline at end of file
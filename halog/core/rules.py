@@ -0,0 +1,253 @@
+"""
+Rules Module for HALog
+Threshold and drift alarm rules evaluated over a whole dataset
+"""
+
+import re
+from collections import namedtuple
+
+import numpy as np
+
+# Statistic columns a rule can test
+RULE_FIELDS = ('avg', 'min', 'max')
+
+# Operators of a rule: the comparison a violating value passes and whether
+# a violation lies below the limit
+RULE_OPERATORS = {
+    '<': (np.less, True),
+    '<=': (np.less_equal, True),
+    '>': (np.greater, False),
+    '>=': (np.greater_equal, False)
+}
+
+# An alarm rule: the value of parameter.field (or its relative drift from
+# reference, which defaults to the parameter's median) compared with limit
+Rule = namedtuple('Rule', ['name', 'parameter', 'field', 'operator', 'limit', 'drift', 'reference'])
+
+# Violation intervals of one rule as parallel arrays: first and last
+# violating timestamp (ns), their difference, rows spanned and the most
+# extreme value tested in each interval
+RuleViolations = namedtuple('RuleViolations', ['rule', 'start', 'end', 'duration', 'rows', 'worst'])
+
+# parameter[.field] [drift] operator limit[%] [of reference], optionally named "name: ..."
+RULE_PATTERN = re.compile(
+    r'^(?:(?P<name>[^:]+):)?\s*(?P<parameter>\w+)(?:\.(?P<field>avg|min|max))?\s+'
+    r'(?:(?P<drift>drift)\s*)?(?P<operator><=|>=|<|>)\s*(?P<limit>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)'
+    r'(?P<percent>%)?(?:\s+of\s+(?P<reference>[-+]?(?:\d+\.?\d*|\.\d+)))?\s*$'
+)
+
+def parse_rule(text):
+    """
+    Parse one rule
+    
+    Examples: "pump_pressure < 40", "magnetron_flow.max >= 55",
+    "Flow drift: target_flow drift > 10%", "target_flow drift > 5% of 45"
+    
+    Args:
+        text (str): Rule in the syntax above
+        
+    Returns:
+        Rule: Parsed rule, named after its text unless a name is given
+        
+    Raises:
+        ValueError: If the text is not a valid rule
+    """
+    match = RULE_PATTERN.match(text.strip())
+    if match is None:
+        raise ValueError(f"Invalid rule: {text.strip()!r}")
+    if match['percent'] and not match['drift']:
+        raise ValueError(f"Percent limits are only valid for drift rules: {text.strip()!r}")
+        
+    limit = float(match['limit'])
+    if match['percent']:
+        limit /= 100
+    name = match['name'].strip() if match['name'] else text.strip()
+    reference = float(match['reference']) if match['reference'] else None
+    
+    return Rule(name, match['parameter'], match['field'] or 'avg', match['operator'],
+                limit, bool(match['drift']), reference)
+
+def load_rules(file_path):
+    """
+    Read rules from a text file, one per line; blank lines and # comments are skipped
+    
+    Raises:
+        ValueError: If a line is not a valid rule, naming its line number
+    """
+    rules = []
+    with open(file_path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            try:
+                rules.append(parse_rule(line))
+            except ValueError as e:
+                raise ValueError(f"{file_path}, line {number}: {e}") from None
+    return rules
+
+def evaluate_rules(dataset, rules, merge_gap=0):
+    """
+    Find the intervals in which each rule is violated
+    
+    The tested values (a column, or its drift) and their extremes are
+    computed once for all rules that share them. A rule whose limit lies
+    beyond the extremes never fires, or fires on every row, and needs no
+    scan; any other rule takes one comparison and one edge scan over the
+    values, so its cost does not depend on how often a noisy signal crosses
+    the limit, apart from the size of the output.
+    
+    Args:
+        dataset (LogDataset): Loaded data
+        rules (list): Rule tuples
+        merge_gap (int): Violations separated by at most this many
+            nanoseconds without one are merged into one interval
+            
+    Returns:
+        list: RuleViolations per rule, in rule order; rules whose parameter
+        is not in the dataset have no intervals
+    """
+    results = [None] * len(rules)
+    
+    groups = {}
+    for position, rule in enumerate(rules):
+        if rule.parameter not in dataset.parameters:
+            results[position] = _no_violations(rule)
+            continue
+        key = (rule.parameter, rule.field, rule.drift, rule.reference)
+        groups.setdefault(key, []).append(position)
+        
+    for (parameter, field, drift, reference), positions in groups.items():
+        series = dataset.series(parameter)
+        values = _tested_values(series, field, drift, reference)
+        
+        # Extremes of an empty column fail every test; NaN extremes decide nothing
+        low, high = (values.min(), values.max()) if len(values) else (np.inf, -np.inf)
+        known = not np.isnan(low)
+        
+        for position in positions:
+            rule = rules[position]
+            compare, below = RULE_OPERATORS[rule.operator]
+            nearest, farthest = (low, high) if below else (high, low)
+            if known and not compare(nearest, rule.limit):
+                results[position] = _no_violations(rule)
+                continue
+            if known and compare(farthest, rule.limit):
+                starts, stops = np.zeros(1, dtype=np.int64), np.full(1, len(values), dtype=np.int64)
+            else:
+                starts, stops = _violation_ranges(compare(values, rule.limit))
+            results[position] = _intervals(rule, series.timestamps, values, starts, stops, below, merge_gap)
+            
+    return results
+
+def violation_spans(results):
+    """
+    Merge the intervals of all rules per parameter, for shading on a plot
+    
+    Returns:
+        dict: parameter -> (starts, ends) arrays of non-overlapping intervals in ns
+    """
+    spans = {}
+    for result in results:
+        if len(result.start):
+            spans.setdefault(result.rule.parameter, []).append((result.start, result.end))
+            
+    for parameter, parts in spans.items():
+        starts = np.concatenate([start for start, _ in parts])
+        ends = np.concatenate([end for _, end in parts])
+        order = np.argsort(starts, kind='stable')
+        starts, ends = starts[order], np.maximum.accumulate(ends[order])
+        # An interval starting after every earlier one has ended opens a new span
+        opens = np.concatenate(([True], starts[1:] > ends[:-1]))
+        first = np.flatnonzero(opens)
+        last = np.concatenate((first[1:], [len(starts)])) - 1
+        spans[parameter] = (starts[first], ends[last])
+    return spans
+
+def format_violations(result):
+    """Format RuleViolations as one line, e.g. 'pump_pressure < 40: 2 intervals, 5m 00s total, worst 37.84'"""
+    if len(result.start) == 0:
+        return f"{result.rule.name}: no violations"
+    worst = min(result.worst) if RULE_OPERATORS[result.rule.operator][1] else max(result.worst)
+    worst = f"{worst:.1%}" if result.rule.drift else f"{worst:.2f}"
+    return (f"{result.rule.name}: {len(result.start)} interval{'s' if len(result.start) != 1 else ''}, "
+            f"{format_duration(int(result.duration.sum()))} total, worst {worst}")
+
+def format_duration(nanoseconds):
+    """Format a duration as e.g. '2h 05m 09s' or '45s'"""
+    seconds = nanoseconds // 10**9
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m {seconds:02d}s"
+    if minutes:
+        return f"{minutes}m {seconds:02d}s"
+    return f"{seconds}s"
+
+def _tested_values(series, field, drift, reference):
+    """The values a rule compares with its limit: a statistic, or its relative drift"""
+    values = np.asarray(getattr(series, field), dtype=np.float64)
+    if not drift:
+        return values
+    if reference is None:
+        reference = float(np.median(values)) if len(values) else 0.0
+    if reference == 0:
+        raise ValueError(f"Drift of {series.parameter} is undefined against a reference of 0")
+    return np.abs(values - reference) / abs(reference)
+
+def _violation_ranges(violating):
+    """
+    Row ranges in which a rule is violated
+    
+    Args:
+        violating (numpy.ndarray): Whether each row violates the rule
+        
+    Returns:
+        tuple: (starts, stops) arrays of [start, stop) row ranges
+    """
+    n = len(violating)
+    if n == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        
+    # Rows where the state differs from the row before open or close a range
+    edges = np.flatnonzero(violating[1:] != violating[:-1]) + 1
+    if violating[0]:
+        edges = np.concatenate(([0], edges))
+    if violating[-1]:
+        edges = np.concatenate((edges, [n]))
+    edges = edges.astype(np.int64, copy=False)
+    return edges[0::2], edges[1::2]
+
+def _intervals(rule, timestamps, values, starts, stops, below, merge_gap):
+    """Turn [start, stop) row ranges into RuleViolations, merging ranges closer than merge_gap"""
+    if len(starts) > 1 and merge_gap > 0:
+        # Keep a range only if the gap before it is too long to bridge
+        keep = np.concatenate(([True], timestamps[starts[1:]] - timestamps[stops[:-1] - 1] > merge_gap))
+        last = np.concatenate((np.flatnonzero(keep)[1:], [len(starts)])) - 1
+        starts, stops = starts[keep], stops[last]
+        
+    if len(starts) == 0:
+        return _no_violations(rule)
+        
+    # A noisy signal mostly violates for single rows, whose value is the
+    # worst; longer ranges are reduced over alternating start/stop
+    # boundaries, whose even segments are the ranges. Rows bridged by
+    # merge_gap do not violate, so they never change the worst value
+    rows = stops - starts
+    worst = values[starts]
+    longer = np.flatnonzero(rows > 1)
+    if len(longer):
+        boundaries = np.column_stack((starts[longer], stops[longer])).ravel()
+        if boundaries[-1] == len(values):
+            boundaries = boundaries[:-1]
+        reduce = np.minimum if below else np.maximum
+        worst[longer] = reduce.reduceat(values, boundaries)[0::2]
+        
+    start = timestamps[starts]
+    end = timestamps[stops - 1]
+    return RuleViolations(rule, start, end, end - start, rows, worst)
+
+def _no_violations(rule):
+    """RuleViolations of a rule without intervals"""
+    empty = np.empty(0, dtype=np.int64)
+    return RuleViolations(rule, empty, empty, empty, empty, np.empty(0))
\ No newline at end of file
@@ -0,0 +1,251 @@
+"""
+History Store Module for HALog
+Local SQLite store of processed logs per machine, queried by time window
+"""
+
+import os
+import sqlite3
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from core.dataset import CODE_DTYPE, COUNT_DTYPE, TIMESTAMP_DTYPE, VALUE_DTYPE, LogDataset
+from core.query import to_nanoseconds
+
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser('~'), '.halog', 'history.db')
+
+# Machine name used when none is given
+DEFAULT_MACHINE = 'default'
+
+# Rows of one parameter stored per chunk
+CHUNK_ROWS = 16384
+
+# Bump when the schema or the chunk encoding changes
+STORE_VERSION = 1
+
+# Column blobs of a chunk, in ParameterSeries order
+CHUNK_COLUMNS = (('timestamps', TIMESTAMP_DTYPE), ('min', VALUE_DTYPE), ('max', VALUE_DTYPE),
+                 ('avg', VALUE_DTYPE), ('count', COUNT_DTYPE))
+
+# Outcome of HistoryStore.ingest_file: rows stored (0 if the file was already
+# stored unchanged) and seconds spent parsing and storing
+IngestResult = namedtuple('IngestResult', ['file', 'rows', 'parse_seconds', 'store_seconds'])
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS machines (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS parameters (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY, machine INTEGER NOT NULL, path TEXT NOT NULL,
+    size INTEGER, mtime_ns INTEGER, rows INTEGER, ingested REAL, UNIQUE (machine, path)
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    machine INTEGER NOT NULL, parameter INTEGER NOT NULL, start INTEGER NOT NULL, end INTEGER NOT NULL,
+    file INTEGER, rows INTEGER NOT NULL,
+    {', '.join(f'{name} BLOB NOT NULL' for name, _ in CHUNK_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS chunks_window ON chunks (machine, parameter, start);
+CREATE INDEX IF NOT EXISTS chunks_file ON chunks (file);
+PRAGMA user_version = {STORE_VERSION};
+"""
+
+class HistoryStore:
+    """
+    Processed statistics of many logs, kept per machine in one SQLite file
+    
+    Each parameter's rows are stored in time-sorted chunks of up to
+    CHUNK_ROWS rows, one binary column per statistic, indexed on (machine,
+    parameter, chunk start). A window query reads only the chunks that
+    overlap it and decodes them straight into numpy arrays, so neither
+    ingest nor queries pay for one SQL row per record.
+    
+    A connection belongs to the thread that opened the store.
+    """
+    
+    def __init__(self, path=None):
+        self.path = path or os.environ.get('HALOG_HISTORY') or DEFAULT_STORE_PATH
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        
+        self.connection = sqlite3.connect(self.path)
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version not in (0, STORE_VERSION):
+            self.connection.close()
+            raise ValueError(f"{self.path} is a version {version} history store, expected {STORE_VERSION}")
+            
+        # WAL lets queries run while another process ingests
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        self.connection.execute('PRAGMA synchronous = NORMAL')
+        self.connection.executescript(SCHEMA)
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, *exc_info):
+        self.close()
+        
+    def close(self):
+        """Close the database connection"""
+        self.connection.close()
+        
+    def machines(self):
+        """Names of the machines with stored data"""
+        return [name for name, in self.connection.execute(
+            'SELECT name FROM machines WHERE id IN (SELECT DISTINCT machine FROM chunks) ORDER BY name')]
+            
+    def parameters(self, machine=DEFAULT_MACHINE):
+        """Names of the parameters stored for a machine"""
+        return [name for name, in self.connection.execute(
+            'SELECT name FROM parameters WHERE id IN (SELECT DISTINCT parameter FROM chunks WHERE machine = ?) '
+            'ORDER BY id', (self._machine_id(machine),))]
+            
+    def time_range(self, machine=DEFAULT_MACHINE):
+        """Return the first and last stored timestamp of a machine as pandas Timestamps"""
+        start, end = self.connection.execute('SELECT MIN(start), MAX(end) FROM chunks WHERE machine = ?',
+                                             (self._machine_id(machine),)).fetchone()
+        if start is None:
+            return None, None
+        return pd.Timestamp(start), pd.Timestamp(end)
+        
+    def ingest(self, dataset, machine=DEFAULT_MACHINE, file_id=None):
+        """
+        Store the rows of a dataset for a machine in one transaction
+        
+        Args:
+            dataset (LogDataset): Processed rows
+            machine (str): Machine the rows belong to
+            file_id (int): Row of the files table the rows came from
+            
+        Returns:
+            int: Rows stored
+        """
+        with self.connection:
+            return self._insert(dataset, self._machine_id(machine, create=True), file_id)
+            
+    def ingest_file(self, file_path, machine=DEFAULT_MACHINE, processor=None):
+        """
+        Parse a log file and store its rows, replacing any earlier version
+        
+        A file stored before with the same size and modification time is
+        skipped. The old rows of a changed file are deleted in the same
+        transaction that stores the new ones. A file without records fails
+        and stores nothing.
+        
+        Args:
+            file_path (str): Path to the log file
+            machine (str): Machine the log belongs to
+            processor (DataProcessor): Processor to parse with (default: a new one)
+            
+        Returns:
+            IngestResult: Rows stored and seconds spent parsing and storing
+            
+        Raises:
+            OSError, ValueError: If the file cannot be read or holds no records
+            Exception: If the parser rejects the file
+        """
+        from core.data_processor import DataProcessor
+        
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        machine_id = self._machine_id(machine, create=True)
+        stored = self.connection.execute('SELECT id, size, mtime_ns FROM files WHERE machine = ? AND path = ?',
+                                         (machine_id, path)).fetchone()
+        if stored is not None and stored[1:] == (stat.st_size, stat.st_mtime_ns):
+            return IngestResult(path, 0, 0.0, 0.0)
+            
+        started = time.perf_counter()
+        # Never store the sample data shown for a file without records
+        dataset = (processor or DataProcessor()).ingest(path, sample_fallback=False).dataset
+        parsed = time.perf_counter()
+        
+        with self.connection:
+            if stored is not None:
+                self.connection.execute('DELETE FROM chunks WHERE file = ?', (stored[0],))
+                self.connection.execute('DELETE FROM files WHERE id = ?', (stored[0],))
+            file_id = self.connection.execute(
+                'INSERT INTO files (machine, path, size, mtime_ns, rows, ingested) VALUES (?, ?, ?, ?, ?, ?)',
+                (machine_id, path, stat.st_size, stat.st_mtime_ns, len(dataset), time.time())).lastrowid
+            rows = self._insert(dataset, machine_id, file_id)
+            
+        return IngestResult(path, rows, round(parsed - started, 6), round(time.perf_counter() - parsed, 6))
+        
+    def query(self, machine=DEFAULT_MACHINE, start=None, end=None, parameters=None):
+        """
+        Read the stored rows of a machine in a time window
+        
+        Args:
+            machine (str): Machine name
+            start: Window start: nanoseconds, a timestamp string, a datetime
+                or a pandas Timestamp (None = first row)
+            end: Window end, inclusive, in the same forms (None = last row)
+            parameters (list): Parameters to read (default: all)
+            
+        Returns:
+            LogDataset: The rows in the window; rows stored twice by
+            overlapping files are kept once
+        """
+        start, end = to_nanoseconds(start), to_nanoseconds(end)
+        machine_id = self._machine_id(machine)
+        names = self.parameters(machine) if parameters is None else list(parameters)
+        
+        datasets = []
+        for code, name in enumerate(names):
+            parameter_id = self._parameter_id(name)
+            if machine_id is None or parameter_id is None:
+                continue
+                
+            sql = f"SELECT {', '.join(name for name, _ in CHUNK_COLUMNS)} FROM chunks WHERE machine = ? AND parameter = ?"
+            args = [machine_id, parameter_id]
+            if end is not None:
+                sql += ' AND start <= ?'
+                args.append(int(end))
+            if start is not None:
+                sql += ' AND end >= ?'
+                args.append(int(start))
+                
+            for blobs in self.connection.execute(sql + ' ORDER BY start', args):
+                columns = [np.frombuffer(blob, dtype=dtype) for blob, (_, dtype) in zip(blobs, CHUNK_COLUMNS)]
+                first = 0 if start is None else np.searchsorted(columns[0], start, side='left')
+                stop = len(columns[0]) if end is None else np.searchsorted(columns[0], end, side='right')
+                if stop > first:
+                    codes = np.full(stop - first, code, dtype=CODE_DTYPE)
+                    datasets.append(LogDataset(names, codes, *(column[first:stop] for column in columns)))
+                    
+        if not datasets:
+            return LogDataset(names, np.empty(0, CODE_DTYPE), *(np.empty(0, dtype) for _, dtype in CHUNK_COLUMNS))
+        return LogDataset.union(datasets)
+        
+    def _insert(self, dataset, machine_id, file_id):
+        """Write a dataset's rows as chunks; runs inside the caller's transaction"""
+        chunks = []
+        for parameter in dataset.parameters:
+            series = dataset.series(parameter)
+            parameter_id = self._parameter_id(parameter, create=True)
+            for first in range(0, len(series.timestamps), CHUNK_ROWS):
+                rows = slice(first, first + CHUNK_ROWS)
+                timestamps = series.timestamps[rows]
+                chunks.append((machine_id, parameter_id, int(timestamps[0]), int(timestamps[-1]), file_id,
+                               len(timestamps), *(np.ascontiguousarray(column[rows], dtype=dtype).tobytes()
+                                                  for column, (_, dtype) in zip(series[1:], CHUNK_COLUMNS))))
+                                                  
+        self.connection.executemany(
+            f"INSERT INTO chunks (machine, parameter, start, end, file, rows, "
+            f"{', '.join(name for name, _ in CHUNK_COLUMNS)}) VALUES ({', '.join('?' * (6 + len(CHUNK_COLUMNS)))})",
+            chunks)
+        return len(dataset)
+        
+    def _machine_id(self, name, create=False):
+        return self._name_id('machines', name, create)
+        
+    def _parameter_id(self, name, create=False):
+        return self._name_id('parameters', name, create)
+        
+    def _name_id(self, table, name, create):
+        """Id of a machine or parameter name, added first if create is set"""
+        row = self.connection.execute(f'SELECT id FROM {table} WHERE name = ?', (name,)).fetchone()
+        if row is not None:
+            return row[0]
+        if not create:
+            return None
+        return self.connection.execute(f'INSERT INTO {table} (name) VALUES (?)', (name,)).lastrowid
\ No newline at end of file
@@ -0,0 +1,341 @@
+"""
+Summary Module for HALog
+Per-parameter summary statistics accumulated in one pass while a log is parsed
+"""
+
+import copy
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Relative error of the quantiles estimated by a QuantileSketch
+SKETCH_ACCURACY = 0.01
+
+# Most buckets kept per sign; beyond it the buckets nearest zero are merged
+SKETCH_MAX_BUCKETS = 2048
+
+# Values closer to zero than this are counted in the sketch's zero bucket
+SKETCH_MIN_VALUE = 1e-9
+
+# Quantiles of the record averages reported by default
+SUMMARY_QUANTILES = (0.05, 0.5, 0.95)
+
+# Whole-file statistics of one parameter: records and samples, first and last
+# timestamp (ns), lowest min and highest max, then the sample-weighted mean,
+# standard deviation and quantiles (dict) of the record averages, which are
+# None when the records hold no samples
+SummaryStats = namedtuple('SummaryStats', ['parameter', 'records', 'samples', 'first', 'last',
+                                           'min', 'max', 'mean', 'std', 'quantiles'])
+
+class QuantileSketch:
+    """
+    Mergeable quantile estimates with a relative error bound (DDSketch)
+    
+    Values are counted in logarithmic buckets: bucket k holds the magnitudes
+    in (gamma**(k - 1), gamma**k] with gamma = (1 + a) / (1 - a), so the
+    middle of the bucket a quantile falls in is within a relative error a of
+    it. Positive and negative values are counted separately and values near
+    zero in a bucket of their own. Adding a block of values is one bincount,
+    and two sketches merge by adding their bucket counts.
+    """
+    
+    def __init__(self, relative_accuracy=SKETCH_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = np.log(self.gamma)
+        self.positive = _BucketStore()
+        self.negative = _BucketStore()
+        self.zero = 0.0
+        
+    @property
+    def count(self):
+        """Total weight of the values added"""
+        return self.positive.total + self.negative.total + self.zero
+        
+    def add(self, values, weights=None):
+        """
+        Count values, each with a weight (default 1)
+        
+        Args:
+            values (numpy.ndarray): Finite values
+            weights (numpy.ndarray): Non-negative weight per value
+        """
+        values = np.asarray(values, dtype=np.float64)
+        weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=np.float64)
+        
+        positive = values > SKETCH_MIN_VALUE
+        negative = values < -SKETCH_MIN_VALUE
+        self.positive.add(self._keys(values[positive]), weights[positive])
+        self.negative.add(self._keys(-values[negative]), weights[negative])
+        self.zero += weights[~(positive | negative)].sum()
+        
+    def merge(self, other):
+        """
+        Add the counts of another sketch to this one
+        
+        Raises:
+            ValueError: If the sketches have different accuracies
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Only sketches with the same relative accuracy can be merged")
+        self.positive.merge(other.positive)
+        self.negative.merge(other.negative)
+        self.zero += other.zero
+        
+    def quantile(self, q):
+        """
+        Estimate a weighted quantile
+        
+        Args:
+            q (float): Quantile between 0 and 1
+            
+        Returns:
+            float: Estimate of the smallest value with at least q of the
+            weight at or below it, or None if the sketch is empty
+        """
+        total = self.count
+        if total <= 0:
+            return None
+            
+        # Buckets in value order: negatives from the largest magnitude, zero, positives
+        negative_keys = self.negative.keys()[::-1]
+        values = np.concatenate((-self._value(negative_keys), [0.0], self._value(self.positive.keys())))
+        weights = np.concatenate((self.negative.counts[::-1], [self.zero], self.positive.counts))
+        
+        filled = weights > 0
+        cumulative = np.cumsum(weights[filled])
+        bucket = min(int(np.searchsorted(cumulative, q * total, side='left')), len(cumulative) - 1)
+        return float(values[filled][bucket])
+        
+    def _keys(self, magnitudes):
+        """Bucket of each magnitude"""
+        return np.ceil(np.log(magnitudes) / self.log_gamma).astype(np.int64)
+        
+    def _value(self, keys):
+        """Representative magnitude of each bucket, equally far in relative terms from its bounds"""
+        return 2 * np.power(self.gamma, keys.astype(np.float64)) / (self.gamma + 1)
+
+class ParameterSummary:
+    """
+    Running statistics of the records of one parameter
+    
+    Blocks of records are folded in with the parallel form of Welford's
+    update (Chan et al.): each block's weighted mean and sum of squared
+    deviations are computed in bulk and combined with the running ones, which
+    stays exact in floating point where summing squares would not.
+    """
+    
+    def __init__(self, parameter, relative_accuracy=SKETCH_ACCURACY):
+        self.parameter = parameter
+        self.records = 0
+        self.samples = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sample-weighted sum of squared deviations from mean
+        self.min = np.inf
+        self.max = -np.inf
+        self.first = None
+        self.last = None
+        self.sketch = QuantileSketch(relative_accuracy)
+        
+    def add(self, timestamps, min_values, max_values, avg_values, counts):
+        """Fold in a block of records given as parallel arrays"""
+        if len(timestamps) == 0:
+            return
+            
+        self.records += len(timestamps)
+        self.min = float(np.fmin(self.min, np.fmin.reduce(min_values)))
+        self.max = float(np.fmax(self.max, np.fmax.reduce(max_values)))
+        first, last = int(timestamps.min()), int(timestamps.max())
+        self.first = first if self.first is None else min(self.first, first)
+        self.last = last if self.last is None else max(self.last, last)
+        
+        # Records without samples have no average to weigh
+        weights = np.asarray(counts, dtype=np.float64)
+        weighted = weights > 0
+        if not weighted.all():
+            weights, avg_values = weights[weighted], avg_values[weighted]
+        samples = weights.sum()
+        if samples == 0:
+            return
+            
+        values = np.asarray(avg_values, dtype=np.float64)
+        mean = float(np.dot(values, weights) / samples)
+        deviations = values - mean
+        self._combine(samples, mean, np.dot(weights, deviations * deviations))
+        self.sketch.add(values, weights)
+        
+    def merge(self, other):
+        """Fold in the summary of other records of the same parameter"""
+        if other.records == 0:
+            return
+        self.records += other.records
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.first = other.first if self.first is None else min(self.first, other.first)
+        self.last = other.last if self.last is None else max(self.last, other.last)
+        if other.samples:
+            self._combine(other.samples, other.mean, other.m2)
+            self.sketch.merge(other.sketch)
+            
+    def stats(self, quantiles=SUMMARY_QUANTILES):
+        """Return the statistics so far as SummaryStats"""
+        mean = std = estimates = None
+        if self.samples:
+            mean = self.mean
+            std = float(np.sqrt(self.m2 / (self.samples - 1))) if self.samples > 1 else 0.0
+            estimates = {q: self.sketch.quantile(q) for q in quantiles}
+        return SummaryStats(self.parameter, self.records, self.samples, self.first, self.last,
+                            self.min, self.max, mean, std, estimates)
+                            
+    def _combine(self, samples, mean, m2):
+        """Combine running weight, mean and M2 with those of another set of records"""
+        total = self.samples + samples
+        delta = mean - self.mean
+        self.mean += delta * samples / total
+        self.m2 += m2 + delta * delta * self.samples * samples / total
+        self.samples = int(total)
+
+class StreamingSummary:
+    """
+    Per-parameter ParameterSummary of every record seen, updated block by block
+    
+    Parsers hand each block of records to add_records as soon as it is
+    parsed, so the summary of a file is complete when its last block is.
+    Summaries of separate parts of a log can be merged.
+    """
+    
+    def __init__(self, relative_accuracy=SKETCH_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.summaries = {}  # Parameter -> ParameterSummary, in order of first appearance
+        
+    @property
+    def parameters(self):
+        return list(self.summaries)
+        
+    def __len__(self):
+        """Records seen"""
+        return sum(summary.records for summary in self.summaries.values())
+        
+    @classmethod
+    def from_dataset(cls, dataset, relative_accuracy=SKETCH_ACCURACY):
+        """Summarize a dataset that was not parsed with a summary (a cache hit, for instance)"""
+        summary = cls(relative_accuracy)
+        for parameter in dataset.parameters:
+            series = dataset.series(parameter)
+            summary.parameter(parameter).add(*series[1:])
+        return summary
+        
+    def parameter(self, name):
+        """Return the ParameterSummary of a parameter, adding it on first use"""
+        if name not in self.summaries:
+            self.summaries[name] = ParameterSummary(name, self.relative_accuracy)
+        return self.summaries[name]
+        
+    def add_records(self, records):
+        """
+        Fold in a records frame
+        
+        Args:
+            records (pandas.DataFrame): Rows indexed by timestamp with
+                parameter, count, min, max and avg columns, as produced by
+                the parsers; rows of different parameters may be interleaved
+        """
+        if records.empty:
+            return
+            
+        parameters = records['parameter']
+        if isinstance(parameters.dtype, pd.CategoricalDtype):
+            codes, names = parameters.cat.codes.to_numpy(), parameters.cat.categories
+        else:
+            codes, names = pd.factorize(parameters)
+        timestamps = np.asarray(pd.DatetimeIndex(records.index)).astype('datetime64[ns]').view(np.int64)
+        columns = [timestamps] + [records[name].to_numpy() for name in ('min', 'max', 'avg', 'count')]
+        
+        # A stable sort of small integer codes is a radix sort, so grouping is
+        # linear; each group then starts with its parameter's first row
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(names) + 1))
+        present = np.flatnonzero(bounds[1:] > bounds[:-1])
+        for code in present[np.argsort(order[bounds[present]])]:
+            rows = order[bounds[code]:bounds[code + 1]]
+            self.parameter(str(names[code])).add(*(column[rows] for column in columns))
+            
+    def merge(self, other):
+        """Fold in the summary of another part of the same data"""
+        for name, summary in other.summaries.items():
+            self.parameter(name).merge(summary)
+            
+    def copy(self):
+        """Independent copy that can be updated without changing this one"""
+        return copy.deepcopy(self)
+        
+    def time_range(self):
+        """Return the first and last timestamp seen, in nanoseconds"""
+        if not self.summaries:
+            return None, None
+        return (min(summary.first for summary in self.summaries.values()),
+                max(summary.last for summary in self.summaries.values()))
+                
+    def stats(self, quantiles=SUMMARY_QUANTILES):
+        """SummaryStats of every parameter, in order of first appearance"""
+        return [summary.stats(quantiles) for summary in self.summaries.values()]
+
+def format_summary(stats):
+    """Format SummaryStats as one line, e.g. 'flow: 12 records, min 1.00, max 3.00, mean 2.00, std 0.50, p50 2.01'"""
+    line = f"{stats.parameter}: {stats.records} records, min {stats.min:.2f}, max {stats.max:.2f}"
+    if stats.mean is None:
+        return line
+    line += f", mean {stats.mean:.2f}, std {stats.std:.2f}"
+    return line + "".join(f", p{100 * q:g} {value:.2f}" for q, value in stats.quantiles.items())
+
+class _BucketStore:
+    """Weights of a run of consecutive bucket keys, in one array starting at offset"""
+    
+    def __init__(self):
+        self.offset = 0
+        self.counts = np.zeros(0)
+        
+    @property
+    def total(self):
+        return float(self.counts.sum())
+        
+    def keys(self):
+        return np.arange(self.offset, self.offset + len(self.counts))
+        
+    def add(self, keys, weights):
+        if len(keys) == 0:
+            return
+        low, high = int(keys.min()), int(keys.max())
+        self._cover(low, high)
+        start = low - self.offset
+        self.counts[start:start + high - low + 1] += np.bincount(keys - low, weights, minlength=high - low + 1)
+        self._collapse()
+        
+    def merge(self, other):
+        if len(other.counts) == 0:
+            return
+        self._cover(other.offset, other.offset + len(other.counts) - 1)
+        start = other.offset - self.offset
+        self.counts[start:start + len(other.counts)] += other.counts
+        self._collapse()
+        
+    def _cover(self, low, high):
+        """Grow the array to hold keys low to high"""
+        if len(self.counts) == 0:
+            self.offset, self.counts = low, np.zeros(high - low + 1)
+            return
+        new_low, new_high = min(low, self.offset), max(high, self.offset + len(self.counts) - 1)
+        if new_low == self.offset and new_high - new_low + 1 == len(self.counts):
+            return
+        counts = np.zeros(new_high - new_low + 1)
+        counts[self.offset - new_low:self.offset - new_low + len(self.counts)] = self.counts
+        self.offset, self.counts = new_low, counts
+        
+    def _collapse(self):
+        """Merge the lowest keys into one bucket when there are more than SKETCH_MAX_BUCKETS"""
+        excess = len(self.counts) - SKETCH_MAX_BUCKETS
+        if excess > 0:
+            self.counts[excess] += self.counts[:excess].sum()
+            self.counts = self.counts[excess:].copy()
+            self.offset += excess
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""
+Timeline Module for HALog
+Concurrent loading of several log files into one merged dataset
+"""
+
+import multiprocessing
+import os
+import queue
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from core.data_processor import DataProcessor
+from core.dataset import LogDataset
+from core.file_handler import FileHandler
+from core.progress import PROGRESS_INTERVAL, CancelToken, LoadCancelled, ProgressThrottle
+from core.timing import StageTimer
+
+# Files are only spread over a process pool when together they exceed this
+# size: each worker imports pandas and numpy first, which costs about a second
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+
+# Outcome of load_timeline: the merged dataset, one result dict per file in
+# input order and seconds spent per stage
+TimelineResult = namedtuple('TimelineResult', ['dataset', 'files', 'timings'])
+
+# Progress queue and cancel flag of a worker process, set by _init_worker
+_worker_queue = None
+_worker_cancel = None
+
+def load_timeline_file(file_path, cache=None, progress_callback=None, cancel_token=None):
+    """
+    Ingest one file of a timeline
+    
+    Failures other than cancellation are returned rather than raised, so one
+    unreadable file does not stop the others from loading.
+    
+    Args:
+        file_path (str): Path to the log file
+        cache (ParseCache): Optional parse cache
+        progress_callback (callable): Called with (bytes_done, total_bytes)
+        cancel_token (CancelToken): Stops the load between blocks
+        
+    Returns:
+        tuple: (result dict with file, bytes, seconds, error and records;
+        LogDataset, or None on failure)
+    """
+    started = time.perf_counter()
+    result = {'file': file_path, 'bytes': 0, 'seconds': 0.0, 'error': None, 'records': 0}
+    dataset = None
+    
+    try:
+        result['bytes'] = os.path.getsize(file_path)
+        processor = DataProcessor(cache=cache, cancel_token=cancel_token)
+        dataset = processor.ingest(file_path, progress_callback, FileHandler(), sample_fallback=False).dataset
+        result['records'] = len(dataset)
+    except LoadCancelled:
+        raise
+    except Exception as e:
+        result['error'] = str(e)
+        
+    result['seconds'] = round(time.perf_counter() - started, 6)
+    return result, dataset
+
+def load_timeline(file_paths, cache=None, workers=None, progress_callback=None, cancel_token=None):
+    """
+    Load several log files concurrently and merge them into one dataset
+    
+    Files are parsed in a process pool when there is more than one worker
+    and enough data to pay for starting it, otherwise one after another.
+    The datasets are combined with LogDataset.union, so records that appear
+    in two overlapping files are kept once and every parameter's rows are
+    in time order.
+    
+    Args:
+        file_paths (list): Paths of the log files
+        cache (ParseCache): Optional parse cache shared by all workers
+        workers (int): Worker processes (default: one per file, at most one per CPU)
+        progress_callback (callable): Called with (file index, bytes_done,
+            total_bytes) as each file is parsed, at most about 10 times a
+            second per file
+        cancel_token (CancelToken): Stops every file's load
+        
+    Returns:
+        TimelineResult: Merged dataset, per-file results and stage timings
+        
+    Raises:
+        ValueError: If no file could be loaded
+        LoadCancelled: If cancel_token was cancelled
+    """
+    timer = StageTimer()
+    if workers is None:
+        workers = min(len(file_paths), os.cpu_count() or 1)
+        
+    total_bytes = sum(os.path.getsize(path) for path in file_paths if os.path.isfile(path))
+    if workers > 1 and len(file_paths) > 1 and total_bytes >= PARALLEL_MIN_BYTES:
+        loaded = _load_parallel(file_paths, cache, workers, progress_callback, cancel_token)
+    else:
+        loaded = []
+        for index, file_path in enumerate(file_paths):
+            callback = None
+            if progress_callback:
+                callback = ProgressThrottle(lambda done, total, index=index: progress_callback(index, done, total))
+            loaded.append(load_timeline_file(file_path, cache, callback, cancel_token))
+    timer.lap('parse')
+    
+    files = [result for result, _ in loaded]
+    datasets = [dataset for _, dataset in loaded if dataset is not None]
+    if not datasets:
+        raise ValueError("No records found in any of the selected files")
+        
+    dataset = LogDataset.union(datasets)
+    timer.lap('merge')
+    return TimelineResult(dataset, files, timer.timings)
+
+def _load_parallel(file_paths, cache, workers, progress_callback, cancel_token):
+    """Run load_timeline_file in a process pool; returns (result, dataset) in input order"""
+    # Spawn keeps workers independent of GUI threads and matches Windows behaviour
+    context = multiprocessing.get_context('spawn')
+    progress = context.Queue()
+    cancel = context.Event()
+    loaded = [None] * len(file_paths)
+    
+    with ProcessPoolExecutor(max_workers=min(workers, len(file_paths)), mp_context=context,
+                             initializer=_init_worker, initargs=(progress, cancel)) as pool:
+        futures = {pool.submit(_load_in_worker, index, path, cache): index for index, path in enumerate(file_paths)}
+        pending = set(futures)
+        finished = set()
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+                if cancel_token is not None and cancel_token.cancelled:
+                    raise LoadCancelled("Loading was cancelled")
+                    
+                _forward_progress(progress, progress_callback, finished)
+                for future in done:
+                    index = futures[future]
+                    loaded[index] = future.result()
+                    finished.add(index)
+                    if progress_callback:
+                        # Queued updates may lag the result, so report completion here
+                        size = loaded[index][0]['bytes']
+                        progress_callback(index, size, size)
+        finally:
+            if pending:
+                # Running workers stop at their next block; queued files never start
+                cancel.set()
+                for future in pending:
+                    future.cancel()
+                
+    return loaded
+
+def _forward_progress(progress, progress_callback, finished):
+    """Pass queued (index, bytes_done, total_bytes) updates of unfinished files to the callback"""
+    while True:
+        try:
+            update = progress.get_nowait()
+        except queue.Empty:
+            return
+        if progress_callback and update[0] not in finished:
+            progress_callback(*update)
+
+def _init_worker(progress, cancel):
+    """Keep the pool's progress queue and cancel flag in the worker process"""
+    global _worker_queue, _worker_cancel
+    _worker_queue, _worker_cancel = progress, cancel
+
+def _load_in_worker(index, file_path, cache):
+    """Load one file in a worker process, reporting progress through the queue"""
+    callback = ProgressThrottle(lambda done, total: _worker_queue.put((index, done, total)))
+    return load_timeline_file(file_path, cache, callback, CancelToken(_worker_cancel))
\ No newline at end of file
@@ -0,0 +1,28 @@
+"""
+Timing Module for HALog
+Wall-clock timing of pipeline stages
+"""
+
+import time
+
+class StageTimer:
+    """Collects the seconds spent in consecutive stages of a pipeline"""
+    
+    def __init__(self):
+        self.timings = {}
+        self._last = time.perf_counter()
+        
+    def lap(self, stage):
+        """Charge the time since the previous lap to a stage"""
+        now = time.perf_counter()
+        self.timings[stage] = self.timings.get(stage, 0.0) + now - self._last
+        self._last = now
+        
+    @property
+    def total(self):
+        """Seconds over all stages"""
+        return sum(self.timings.values())
+
+def format_timings(timings):
+    """Format stage timings as one line, e.g. 'open 0.001s, parse 1.204s'"""
+    return ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in timings.items())
\ No newline at end of file
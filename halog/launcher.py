@@ -10,34 +10,15 @@ import argparse
 
 def check_dependencies():
     """Check if all required dependencies are available"""
-    missing_deps = []
+    # find_spec locates a package without importing it, which for matplotlib,
+    # pandas and PyQt5 would take seconds
+    from importlib.util import find_spec
     
-    # Core dependencies
-    try:
-        import pandas
-    except ImportError:
-        missing_deps.append("pandas")
-    
-    try:
-        import numpy
-    except ImportError:
-        missing_deps.append("numpy")
-    
-    try:
-        import matplotlib
-    except ImportError:
-        missing_deps.append("matplotlib")
-    
-    # GUI dependency
-    try:
-        import PyQt5
-    except ImportError:
-        missing_deps.append("PyQt5")
-    
-    return missing_deps
+    # Core dependencies, then the GUI dependency
+    return [name for name in ("pandas", "numpy", "matplotlib", "PyQt5") if find_spec(name) is None]
 
-def run_gui_mode():
-    """Run the GUI application"""
+def run_gui_mode(startup_report=False, live_file=None, retention_minutes=None):
+    """Run the GUI application, optionally following live_file as it is written"""
     try:
         # Check if PyQt5 is available
         try:
@@ -47,8 +28,9 @@ def run_gui_mode():
             print("To install PyQt5, run: pip install PyQt5")
             return False
         
-        # Check if display is available
-        if os.environ.get('DISPLAY') is None and sys.platform.startswith('linux'):
+        # Check if display is available (QT_QPA_PLATFORM may select offscreen)
+        if (os.environ.get('DISPLAY') is None and os.environ.get('QT_QPA_PLATFORM') is None
+                and sys.platform.startswith('linux')):
             print("❌ No display environment detected!")
             print("GUI mode requires a display environment (X11/Wayland).")
             print("Try running in command-line mode: python launcher.py --cli")
@@ -56,7 +38,7 @@ def run_gui_mode():
         
         # Import and run main application
         from main import main
-        main()
+        main(startup_report, live_file, retention_minutes)
         return True
         
     except Exception as e:
@@ -64,8 +46,8 @@ def run_gui_mode():
         print("Try running in command-line mode: python launcher.py --cli")
         return False
 
-def run_cli_mode():
-    """Run command-line interface mode"""
+def run_cli_mode(workers=1, use_cache=True, cache_dir=None, start=None, end=None, rules_file=None):
+    """Run command-line interface mode; statistics cover start to end when given"""
     try:
         print("HALog Command-Line Interface")
         print("=" * 40)
@@ -75,6 +57,22 @@ def run_cli_mode():
         
         from core.data_processor import DataProcessor
         from core.file_handler import FileHandler
+        from core.parse_cache import ParseCache
+        from core.progress import ProgressThrottle
+        from core.analytics import ANOMALY_THRESHOLD, analyze_dataset
+        from core.query import DatasetIndex, format_window_stats
+        from core.rules import evaluate_rules, format_violations, load_rules
+        from core.summary import format_summary
+        from core.timing import format_timings
+        
+        # Read alarm rules before prompting, so a bad rules file fails fast
+        rules = []
+        if rules_file:
+            try:
+                rules = load_rules(rules_file)
+            except (OSError, ValueError) as e:
+                print(f"❌ {e}")
+                return False
         
         # Get input file
         file_path = input("Enter path to LINAC log file: ").strip()
@@ -83,61 +81,68 @@ def run_cli_mode():
             print("No file specified.")
             return False
         
-        # Validate file
-        file_handler = FileHandler()
-        is_valid, message = file_handler.validate_file(file_path)
+        # Validate, detect and process the file in one pass over a single handle
+        print("Processing file...")
+        cache = ParseCache(cache_dir) if use_cache else None
+        data_processor = DataProcessor(workers=workers, cache=cache)
+        
+        def progress_callback(bytes_done, total_bytes):
+            percent = 100 * bytes_done // total_bytes if total_bytes else 100
+            print(f"Progress: {percent}% ({bytes_done / 1024**2:.1f} of {total_bytes / 1024**2:.1f} MB)")
         
-        if not is_valid:
-            print(f"❌ File validation failed: {message}")
+        try:
+            result = data_processor.ingest(file_path, ProgressThrottle(progress_callback), FileHandler())
+        except (FileNotFoundError, ValueError) as e:
+            print(f"❌ {e}")
             return False
         
+        dataset = result.dataset
         print(f"✓ File validated: {os.path.basename(file_path)}")
+        print(f"Stage timings: {format_timings(result.timings)}")
         
-        # Process file
-        print("Processing file...")
-        data_processor = DataProcessor()
-        
-        def progress_callback(progress):
-            print(f"Progress: {progress}%")
-        
-        data = data_processor.process_file(file_path, progress_callback)
-        
-        if data is not None and not data.empty:
+        if len(dataset) > 0:
+            first, last = dataset.time_range()
             print(f"\n✓ File processed successfully!")
-            print(f"Records: {len(data)}")
-            print(f"Columns: {list(data.columns)}")
-            print(f"Date range: {data.index.min()} to {data.index.max()}")
+            print(f"Records: {len(dataset)}")
+            print(f"Parameters: {', '.join(dataset.parameters)}")
+            print(f"Date range: {first} to {last}")
             
-            if 'avg' in data.columns:
-                print(f"Average value range: {data['avg'].min():.2f} - {data['avg'].max():.2f}")
+            if start is not None or end is not None:
+                print(f"Statistics from {start or first} to {end or last}:")
+                for stats in DatasetIndex(dataset).summary(start, end):
+                    print(f"  {format_window_stats(stats)}")
+            else:
+                # Gathered while parsing, so the whole file needs no second pass
+                for stats in result.summary.stats():
+                    print(f"  {format_summary(stats)}")
+                
+            anomalies = [f"{result.parameter} {int((result.score > ANOMALY_THRESHOLD).sum())}"
+                         for result in analyze_dataset(dataset)]
+            print(f"Anomalous rows (score > {ANOMALY_THRESHOLD}): {', '.join(anomalies)}")
             
-            # Generate plot
-            import matplotlib
-            matplotlib.use('Agg')
-            import matplotlib.pyplot as plt
-            
-            print("\nGenerating plot...")
-            fig, ax = plt.subplots(figsize=(12, 8))
+            if rules:
+                print(f"\nAlarm rules ({len(rules)}):")
+                try:
+                    for result in evaluate_rules(dataset, rules):
+                        print(f"  {format_violations(result)}")
+                except ValueError as e:
+                    print(f"❌ {e}")
             
-            ax.set_title("HALog - LINAC Water System Analysis", fontsize=14, fontweight='bold')
-            ax.set_xlabel("Time", fontsize=12)
-            ax.set_ylabel("Parameter Values", fontsize=12)
-            ax.grid(True, alpha=0.3)
+            # Multi-parameter data is plotted for its first parameter
+            from core.report import REPORT_TITLE, report_figure, report_pages
             
-            if 'avg' in data.columns:
-                ax.plot(data.index, data['avg'], 'b-', linewidth=2, label='Average', alpha=0.8)
-            if 'min' in data.columns:
-                ax.plot(data.index, data['min'], 'r:', linewidth=1.5, label='Minimum', alpha=0.7)
-            if 'max' in data.columns:
-                ax.plot(data.index, data['max'], 'g:', linewidth=1.5, label='Maximum', alpha=0.7)
-            
-            ax.legend(loc='upper right', framealpha=0.9)
-            fig.tight_layout()
+            plot_title = REPORT_TITLE
+            if len(dataset.parameters) > 1:
+                plot_title += f" ({dataset.parameters[0]})"
+                
+            print("\nGenerating plot...")
+            title, parameter, lines = report_pages(dataset, plot_title)[0]
+            figure = report_figure()
+            figure.show(parameter, lines, title)
             
             # Save plot
             output_file = os.path.splitext(file_path)[0] + "_analysis.png"
-            plt.savefig(output_file, dpi=150, bbox_inches='tight')
-            plt.close()
+            figure.save_png(output_file)
             
             print(f"✓ Analysis plot saved to: {output_file}")
             
@@ -156,6 +161,152 @@ def run_cli_mode():
         traceback.print_exc()
         return False
 
+def run_batch_mode(inputs, output_dir, workers=1, use_cache=True, cache_dir=None, plot_format='png', formats=('json', 'csv')):
+    """Summarize and plot many files without prompting"""
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        
+        from core.batch import run_batch
+        
+        def progress_callback(result):
+            name = result['file']
+            if result['error']:
+                print(f"❌ {name}: {result['error']}")
+            else:
+                print(f"✓ {name} ({len(result['parameters'])} parameters, {result['seconds']:.2f}s)")
+            if result['plot_error']:
+                print(f"⚠️ {name}: plots not written: {result['plot_error']}")
+                
+        report = run_batch(inputs, output_dir, workers, use_cache, cache_dir, plot_format, formats, progress_callback)
+        
+        if not report.results:
+            print("❌ No log files found")
+            return False
+            
+        failed = sum(1 for result in report.results if result['error'])
+        plot_failed = sum(1 for result in report.results if result['plot_error'])
+        total_mb = sum(result['bytes'] for result in report.results) / (1024 * 1024)
+        seconds = max(report.seconds, 1e-9)
+        
+        print(f"\nProcessed {len(report.results)} files ({failed} failed, {plot_failed} with plot errors), "
+              f"{total_mb:.1f} MB in {report.seconds:.2f}s")
+        print(f"Throughput: {len(report.results) / seconds:.2f} files/s, {total_mb / seconds:.2f} MB/s")
+        for output_file in report.outputs:
+            print(f"✓ Saved: {output_file}")
+            
+        return failed == 0 and plot_failed == 0
+        
+    except Exception as e:
+        print(f"❌ Error in batch mode: {e}")
+        return False
+
+def run_ingest_mode(inputs, store_path=None, machine=None, workers=1, use_cache=True, cache_dir=None):
+    """Parse log files into the history store, skipping files stored unchanged"""
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        
+        from core.batch import expand_inputs
+        from core.data_processor import DataProcessor
+        from core.parse_cache import ParseCache
+        from core.store import DEFAULT_MACHINE, HistoryStore
+        
+        file_paths = expand_inputs(inputs)
+        if not file_paths:
+            print("❌ No log files found")
+            return False
+            
+        machine = machine or DEFAULT_MACHINE
+        processor = DataProcessor(workers=workers, cache=ParseCache(cache_dir) if use_cache else None)
+        failed = rows = 0
+        parse_seconds = store_seconds = 0.0
+        
+        with HistoryStore(store_path) as store:
+            print(f"Storing in {store.path} as machine '{machine}'")
+            for file_path in file_paths:
+                try:
+                    result = store.ingest_file(file_path, machine, processor)
+                except Exception as e:
+                    print(f"❌ {os.path.basename(file_path)}: {e}")
+                    failed += 1
+                    continue
+                    
+                if result.rows == 0:
+                    print(f"✓ {os.path.basename(file_path)}: already stored")
+                else:
+                    print(f"✓ {os.path.basename(file_path)}: {result.rows} rows")
+                rows += result.rows
+                parse_seconds += result.parse_seconds
+                store_seconds += result.store_seconds
+                
+        print(f"\nStored {rows} rows from {len(file_paths)} files ({failed} failed)")
+        print(f"Parse: {parse_seconds:.2f}s, store: {store_seconds:.2f}s "
+              f"({rows / max(store_seconds, 1e-9):,.0f} rows/s)")
+        return failed == 0
+        
+    except Exception as e:
+        print(f"❌ Error in ingest mode: {e}")
+        return False
+
+def run_history_mode(store_path=None, machine=None, start=None, end=None):
+    """Print per-parameter statistics of a stored machine history in a time window"""
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        
+        from core.query import DatasetIndex, format_window_stats
+        from core.store import DEFAULT_MACHINE, HistoryStore
+        
+        machine = machine or DEFAULT_MACHINE
+        with HistoryStore(store_path) as store:
+            if machine not in store.machines():
+                print(f"❌ No history for machine '{machine}' in {store.path}")
+                print(f"Stored machines: {', '.join(store.machines()) or 'none'}")
+                return False
+                
+            first, last = store.time_range(machine)
+            dataset = store.query(machine, start, end)
+            
+        print(f"Machine '{machine}': history from {first} to {last}")
+        print(f"Window: {start or first} to {end or last}, {len(dataset)} records")
+        for stats in DatasetIndex(dataset).summary():
+            print(f"  {format_window_stats(stats)}")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error in history mode: {e}")
+        return False
+
+def run_benchmark_mode(file_path, max_workers=None):
+    """Report parsing speedup against worker count for one file"""
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        
+        from core.data_processor import benchmark_workers
+        
+        if not os.path.isfile(file_path):
+            print(f"❌ File not found: {file_path}")
+            return False
+            
+        # Powers of two up to the requested (or available) core count
+        max_workers = max_workers or os.cpu_count() or 1
+        worker_counts = [1]
+        while worker_counts[-1] * 2 <= max_workers:
+            worker_counts.append(worker_counts[-1] * 2)
+        if worker_counts[-1] != max_workers:
+            worker_counts.append(max_workers)
+            
+        print(f"Benchmarking {os.path.basename(file_path)} with workers: {worker_counts}")
+        print(f"{'Workers':>8} {'Time (s)':>10} {'Speedup':>8}  Output")
+        
+        for result in benchmark_workers(file_path, worker_counts):
+            output = "identical" if result['identical'] else "DIFFERENT"
+            print(f"{result['workers']:>8} {result['seconds']:>10.2f} {result['speedup']:>7.2f}x  {output}")
+            
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error running benchmark: {e}")
+        return False
+
 def run_test_mode():
     """Run application tests"""
     try:
@@ -193,6 +344,16 @@ Examples:
   python launcher.py --cli        # Run command-line mode
   python launcher.py --test       # Run tests
   python launcher.py --check      # Check dependencies
+  python launcher.py --cli --workers 8        # Parse with 8 processes
+  python launcher.py --benchmark big.log      # Report speedup per worker count
+  python launcher.py --cli --no-cache         # Always re-parse the file
+  python launcher.py --cli --start "2024-01-01 08:00" --end "2024-01-01 12:00"  # Statistics of a time window
+  python launcher.py --cli --rules limits.txt # Report alarm rule violations
+  python launcher.py --batch logs/ "archive/*.log" --output-dir out --workers 4
+  python launcher.py --startup-report         # Time GUI startup stages and exit
+  python launcher.py --ingest logs/ --machine linac1   # Add logs to the history store
+  python launcher.py --history --machine linac1 --start 2024-01-01 --end 2024-03-31
+  python launcher.py --live water.log --retention 120  # Follow a log as it is written
         """
     )
     
@@ -204,6 +365,44 @@ Examples:
                        help='Run application tests')
     parser.add_argument('--check', action='store_true',
                        help='Check dependencies')
+    parser.add_argument('--startup-report', action='store_true',
+                       help='Start the GUI, print startup stage timings and exit')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Worker processes used to parse large files (default: 1)')
+    parser.add_argument('--benchmark', metavar='FILE',
+                       help='Report parsing speedup against worker count for FILE')
+    parser.add_argument('--cache-dir', metavar='DIR',
+                       help='Directory of the parse cache (default: ~/.halog/cache)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Do not read or write the parse cache')
+    parser.add_argument('--batch', nargs='+', metavar='PATH',
+                       help='Summarize files, glob patterns or directories without prompting')
+    parser.add_argument('--output-dir', metavar='DIR', default='halog_output',
+                       help='Directory for batch summaries and plots (default: halog_output)')
+    parser.add_argument('--format', choices=['json', 'csv', 'both'], default='both',
+                       help='Batch summary format (default: both)')
+    parser.add_argument('--plot-format', choices=['png', 'pdf'], default='png',
+                       help='Batch plots as one PNG per parameter or a single report.pdf (default: png)')
+    parser.add_argument('--no-plots', action='store_true',
+                       help='Do not save plots in batch mode')
+    parser.add_argument('--start', metavar='TIME',
+                       help='Start of the time window for CLI statistics (default: first record)')
+    parser.add_argument('--end', metavar='TIME',
+                       help='End of the time window for CLI statistics (default: last record)')
+    parser.add_argument('--rules', metavar='FILE',
+                       help='Alarm rules checked in CLI mode, one per line (e.g. "pump_pressure < 40")')
+    parser.add_argument('--ingest', nargs='+', metavar='PATH',
+                       help='Add files, glob patterns or directories to the history store')
+    parser.add_argument('--history', action='store_true',
+                       help='Print statistics of the stored history (window set by --start/--end)')
+    parser.add_argument('--machine', metavar='NAME',
+                       help='Machine the ingested or queried logs belong to (default: default)')
+    parser.add_argument('--store', metavar='FILE',
+                       help='History store database (default: ~/.halog/history.db)')
+    parser.add_argument('--live', metavar='FILE',
+                       help='Open the GUI following FILE as it is written')
+    parser.add_argument('--retention', type=int, metavar='MINUTES',
+                       help='Minutes of a live log kept and plotted (default: 60)')
     
     args = parser.parse_args()
     
@@ -213,7 +412,7 @@ Examples:
     print("-" * 40)
     
     # Check dependencies if requested
-    if args.check or not any([args.gui, args.cli, args.test]):
+    if args.check or not any([args.gui, args.cli, args.test, args.benchmark, args.batch, args.ingest, args.history]):
         print("Checking dependencies...")
         missing_deps = check_dependencies()
         
@@ -233,10 +432,20 @@ Examples:
     
     if args.test:
         success = run_test_mode()
+    elif args.benchmark:
+        success = run_benchmark_mode(args.benchmark, args.workers if args.workers > 1 else None)
+    elif args.batch:
+        formats = ('json', 'csv') if args.format == 'both' else (args.format,)
+        success = run_batch_mode(args.batch, args.output_dir, args.workers, not args.no_cache,
+                                 args.cache_dir, None if args.no_plots else args.plot_format, formats)
+    elif args.ingest:
+        success = run_ingest_mode(args.ingest, args.store, args.machine, args.workers, not args.no_cache, args.cache_dir)
+    elif args.history:
+        success = run_history_mode(args.store, args.machine, args.start, args.end)
     elif args.cli:
-        success = run_cli_mode()
+        success = run_cli_mode(args.workers, not args.no_cache, args.cache_dir, args.start, args.end, args.rules)
     else:  # Default to GUI mode
-        success = run_gui_mode()
+        success = run_gui_mode(args.startup_report, args.live, args.retention)
     
     if not success:
         print("\n❌ Operation failed. See error messages above.")
@@ -11,6 +11,11 @@ Author: GoBioEng
 License: MIT
 """
 
+from core.timing import StageTimer, format_timings
+
+# Started before the Qt and UI imports below so they are part of the report
+startup_timer = StageTimer()
+
 import sys
 import os
 from PyQt5.QtWidgets import QApplication
@@ -18,8 +23,22 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon
 from ui.main_window import MainWindow
 
-def main():
-    """Main application entry point"""
+startup_timer.lap('imports')
+
+def print_startup_report(timings):
+    """Print the seconds spent per startup stage"""
+    print(f"Startup: {format_timings(timings)} (total {sum(timings.values()):.3f}s)")
+
+def main(startup_report=False, live_file=None, retention_minutes=None):
+    """
+    Main application entry point
+    
+    Args:
+        startup_report (bool): Print startup stage timings and exit once
+            the graph is ready
+        live_file (str): Log file to follow as it is written
+        retention_minutes (int): Minutes of the live log kept and plotted
+    """
     # Create QApplication instance
     app = QApplication(sys.argv)
     
@@ -37,10 +56,21 @@ def main():
     app.setAttribute(Qt.AA_EnableHighDpiScaling, True)
     app.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
     
-    # Create and show main window
-    main_window = MainWindow()
+    startup_timer.lap('application')
+    
+    # Create and show main window; plotting and parsing modules load after
+    main_window = MainWindow(startup_timer)
     main_window.show()
+    app.processEvents()
+    startup_timer.lap('window')
     
+    if live_file:
+        main_window.follow_file(live_file, retention_minutes)
+        
+    if startup_report:
+        main_window.startup_finished.connect(print_startup_report)
+        main_window.startup_finished.connect(app.quit)
+        
     # Start event loop
     sys.exit(app.exec_())
 
@@ -94,6 +94,18 @@ def test_application():
             print("✗ File processing failed")
             return False
             
+        # The window must open before matplotlib, pandas and numpy are loaded
+        import subprocess
+        from importlib.util import find_spec
+        if find_spec("PyQt5") is not None:
+            check = "import sys, ui.main_window; print([m for m in ('matplotlib', 'pandas', 'numpy') if m in sys.modules])"
+            output = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+            if output != "[]":
+                print(f"✗ Main window imports heavy modules at startup: {output}")
+                return False
+            print("✓ Main window imports without plotting libraries")
+            
         return True
         
     except ImportError as e:
@@ -114,6 +114,471 @@ def test_core_functionality():
         if sample_data is not None and not sample_data.empty:
             print(f"   ✓ Sample data generated: {len(sample_data)} records")
         
+        # Test bulk parser against the line-by-line path
+        print("\n9. Testing bulk timestamp_stats parser...")
+        with open(sample_file, 'rb') as f:
+            raw = f.read()
+        bulk = data_processor.parse_timestamp_stats_block(raw)
+        by_line = data_processor._build_timestamp_stats_records(data_processor._match_timestamp_stats(raw))
+        if bulk.equals(by_line) and bulk[['min', 'max', 'avg']].equals(data):
+            print(f"   ✓ Bulk parser matches line parser: {len(bulk)} records")
+        else:
+            print("   ✗ Bulk parser output differs from line parser")
+            return False
+        
+        # Test streaming ingest with a tiny chunk budget
+        print("\n10. Testing chunked streaming ingest...")
+        streamed = DataProcessor(chunk_size=256).process_file(sample_file)
+        if streamed.equals(data):
+            print("   ✓ Chunked ingest matches whole-file result")
+        else:
+            print("   ✗ Chunked ingest result differs")
+            return False
+        
+        # Test grouped CSV aggregation over several value columns
+        print("\n11. Testing grouped CSV aggregation...")
+        csv_file = os.path.join(os.path.dirname(sample_file), "sample_linac.csv")
+        with open(csv_file, 'w') as f:
+            f.write("timestamp,flow_value,pressure_value\n")
+            f.write("2025-01-01 10:00:00,12.0,45.0\n")
+            f.write("2025-01-01 10:00:00,14.0,47.0\n")
+            f.write("2025-01-01 11:00:00,13.0,46.0\n")
+        csv_data = data_processor.process_simple_csv(csv_file)
+        flow = csv_data[csv_data['parameter'] == 'flow_value']
+        if len(csv_data) == 4 and list(flow['avg']) == [13.0, 13.0] and flow['max'].iloc[0] == 14.0:
+            print(f"   ✓ Grouped statistics for {csv_data['parameter'].nunique()} value columns")
+        else:
+            print("   ✗ Grouped CSV statistics are wrong")
+            return False
+        
+        # Test per-parameter aggregation of detailed logs
+        print("\n12. Testing per-parameter detailed log aggregation...")
+        detailed_file = os.path.join(os.path.dirname(sample_file), "sample_detailed.log")
+        with open(detailed_file, 'w') as f:
+            f.write("[2025-01-01 10:00:00] pump_pressure: 45.0\n")
+            f.write("[2025-01-01 10:00:00] magnetron_flow: 12.0\n")
+            f.write("[2025-01-01 10:00:00] pump_pressure: 47.0\n")
+            f.write("[2025-01-01 10:01:00] magnetron_flow: 14.0\n")
+        detailed = data_processor.process_file(detailed_file)
+        pump = detailed[detailed['parameter'] == 'pump_pressure']
+        if len(detailed) == 3 and list(pump['avg']) == [46.0] and list(pump['min']) == [45.0]:
+            print(f"   ✓ Parameters kept separate: {list(detailed['parameter'].unique())}")
+        else:
+            print("   ✗ Detailed log parameters were mixed")
+            return False
+        
+        # Test the compact columnar dataset
+        print("\n13. Testing columnar dataset...")
+        import numpy as np
+        dataset = data_processor.load_dataset(detailed_file)
+        pump = dataset.series('pump_pressure')
+        if (dataset.parameters == ['pump_pressure', 'magnetron_flow'] and list(pump.count) == [2]
+                and np.shares_memory(pump.avg, dataset.avg) and dataset.avg.dtype == np.float32):
+            print(f"   ✓ Dataset holds {len(dataset)} rows in {dataset.nbytes} bytes")
+        else:
+            print("   ✗ Columnar dataset is wrong")
+            return False
+        
+        # Test the persistent parse cache
+        print("\n14. Testing parse cache...")
+        import tempfile
+        from core.parse_cache import ParseCache
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cached_processor = DataProcessor(cache=ParseCache(cache_dir))
+            first = cached_processor.load_dataset(detailed_file)
+            identity = cached_processor.cache.file_identity(detailed_file, {'value_columns': None})
+            hit = cached_processor.cache.load(detailed_file, identity)
+            if hit is None or not np.array_equal(hit.avg, first.avg) or hit.parameters != first.parameters:
+                print("   ✗ Cached dataset was not returned")
+                return False
+            with open(detailed_file, 'a') as f:
+                f.write("[2025-01-01 10:02:00] pump_pressure: 50.0\n")
+            identity = cached_processor.cache.file_identity(detailed_file, {'value_columns': None})
+            if cached_processor.cache.load(detailed_file, identity) is not None:
+                print("   ✗ Stale cache entry was returned")
+                return False
+            rebuilt = cached_processor.load_dataset(detailed_file)
+            ParseCache(cache_dir, max_bytes=0).evict()
+            if len(rebuilt) == 4 and not os.listdir(cache_dir):
+                print("   ✓ Cache hit, stale entry rebuilt and evicted")
+            else:
+                print("   ✗ Cache rebuild or eviction failed")
+                return False
+        
+        # Test the memory-mapped reader backend
+        print("\n15. Testing memory-mapped block scanning...")
+        with open(detailed_file, 'rb') as f:
+            raw = f.read()
+        blocks = [bytes(block) for block, _ in DataProcessor(chunk_size=64).iter_line_blocks(detailed_file)]
+        crlf = data_processor.parse_detailed_log_block(raw.replace(b'\n', b'\r\n'))
+        if b''.join(blocks) == raw and len(blocks) > 1 and crlf.equals(data_processor.parse_detailed_log_block(raw)):
+            print(f"   ✓ {len(blocks)} mapped blocks cover the file; CRLF lines parse the same")
+        else:
+            print("   ✗ Memory-mapped scanning is wrong")
+            return False
+        
+        # Test append-only re-parsing of a growing log
+        print("\n16. Testing incremental re-parse of appended lines...")
+        growing_processor = DataProcessor()
+        growing_processor.load_dataset(detailed_file)
+        with open(detailed_file, 'a') as f:
+            f.write("[2025-01-01 10:02:00] pump_pressure: 56.0\n")
+            f.write("[2025-01-01 10:03:00] target_flow: 3.0\n")
+        resumed = growing_processor.load_dataset(detailed_file)
+        full = DataProcessor().load_dataset(detailed_file)
+        pump = resumed.series('pump_pressure')
+        if (resumed.parameters == full.parameters and np.array_equal(resumed.avg, full.avg)
+                and list(pump.count) == [2, 2] and list(pump.max) == [47.0, 56.0]):
+            print(f"   ✓ Appended lines merged: {len(resumed)} rows, same as a full parse")
+        else:
+            print("   ✗ Incremental result differs from a full parse")
+            return False
+        with open(detailed_file, 'w') as f:
+            f.write("[2025-01-02 08:00:00] pump_pressure: 40.0\n")
+        if len(growing_processor.load_dataset(detailed_file)) == 1:
+            print("   ✓ Truncated file parsed in full")
+        else:
+            print("   ✗ Truncated file was merged into stale results")
+            return False
+        
+        # Test the single-handle ingest pipeline
+        print("\n17. Testing single-pass ingest pipeline...")
+        result = DataProcessor().ingest(sample_file, file_handler=file_handler)
+        if result.file_format == 'timestamp_stats' and list(result.timings) == ['open', 'validate', 'cache', 'detect', 'parse', 'store']:
+            print(f"   ✓ Stages timed: {', '.join(result.timings)}")
+        else:
+            print("   ✗ Ingest pipeline stages are wrong")
+            return False
+        try:
+            DataProcessor().ingest(os.path.join(os.path.dirname(__file__), "setup.py"), file_handler=file_handler)
+            print("   ✗ Invalid file was not rejected")
+            return False
+        except ValueError:
+            print("   ✓ Validation runs on the open handle")
+        
+        # Test display-aware downsampling
+        print("\n18. Testing plot downsampling...")
+        from core.downsample import m4_indices
+        values = np.sin(np.arange(200000) / 500.0).astype(np.float32)
+        values[12345] = 9.0
+        values[150000] = -9.0
+        kept = m4_indices(np.arange(200000, dtype=np.int64) * 60, values, 800)
+        if len(kept) <= 4 * 800 and 12345 in kept and 150000 in kept and kept[0] == 0 and kept[-1] == 199999:
+            print(f"   ✓ {len(values)} rows reduced to {len(kept)} with spikes kept")
+        else:
+            print("   ✗ Downsampling lost extremes or kept too many rows")
+            return False
+        
+        # Test multi-resolution rollups for zooming
+        print("\n19. Testing rollup pyramid...")
+        from core.dataset import ParameterSeries
+        from core.pyramid import MINUTE, RollupPyramid
+        rows = 100000
+        values = values[:rows]
+        series = ParameterSeries('flow', np.arange(rows, dtype=np.int64) * 10**9, values - 1, values + 1,
+                                 values, np.full(rows, 2, dtype=np.uint32))
+        pyramid = RollupPyramid(series)
+        width, minutes = pyramid.levels[1]
+        if (width != MINUTE or minutes.count.sum() != 2 * rows or minutes.max.max() != 10.0
+                or not np.isclose(minutes.avg[0], values[:60].mean(), atol=1e-5)):
+            print("   ✗ Minute rollup does not preserve min/max/count/mean")
+            return False
+        width, window = pyramid.window(3600 * 10**9, 3660 * 10**9, 100)
+        if width != 0 or window.timestamps[0] > 3600 * 10**9 or window.timestamps[-1] < 3660 * 10**9:
+            print("   ✗ Narrow window did not use raw rows covering the range")
+            return False
+        width, window = pyramid.window(0, rows * 10**9, 100)
+        if width == 0 or len(window.timestamps) > 100:
+            print("   ✗ Wide window did not fall back to a coarser level")
+            return False
+        print(f"   ✓ {len(pyramid.levels)} levels, full range served from {width // MINUTE} min buckets")
+        
+        # A live window that gained rows at its end and lost some at its start
+        growing = RollupPyramid(ParameterSeries('flow', *(column[:50000] for column in series[1:])))
+        for start, stop in ((90, 70000), (4000, 70001), (4001, rows)):
+            moved = ParameterSeries('flow', *(column[start:stop] for column in series[1:]))
+            growing.extend(moved)
+            for (width, extended), (_, rebuilt) in zip(growing.levels, RollupPyramid(moved).levels):
+                if not all(np.array_equal(a, b) for a, b in zip(extended, rebuilt)):
+                    print(f"   ✗ Extended {width // MINUTE} min level differs from a fresh rollup")
+                    return False
+        print("   ✓ Extended pyramid matches a fresh rollup")
+        
+        # Test non-interactive batch processing
+        print("\n20. Testing batch processing...")
+        import json
+        from core.batch import run_batch
+        with tempfile.TemporaryDirectory() as output_dir:
+            bad_file = os.path.join(output_dir, "empty.log")
+            open(bad_file, 'w').close()
+            malformed_file = os.path.join(output_dir, "malformed.log")
+            with open(malformed_file, 'w') as f:
+                f.write("2025-13-45 00:00:00 pump_pressure 12 40.00 50.00 45.00\n")
+            report = run_batch([os.path.dirname(sample_file), bad_file, malformed_file], output_dir,
+                               use_cache=False, plot_format=None)
+            errors = {os.path.basename(result['file']): result['error'] for result in report.results}
+            with open(os.path.join(output_dir, 'summary.json')) as f:
+                summary = json.load(f)
+            if (errors.get("sample_linac.log") is not None or errors.get("empty.log") is None
+                    or errors.get("malformed.log") is None or len(summary) != len(errors)):
+                print(f"   ✗ Unexpected batch results: {errors}")
+                return False
+            if not os.path.exists(os.path.join(output_dir, 'summary.csv')):
+                print("   ✗ CSV summary missing")
+                return False
+        print(f"   ✓ {len(report.results)} files summarized, empty and malformed files reported as failed")
+        
+        print("\n21. Testing byte progress and cancellation...")
+        from core.parse_cache import ParseCache
+        from core.progress import CancelToken, LoadCancelled, ProgressThrottle
+        updates = []
+        DataProcessor(chunk_size=256).ingest(sample_file, lambda done, total: updates.append((done, total)))
+        if updates[-1][0] != updates[-1][1] or any(b < a for (a, _), (b, _) in zip(updates, updates[1:])):
+            print(f"   ✗ Unexpected progress updates: {updates}")
+            return False
+        throttled = []
+        DataProcessor(chunk_size=256).ingest(sample_file, ProgressThrottle(lambda done, total: throttled.append(done)))
+        if sum(done == updates[-1][0] for done in throttled) != 1:
+            print(f"   ✗ Throttled progress did not report completion once: {throttled}")
+            return False
+        token = CancelToken()
+        with tempfile.TemporaryDirectory() as cache_dir:
+            processor = DataProcessor(chunk_size=256, cache=ParseCache(cache_dir), cancel_token=token)
+            try:
+                processor.ingest(sample_file, lambda done, total: done and token.cancel())
+                print("   ✗ Cancelled load was not stopped")
+                return False
+            except LoadCancelled:
+                pass
+            if os.listdir(cache_dir):
+                print("   ✗ Cancelled load was cached")
+                return False
+        print(f"   ✓ {len(updates)} byte progress updates, cancelled load stopped uncached")
+        
+        print("\n22. Testing merged timeline of overlapping files...")
+        from core.timeline import load_timeline
+        with open(sample_file) as f:
+            lines = f.readlines()
+        with tempfile.TemporaryDirectory() as log_dir:
+            halves = [lines[:len(lines) * 2 // 3], lines[len(lines) // 3:]]
+            rotated = [os.path.join(log_dir, f"day{i}.log") for i in (1, 2)]
+            for path, part in zip(rotated, halves):
+                with open(path, 'w') as f:
+                    f.writelines(part)
+            # A malformed file is reported without stopping the others
+            malformed = os.path.join(log_dir, "malformed.log")
+            with open(malformed, 'w') as f:
+                f.write("2025-13-45 00:00:00 pump_pressure 12 40.00 50.00 45.00\n")
+            timeline = load_timeline(rotated + [malformed], workers=1)
+        whole = DataProcessor().ingest(sample_file).dataset
+        if len(timeline.dataset) != len(whole) or not np.array_equal(timeline.dataset.avg, whole.avg):
+            print(f"   ✗ Merged timeline has {len(timeline.dataset)} rows, expected {len(whole)}")
+            return False
+        if timeline.files[-1]['error'] is None or any(result['error'] for result in timeline.files[:-1]):
+            print(f"   ✗ Unexpected file errors: {[result['error'] for result in timeline.files]}")
+            return False
+        print(f"   ✓ {len(lines)} lines in 2 overlapping files merged into {len(whole)} rows")
+        
+        print("\n23. Testing partial results while parsing...")
+        partials = []
+        final = DataProcessor(chunk_size=256).ingest(sample_file, partial_callback=partials.append).dataset
+        if not partials or not all(0 < len(partial) < len(final) for partial in partials):
+            print(f"   ✗ Unexpected partial results: {[len(partial) for partial in partials]}")
+            return False
+        print(f"   ✓ First partial result holds {len(partials[0])} of {len(final)} rows")
+        
+        print("\n24. Testing live tail with a retention window...")
+        from core.live import LiveBuffer, LogTailer
+        from core.pyramid import MINUTE
+        with tempfile.TemporaryDirectory() as log_dir:
+            live_file = os.path.join(log_dir, "live.log")
+            tailer = LogTailer(live_file)
+            everything, window = LiveBuffer(retention=10**6 * MINUTE), LiveBuffer(retention=2 * 60 * MINUTE)
+            content = "".join(lines)
+            with open(live_file, 'w') as f:
+                # Cut inside a line: the unfinished line waits for the next poll
+                for piece in (content[:len(content) // 2], content[len(content) // 2:]):
+                    f.write(piece)
+                    f.flush()
+                    rows = tailer.poll()
+                    if rows is not None:
+                        everything.append(rows)
+                        window.append(rows)
+        whole_rows = sum(len(whole.series(parameter).timestamps) for parameter in whole.parameters)
+        if len(everything) != whole_rows or not 0 < len(window) < whole_rows:
+            print(f"   ✗ Live buffers hold {len(everything)} and {len(window)} rows of {whole_rows}")
+            return False
+        print(f"   ✓ Tailed {len(everything)} rows, {len(window)} kept in a 2 hour window")
+        
+        print("\n25. Testing indexed time-window statistics...")
+        import pandas as pd
+        from core.query import DatasetIndex
+        index = DatasetIndex(whole)
+        for parameter in whole.parameters:
+            series = whole.series(parameter)
+            start, end = int(series.timestamps[len(series.timestamps) // 4]), int(series.timestamps[-2])
+            rows = (series.timestamps >= start) & (series.timestamps <= end)
+            stats = index.stats(parameter, pd.Timestamp(start), end)
+            if (stats.records != rows.sum() or stats.min != series.min[rows].min() or stats.max != series.max[rows].max()
+                    or not np.isclose(stats.mean, np.average(series.avg[rows], weights=series.count[rows]))):
+                print(f"   ✗ Window statistics of {parameter} differ from a scan: {stats}")
+                return False
+        if index.stats(whole.parameters[0], end=int(whole.timestamps.min()) - 1).records != 0:
+            print("   ✗ Window before the first record is not empty")
+            return False
+        print(f"   ✓ Window statistics of {len(whole.parameters)} parameters match a full scan")
+        
+        print("\n26. Testing rolling statistics and anomaly scores...")
+        from core import analytics
+        series = whole.series(whole.parameters[0])
+        rolling = analytics.rolling_stats(series, 5 * MINUTE)
+        frame = pd.Series(series.avg.astype(np.float64), index=pd.DatetimeIndex(series.timestamps.view('datetime64[ns]')))
+        expected = frame.rolling(pd.Timedelta(5 * MINUTE)).agg(['mean', 'std'])
+        if not (np.allclose(rolling.mean, expected['mean']) and np.allclose(rolling.std, expected['std'], equal_nan=True)):
+            print("   ✗ Rolling statistics differ from pandas")
+            return False
+        kernel = getattr(analytics._ewma_kernel, 'py_func', analytics._ewma_kernel)
+        smoothed = kernel(series.avg.astype(np.float64), series.timestamps, float(analytics.EWMA_HALFLIFE))
+        blocks = analytics._ewma_blocks(series.avg.astype(np.float64), series.timestamps, float(analytics.EWMA_HALFLIFE))
+        if not (np.allclose(smoothed, blocks) and np.allclose(smoothed, analytics.ewma(series))):
+            print("   ✗ EWMA kernel and numpy EWMA differ")
+            return False
+        spiked = series._replace(avg=series.avg.copy())
+        spiked.avg[len(spiked.avg) // 2] += 100
+        scores = analytics.anomaly_scores(spiked)
+        if scores.argmax() != len(scores) // 2 or scores.max() < analytics.ANOMALY_THRESHOLD:
+            print(f"   ✗ Injected spike scored {scores[len(scores) // 2]:.1f}, highest at row {scores.argmax()}")
+            return False
+        print(f"   ✓ Rolling statistics match pandas, injected spike scored {scores.max():.1f}")
+        
+        print("\n27. Testing alarm rule evaluation...")
+        from core.rules import evaluate_rules, parse_rule
+        parameter = whole.parameters[0]
+        series = whole.series(parameter)
+        # Limits at and beyond the extremes fire on no row or on every row
+        low, high = float(series.avg.min()), float(series.avg.max())
+        limits = [*np.percentile(series.avg, [10, 50, 90]).round(2), low - 1, low, high, high + 1]
+        rules = [parse_rule(f"{parameter} {operator} {limit}") for operator in ('<', '<=', '>', '>=')
+                 for limit in limits]
+        rules.append(parse_rule(f"Drift: {parameter} drift > 5%"))
+        for result in evaluate_rules(whole, rules):
+            rule = result.rule
+            values = series.avg.astype(np.float64)
+            if rule.drift:
+                values = np.abs(values - np.median(values)) / np.median(values)
+            violating = {'<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal}[rule.operator](values, rule.limit)
+            edges = np.flatnonzero(np.diff(np.concatenate(([0], violating.astype(np.int8), [0]))))
+            if result.rows.sum() != violating.sum() or not np.array_equal(result.start, series.timestamps[edges[0::2]]):
+                print(f"   ✗ Violations of {rule.name} differ from a row-by-row check")
+                return False
+        print(f"   ✓ {len(rules)} rules match a row-by-row check")
+        
+        print("\n28. Testing the history store...")
+        from core.store import HistoryStore
+        with tempfile.TemporaryDirectory() as store_dir:
+            log_copy = os.path.join(store_dir, "machine.log")
+            with open(log_copy, 'w') as f:
+                f.writelines(lines[:len(lines) // 2])
+            with HistoryStore(os.path.join(store_dir, "history.db")) as store:
+                store.ingest_file(log_copy, 'linac1')
+                # The grown file replaces the rows of its first version
+                with open(log_copy, 'w') as f:
+                    f.writelines(lines)
+                stored = store.ingest_file(log_copy, 'linac1').rows
+                repeated = store.ingest_file(log_copy, 'linac1').rows
+                # A file without records fails instead of storing sample data
+                empty_log = os.path.join(store_dir, "empty.log")
+                open(empty_log, 'w').close()
+                try:
+                    store.ingest_file(empty_log, 'linac1')
+                    empty_rejected = False
+                except ValueError:
+                    empty_rejected = True
+                kept = store.connection.execute('SELECT SUM(rows) FROM chunks').fetchone()[0]
+                everything = store.query('linac1')
+                start, end = int(whole.timestamps.min()), int(np.median(whole.timestamps))
+                window = store.query('linac1', start, pd.Timestamp(end))
+        expected = ((whole.timestamps >= start) & (whole.timestamps <= end)).sum()
+        if stored != len(whole) or repeated != 0 or kept != len(whole) or len(everything) != len(whole) or len(window) != expected:
+            print(f"   ✗ Stored {stored} then {repeated} rows, read {len(everything)} and {len(window)} of {expected}")
+            return False
+        if not empty_rejected or everything.parameters != whole.parameters:
+            print(f"   ✗ File without records was stored: {everything.parameters}")
+            return False
+        print(f"   ✓ {stored} rows stored once, re-ingest replaced the file, window returned {len(window)} rows")
+        
+        print("\n29. Testing summary statistics gathered while parsing...")
+        from core.summary import SKETCH_ACCURACY
+        processor = DataProcessor(chunk_size=256)
+        with tempfile.TemporaryDirectory() as log_dir:
+            log_copy = os.path.join(log_dir, "growing.log")
+            with open(log_copy, 'w') as f:
+                f.writelines(lines[:len(lines) // 2])
+            processor.ingest(log_copy)
+            with open(log_copy, 'w') as f:
+                f.writelines(lines)
+            resumed = processor.ingest(log_copy).summary
+        for summary in (DataProcessor(chunk_size=256).ingest(sample_file).summary, resumed):
+            for stats in summary.stats():
+                series = whole.series(stats.parameter)
+                values, weights = series.avg.astype(np.float64), series.count.astype(np.float64)
+                mean = np.average(values, weights=weights)
+                std = np.sqrt(np.dot(weights, (values - mean) ** 2) / (weights.sum() - 1))
+                order = np.argsort(values)
+                cumulative = np.cumsum(weights[order])
+                exact = {q: values[order][np.searchsorted(cumulative, q * cumulative[-1])] for q in stats.quantiles}
+                if (stats.records != len(values) or stats.samples != weights.sum()
+                        or (stats.first, stats.last) != (series.timestamps[0], series.timestamps[-1])
+                        or not np.isclose(stats.mean, mean) or not np.isclose(stats.std, std)
+                        or not all(abs(stats.quantiles[q] - exact[q]) <= 2 * SKETCH_ACCURACY * abs(exact[q]) for q in exact)):
+                    print(f"   ✗ Streaming summary of {stats.parameter} differs from a pass over the data")
+                    return False
+        print(f"   ✓ Summary of {len(whole.parameters)} parameters matches a pass over the data, also after resuming")
+        
+        print("\n30. Testing the parse error of a malformed file...")
+        with tempfile.TemporaryDirectory() as log_dir:
+            malformed = os.path.join(log_dir, "malformed.log")
+            with open(malformed, 'w') as f:
+                f.writelines(lines[3:])
+                f.write("2025-13-45 00:00:00 pump_pressure 12 40.00 50.00 45.00\n")
+            for workers in (1, 2):
+                try:
+                    DataProcessor(chunk_size=256, workers=workers).ingest(malformed)
+                    print("   ✗ Malformed file was accepted")
+                    return False
+                except Exception as e:
+                    if not str(e).startswith("Error processing timestamp_stats format") or "2025-13-45" not in str(e):
+                        print(f"   ✗ Parse error was replaced: {type(e).__name__}: {e}")
+                        return False
+        print("   ✓ Malformed file reports its parse error and releases the file")
+        
+        print("\n31. Testing batch plots of parameters with path separators...")
+        with tempfile.TemporaryDirectory() as output_dir:
+            units_file = os.path.join(output_dir, "units.log")
+            with open(units_file, 'w') as f:
+                f.write("[2025-01-01 10:00:00] flow l/min: 3.0\n")
+                f.write("[2025-01-01 10:00:00] flow l_min: 4.0\n")
+                f.write("[2025-01-01 10:01:00] flow l/min: 3.5\n")
+            report = run_batch([units_file], os.path.join(output_dir, "out"), use_cache=False, plot_format='png')
+            result = report.results[0]
+            if (result['error'] is not None or len(result['parameters']) != 2 or len(set(result['plots'])) != 2
+                    or not all(os.path.dirname(plot) == os.path.join(output_dir, "out") for plot in result['plots'])):
+                print(f"   ✗ Unexpected batch result: {result['error']}, plots {result['plots']}")
+                return False
+            names = ', '.join(os.path.basename(plot) for plot in result['plots'])
+            
+            # A plot that cannot be written keeps the file's statistics and other plots
+            blocked = os.path.join(output_dir, "blocked")
+            os.makedirs(os.path.join(blocked, "units_flow_l_min_analysis.png"))
+            result = run_batch([units_file], blocked, use_cache=False, plot_format='png').results[0]
+            with open(os.path.join(blocked, 'summary.json')) as f:
+                summary = json.load(f)
+            if (result['error'] is not None or result['plot_error'] is None or len(result['plots']) != 1
+                    or len(summary[0]['parameters']) != 2):
+                print(f"   ✗ Failed plot lost the file: {result['error']}, {result['plot_error']}")
+                return False
+        print(f"   ✓ Plots written as {names}; a failed plot keeps the statistics")
+        
         print("\n" + "=" * 40)
         print("✓ All core functionality tests passed!")
         print("\nThe application core is working correctly.")
@@ -91,29 +91,25 @@ def test_plotting():
             if real_data is not None and not real_data.empty:
                 print(f"   ✓ Real data processed: {len(real_data)} records")
                 
-                # Create plot with real data
-                fig, ax = plt.subplots(figsize=(12, 8))
-                ax.set_title("HALog - Real LINAC Data Test", fontsize=14, fontweight='bold')
-                ax.set_xlabel("Time", fontsize=12)
-                ax.set_ylabel("Pump Pressure", fontsize=12)
-                ax.grid(True, alpha=0.3)
+                # Render with the report figure shared by the CLI and batch mode
+                from core.dataset import LogDataset
+                from core.report import PdfReport, report_figure, report_pages, save_png_set
                 
-                # Plot real data
-                if 'avg' in real_data.columns:
-                    ax.plot(real_data.index, real_data['avg'], 'b-', linewidth=2, label='Average', alpha=0.8)
-                if 'min' in real_data.columns:
-                    ax.plot(real_data.index, real_data['min'], 'r:', linewidth=1.5, label='Minimum', alpha=0.7)
-                if 'max' in real_data.columns:
-                    ax.plot(real_data.index, real_data['max'], 'g:', linewidth=1.5, label='Maximum', alpha=0.7)
+                dataset = LogDataset.from_records(real_data)
+                stem = os.path.join(output_dir, "real_data")
+                real_plot_files = save_png_set(dataset, stem, "HALog - Real LINAC Data Test")
+                print(f"   ✓ Real data plot saved to: {', '.join(real_plot_files)}")
                 
-                ax.legend(loc='upper right', framealpha=0.9)
-                fig.tight_layout()
-                
-                real_plot_file = os.path.join(output_dir, "real_data_plot.png")
-                plt.savefig(real_plot_file, dpi=150, bbox_inches='tight')
-                print(f"   ✓ Real data plot saved to: {real_plot_file}")
-                
-                plt.close()
+                print("\n4. Testing multi-page PDF report...")
+                pdf_file = os.path.join(output_dir, "report.pdf")
+                figure = report_figure()
+                with PdfReport(pdf_file) as pdf:
+                    pdf.add_pages(report_pages(dataset) * 3)
+                    
+                if report_figure() is not figure or pdf.page_count != 3 * len(dataset.parameters):
+                    print("   ✗ Report pages were not drawn on one reused figure")
+                    return False
+                print(f"   ✓ {pdf.page_count} pages saved to: {pdf_file} ({os.path.getsize(pdf_file) / 1024:.1f} KB)")
             else:
                 print("   ✗ Failed to process real log file")
                 return False
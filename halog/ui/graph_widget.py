@@ -0,0 +1,375 @@
+"""
+Graph Widget for HALog Application
+Interactive matplotlib plot of min, max and average lines
+
+Imports matplotlib, numpy and pandas, so the main window loads this module
+after it is on screen.
+"""
+
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QComboBox
+from PyQt5.QtCore import pyqtSignal
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
+import matplotlib.dates as mdates
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+import numpy as np
+import pandas as pd
+
+from core.dataset import LogDataset
+from core.downsample import downsample_series
+from core.pyramid import RollupPyramid
+
+# Rows fetched from the rollup pyramid per pixel column of the plot
+WINDOW_ROWS_PER_PIXEL = 8
+
+# Scale of the visible time range per mouse wheel step
+SCROLL_ZOOM_FACTOR = 1.25
+
+class GraphWidget(QWidget):
+    """Custom widget for matplotlib graphs"""
+    
+    # Visible time range in nanoseconds, emitted after every zoom, pan or new plot
+    view_changed = pyqtSignal('qint64', 'qint64')
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.figure = Figure(figsize=(12, 8), dpi=100)
+        self.canvas = FigureCanvas(self.figure)
+        
+        # Add zoom/pan toolbar above the graph
+        self.toolbar = NavigationToolbar(self.canvas, self)
+        
+        layout = QVBoxLayout()
+        layout.addWidget(self.toolbar)
+        layout.addWidget(self.canvas)
+        
+        # Add parameter selector (shown for multi-parameter data)
+        self.data = None
+        self.series = None   # Parameter series currently drawn
+        self.pyramids = {}   # RollupPyramid per parameter of the loaded data
+        self.lines = {}      # Line2D per statistic, holding decimated data
+        self.buckets = 0     # Plot width in pixels the lines were decimated for
+        self.background = None    # Canvas pixels without the lines, for blitting
+        self.drawn_limits = None  # Axes limits the background was drawn with
+        self.legend_pixels = None # Rendered legend, pasted over blitted lines
+        self.violations = {}      # parameter -> (starts, ends) of alarm rule violations
+        self.parameter_label = QLabel("Parameter:")
+        self.parameter_combo = QComboBox()
+        self.parameter_combo.setMinimumWidth(180)
+        self.parameter_combo.currentTextChanged.connect(self.select_parameter)
+        self.parameter_label.setVisible(False)
+        self.parameter_combo.setVisible(False)
+        
+        # Add reset button
+        self.reset_button = QPushButton("Reset Graph")
+        self.reset_button.clicked.connect(self.reset_graph)
+        self.reset_button.setMaximumWidth(120)
+        
+        button_layout = QHBoxLayout()
+        button_layout.addWidget(self.parameter_label)
+        button_layout.addWidget(self.parameter_combo)
+        button_layout.addStretch()
+        button_layout.addWidget(self.reset_button)
+        
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+        
+        # Initialize the plot once; later updates only replace line data
+        self.ax = self.figure.add_subplot(111)
+        self.ax.set_title("HALog - LINAC Water System Analysis", fontsize=14, fontweight='bold')
+        self.ax.set_xlabel("Time", fontsize=12)
+        self.ax.set_ylabel("Parameter Values", fontsize=12)
+        self.ax.grid(True, alpha=0.3)
+        self.ax.xaxis_date()
+        
+        # Main line using average values, dotted lines for min and max values.
+        # The lines are animated: full redraws only render the axes, and the
+        # lines are blitted on top so data updates skip the axes entirely
+        empty = ([], [])
+        self.lines['avg'], = self.ax.plot(*empty, 'b-', linewidth=2, label='Average', alpha=0.8, animated=True)
+        self.lines['min'], = self.ax.plot(*empty, 'r:', linewidth=1.5, label='Minimum', alpha=0.7, animated=True)
+        self.lines['max'], = self.ax.plot(*empty, 'g:', linewidth=1.5, label='Maximum', alpha=0.7, animated=True)
+        
+        # Add legend with clear color coding, drawn above the lines
+        self.legend = self.ax.legend(loc='upper right', framealpha=0.9)
+        self.legend.set_animated(True)
+        
+        self.placeholder = self.ax.text(0.5, 0.5, "No data loaded\nUse File > Open to load LINAC log data",
+                                        ha='center', va='center', transform=self.ax.transAxes,
+                                        fontsize=12, alpha=0.6)
+        self.placeholder.set_visible(False)
+        
+        # Alarm rule violations of the drawn parameter, shaded over the full
+        # height of the axes; part of the background, not blitted
+        self.violation_shading = PolyCollection([], facecolors=(1.0, 0.0, 0.0, 0.15),
+                                                edgecolors=(1.0, 0.0, 0.0, 0.3), linewidths=0.5,
+                                                transform=self.ax.get_xaxis_transform())
+        self.ax.add_collection(self.violation_shading, autolim=False)
+        self.figure.tight_layout()
+        
+        # Keep a blit background of every full redraw; re-decimate when the plot width
+        # changes; zoom with the mouse wheel; zooming and panning fetch the
+        # visible window again
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+        self.canvas.mpl_connect('resize_event', self.on_resize)
+        self.canvas.mpl_connect('scroll_event', self.on_scroll)
+        self.ax.callbacks.connect('xlim_changed', self.on_xlim_changed)
+        self.reset_graph()
+        
+    def plot_data(self, data):
+        """Plot data with min, max, and average lines"""
+        if data is None or len(data) == 0:
+            return
+            
+        # Frames from process_file are converted to the columnar model
+        if isinstance(data, pd.DataFrame):
+            data = LogDataset.from_records(data)
+            
+        self.data = data
+        self.pyramids = {}
+        
+        # Multi-parameter data is plotted one parameter at a time
+        current = self.parameter_combo.currentText()
+        
+        self.parameter_combo.blockSignals(True)
+        self.parameter_combo.clear()
+        self.parameter_combo.addItems(data.parameters)
+        if current in data.parameters:
+            self.parameter_combo.setCurrentText(current)
+        self.parameter_combo.blockSignals(False)
+        
+        self.parameter_label.setVisible(True)
+        self.parameter_combo.setVisible(True)
+        
+        self.select_parameter(self.parameter_combo.currentText())
+        
+    def update_live(self, data, rewritten=()):
+        """
+        Show the rows added to a live buffer since it was last drawn
+        
+        The pyramid of the drawn parameter is extended rather than rebuilt.
+        A view that was never zoomed or panned keeps fitting the whole buffer;
+        a zoomed one is kept, so the new lines are only blitted, unless it
+        reaches the previous last row and moves along with the newest rows.
+        
+        Args:
+            data (LiveBuffer): Buffer drawn before, grown since
+            rewritten (set): Parameters whose rows changed before their
+                previous last row, which are drawn from scratch
+        """
+        parameter = self.series.parameter if self.series is not None else None
+        if data is not self.data or parameter not in data.parameters or parameter in rewritten:
+            self.plot_data(data)
+            return
+            
+        for new_parameter in data.parameters:
+            if self.parameter_combo.findText(new_parameter) < 0:
+                self.parameter_combo.addItem(new_parameter)
+                
+        # Pyramids of the other parameters are rebuilt when they are selected
+        previous_end = int(self.series.timestamps[-1])
+        self.series = data.series(parameter)
+        self.pyramids = {parameter: self.pyramids[parameter]}
+        self.pyramids[parameter].extend(self.series)
+        
+        timestamps = self.series.timestamps
+        left, right = self.ax.get_xlim()
+        ends = np.array([previous_end, timestamps[-1]], dtype=np.int64)
+        shift = np.diff(mdates.date2num(ends.view('datetime64[ns]')))[0]
+        if self.ax.get_autoscalex_on():
+            # A view never zoomed or panned keeps showing the whole window
+            self.set_lines(self.visible_lines(timestamps[0], timestamps[-1]))
+            self.ax.relim()
+            self.ax.autoscale_view()
+            self.toolbar.update()
+            self.update_view()
+        elif shift > 0 and pd.Timestamp(mdates.num2date(right)).value >= previous_end:
+            # Fetches the moved window through on_xlim_changed
+            self.ax.set_xlim(left + shift, right + shift)
+            self.ax.relim()
+            self.ax.autoscale_view(scalex=False)
+        else:
+            self.refresh_lines()
+            
+    def select_parameter(self, parameter):
+        """Plot the series of one parameter"""
+        if self.data is None or parameter not in self.data.parameters:
+            return
+            
+        self.draw_series(self.data.series(parameter))
+        
+    def draw_series(self, series):
+        """Draw min, max, and average lines of a single parameter series"""
+        if series.parameter != self.ax.get_ylabel():
+            self.ax.set_ylabel(series.parameter, fontsize=12)
+            self.figure.tight_layout()
+            self.background = None
+        self.show_placeholder(False)
+        
+        # Only the rows that change a pixel are plotted, so drawing cost
+        # follows the plot width instead of the number of rows
+        self.series = series
+        self.shade_violations()
+        if series.parameter not in self.pyramids:
+            self.pyramids[series.parameter] = RollupPyramid(series)
+        self.set_lines(self.visible_lines(series.timestamps[0], series.timestamps[-1]))
+        
+        # Fit the axes to the new data; a change of limits re-fetches the
+        # visible window through on_xlim_changed
+        self.ax.set_autoscale_on(True)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.toolbar.update()
+        self.update_view()
+        
+    def set_violations(self, violations):
+        """
+        Shade alarm rule violations
+        
+        Args:
+            violations (dict): parameter -> (starts, ends) arrays of intervals
+                in nanoseconds, as returned by core.rules.violation_spans
+        """
+        self.violations = violations
+        self.shade_violations()
+        self.background = None
+        self.canvas.draw_idle()
+        
+    def shade_violations(self):
+        """Shade the violation intervals of the parameter currently drawn"""
+        starts, ends = self.violations.get(self.series.parameter if self.series is not None else None,
+                                           (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)))
+        left = mdates.date2num(starts.view('datetime64[ns]'))
+        right = mdates.date2num(ends.view('datetime64[ns]'))
+        
+        # One rectangle per interval, in data x and axes y coordinates
+        verts = np.empty((len(left), 4, 2))
+        verts[:, :, 0] = np.column_stack((left, left, right, right))
+        verts[:, :, 1] = (0, 1, 1, 0)
+        self.violation_shading.set_verts(verts)
+        
+    def plot_width(self):
+        """Width of the plot area in pixels"""
+        return max(int(self.ax.bbox.width), 1)
+        
+    def visible_lines(self, start, end):
+        """
+        Decimated avg, min and max lines of the current series between two times
+        
+        The rows come from the finest pyramid level that has at most
+        WINDOW_ROWS_PER_PIXEL rows per pixel in the window, so the cost
+        depends on the plot width rather than on the size of the series.
+        """
+        self.buckets = self.plot_width()
+        pyramid = self.pyramids[self.series.parameter]
+        _, rows = pyramid.window(start, end, WINDOW_ROWS_PER_PIXEL * self.buckets)
+        return downsample_series(rows, self.buckets, start, end)
+        
+    def refresh_lines(self):
+        """Replace the line data with the window currently visible"""
+        if self.series is None:
+            return
+            
+        start, end = (pd.Timestamp(mdates.num2date(x)).value for x in self.ax.get_xlim())
+        self.set_lines(self.visible_lines(start, end))
+        self.update_view()
+        self.view_changed.emit(start, end)
+        
+    def set_lines(self, lines):
+        """Replace the data of the avg, min and max lines"""
+        for name, line_data in lines.items():
+            self.lines[name].set_data(*self._line_data(line_data))
+            
+    def show_placeholder(self, visible):
+        """Show the 'No data loaded' hint instead of the legend, or the reverse"""
+        if self.placeholder.get_visible() != visible:
+            self.placeholder.set_visible(visible)
+            self.legend.set_visible(not visible)
+            self.background = None
+        
+    def update_view(self):
+        """
+        Show changed line data
+        
+        While the axes limits are those of the last full redraw, the lines are
+        blitted over the saved background; otherwise ticks and labels change
+        and the canvas is redrawn.
+        """
+        if self.background is None or self.limits() != self.drawn_limits:
+            self.canvas.draw_idle()
+            return
+            
+        self.canvas.restore_region(self.background)
+        for line in self.lines.values():
+            self.ax.draw_artist(line)
+        if self.legend_pixels is not None:
+            self.canvas.restore_region(self.legend_pixels)
+        self.canvas.blit(self.ax.bbox)
+        
+    def limits(self):
+        """Current x and y limits of the axes"""
+        return self.ax.get_xlim(), self.ax.get_ylim()
+        
+    def on_draw(self, event):
+        """Save the freshly drawn axes as blit background and add the lines"""
+        # Figures saved from the toolbar are drawn at another size or by
+        # another backend, so they leave no usable background
+        saving = self.canvas.is_saving()
+        if saving:
+            self.background = None
+        else:
+            self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+            self.drawn_limits = self.limits()
+            
+        for line in self.lines.values():
+            line.draw(event.renderer)
+            
+        # The legend only changes with a full redraw, so blits reuse its pixels
+        self.legend.draw(event.renderer)
+        self.legend_pixels = None
+        if self.legend.get_visible() and not saving:
+            self.legend_pixels = self.canvas.copy_from_bbox(self.legend.get_window_extent(event.renderer))
+        
+    def on_xlim_changed(self, ax):
+        """Fetch the newly visible window after a zoom or pan"""
+        self.refresh_lines()
+        
+    def on_resize(self, event):
+        """Fit the layout and decimate the visible window for the new size"""
+        self.figure.tight_layout()
+        self.background = None
+        if self.series is not None and self.plot_width() != self.buckets:
+            self.refresh_lines()
+            
+    def on_scroll(self, event):
+        """Zoom the time axis around the mouse position"""
+        if self.series is None or event.inaxes is not self.ax:
+            return
+            
+        scale = 1 / SCROLL_ZOOM_FACTOR if event.button == 'up' else SCROLL_ZOOM_FACTOR
+        left, right = self.ax.get_xlim()
+        self.toolbar.push_current()
+        self.ax.set_xlim(event.xdata - (event.xdata - left) * scale, event.xdata + (right - event.xdata) * scale)
+        
+    @staticmethod
+    def _line_data(line_data):
+        timestamps, values = line_data
+        return timestamps.view('datetime64[ns]'), values
+        
+    def reset_graph(self):
+        """Clear the current graph and allow reloading fresh data"""
+        self.data = None
+        self.series = None
+        self.pyramids = {}
+        self.violations = {}
+        self.shade_violations()
+        self.parameter_combo.clear()
+        self.parameter_label.setVisible(False)
+        self.parameter_combo.setVisible(False)
+        self.set_lines(dict.fromkeys(self.lines, (np.empty(0, dtype=np.int64), np.empty(0))))
+        self.ax.set_ylabel("Parameter Values", fontsize=12)
+        self.ax.set_xlim(mdates.date2num(pd.Timestamp.now().normalize()) + np.array([0, 1]))
+        self.ax.set_ylim(0, 1)
+        self.show_placeholder(True)
+        self.canvas.draw_idle()
\ No newline at end of file
@@ -3,119 +3,226 @@ Main Window for HALog Application
 Implements the primary UI with Windows 11 styling and proper menu layout
 """
 
+import importlib
 import os
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                            QMenuBar, QAction, QFileDialog, QTextEdit, QSplitter,
                            QGroupBox, QPushButton, QLabel, QProgressBar, QStatusBar,
-                           QMessageBox, QFrame)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+                           QMessageBox, QFrame, QComboBox, QInputDialog)
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
 
-from core.data_processor import DataProcessor
-from core.file_handler import FileHandler
+from core.progress import CancelToken, LoadCancelled, ProgressThrottle
+from core.timing import StageTimer, format_timings
+
+# Modules behind the graph and file loading. They take most of the startup
+# time, so they are imported in the background once the window is shown
+BACKGROUND_MODULES = ('ui.graph_widget', 'core.data_processor', 'core.parse_cache')
+
+# Shortest time between redraws of a followed log (at most 2 frames per second,
+# matching how often the file is polled). While the view follows the newest
+# rows a frame redraws the whole figure as the time axis moves, so the frame
+# rate sets most of live mode's CPU use; otherwise only the lines are blitted
+LIVE_FRAME_INTERVAL = 500  # Milliseconds
 
 class DataProcessingThread(QThread):
-    """Background thread for processing large data files"""
-    progress_updated = pyqtSignal(int)
+    """
+    Background thread for processing large data files
+    
+    Progress is emitted as (bytes_done, total_bytes) at most about 10 times a
+    second, and the records parsed so far about once a second. The summary
+    statistics gathered while parsing are emitted just before the data.
+    cancel() stops the load at the next block boundary; a cancelled load
+    emits nothing further and caches nothing.
+    """
+    progress_updated = pyqtSignal('qint64', 'qint64')
+    partial_ready = pyqtSignal(object)
+    timings_ready = pyqtSignal(dict)
+    summary_ready = pyqtSignal(object)
     data_ready = pyqtSignal(object)
     error_occurred = pyqtSignal(str)
     
-    def __init__(self, file_path):
+    def __init__(self, file_path, cache=None):
         super().__init__()
         self.file_path = file_path
+        self.cache = cache
+        self.cancel_token = CancelToken()
+        
+    def cancel(self):
+        """Ask the load to stop; returns at once, the thread finishes shortly after"""
+        self.cancel_token.cancel()
         
     def run(self):
         try:
-            processor = DataProcessor()
-            data = processor.process_file(self.file_path, progress_callback=self.progress_updated.emit)
-            self.data_ready.emit(data)
+            from core.data_processor import DataProcessor
+            from core.file_handler import FileHandler
+            
+            processor = DataProcessor(cache=self.cache, cancel_token=self.cancel_token)
+            result = processor.ingest(self.file_path, ProgressThrottle(self.progress_updated.emit), FileHandler(),
+                                      partial_callback=self.partial_ready.emit)
+            if self.cancel_token.cancelled:
+                return
+            self.timings_ready.emit(result.timings)
+            self.summary_ready.emit(result.summary)
+            self.data_ready.emit(result.dataset)
+        except LoadCancelled:
+            pass
         except Exception as e:
-            self.error_occurred.emit(str(e))
+            if not self.cancel_token.cancelled:
+                self.error_occurred.emit(str(e))
 
-class GraphWidget(QWidget):
-    """Custom widget for matplotlib graphs"""
+class MultiFileProcessingThread(DataProcessingThread):
+    """
+    Background thread loading several files into one merged timeline
     
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.figure = Figure(figsize=(12, 8), dpi=100)
-        self.canvas = FigureCanvas(self.figure)
-        
-        layout = QVBoxLayout()
-        layout.addWidget(self.canvas)
-        
-        # Add reset button
-        self.reset_button = QPushButton("Reset Graph")
-        self.reset_button.clicked.connect(self.reset_graph)
-        self.reset_button.setMaximumWidth(120)
-        
-        button_layout = QHBoxLayout()
-        button_layout.addStretch()
-        button_layout.addWidget(self.reset_button)
-        
-        layout.addLayout(button_layout)
-        self.setLayout(layout)
-        
-        # Initialize empty plot
-        self.ax = self.figure.add_subplot(111)
-        self.ax.set_title("HALog - LINAC Water System Analysis")
-        self.ax.set_xlabel("Time")
-        self.ax.set_ylabel("Parameter Values")
-        self.canvas.draw()
+    Files are parsed concurrently (see core.timeline.load_timeline) and their
+    progress is emitted per file as (file index, bytes_done, total_bytes).
+    """
+    file_progress = pyqtSignal(int, 'qint64', 'qint64')
+    files_ready = pyqtSignal(list)
+    
+    def __init__(self, file_paths, cache=None):
+        super().__init__(None, cache)
+        self.file_paths = list(file_paths)
         
-    def plot_data(self, data):
-        """Plot data with min, max, and average lines"""
-        if data is None or data.empty:
-            return
+    def run(self):
+        try:
+            from core.timeline import load_timeline
             
-        self.ax.clear()
-        
-        # Set up the plot
-        self.ax.set_title("HALog - LINAC Water System Analysis", fontsize=14, fontweight='bold')
-        self.ax.set_xlabel("Time", fontsize=12)
-        self.ax.set_ylabel("Parameter Values", fontsize=12)
-        self.ax.grid(True, alpha=0.3)
-        
-        # Plot main line using average values
-        if 'avg' in data.columns:
-            self.ax.plot(data.index, data['avg'], 'b-', linewidth=2, label='Average', alpha=0.8)
-        
-        # Overlay dotted lines for min and max values
-        if 'min' in data.columns:
-            self.ax.plot(data.index, data['min'], 'r:', linewidth=1.5, label='Minimum', alpha=0.7)
+            result = load_timeline(self.file_paths, self.cache, progress_callback=self.file_progress.emit,
+                                   cancel_token=self.cancel_token)
+            if self.cancel_token.cancelled:
+                return
+            self.files_ready.emit(result.files)
+            self.timings_ready.emit(result.timings)
+            self.data_ready.emit(result.dataset)
+        except LoadCancelled:
+            pass
+        except Exception as e:
+            if not self.cancel_token.cancelled:
+                self.error_occurred.emit(str(e))
+
+class HistoryQueryThread(DataProcessingThread):
+    """
+    Background thread reading a time window of a machine's stored history
+    
+    The window ends at the machine's latest stored record and spans days
+    before it, or the whole history when days is None.
+    """
+    
+    def __init__(self, store_path, machine, days=None):
+        super().__init__(None)
+        self.store_path = store_path
+        self.machine = machine
+        self.days = days
         
-        if 'max' in data.columns:
-            self.ax.plot(data.index, data['max'], 'g:', linewidth=1.5, label='Maximum', alpha=0.7)
+    def run(self):
+        try:
+            import pandas as pd
+            from core.store import HistoryStore
+            
+            timer = StageTimer()
+            with HistoryStore(self.store_path) as store:
+                start, end = store.time_range(self.machine)
+                if start is not None and self.days is not None:
+                    start = max(start, end - pd.Timedelta(days=self.days))
+                timer.lap('open')
+                dataset = store.query(self.machine, start, end)
+                timer.lap('query')
+            if self.cancel_token.cancelled:
+                return
+            self.timings_ready.emit(timer.timings)
+            self.data_ready.emit(dataset)
+        except Exception as e:
+            if not self.cancel_token.cancelled:
+                self.error_occurred.emit(str(e))
+
+class LiveTailThread(QThread):
+    """
+    Background thread following a log file as it is written
+    
+    Appended lines are parsed as they arrive and emitted as a LogDataset of
+    new rows. Between polls the thread sleeps, so an idle file costs almost
+    nothing; drawing is left to the window.
+    """
+    rows_ready = pyqtSignal(object)
+    error_occurred = pyqtSignal(str)
+    
+    def __init__(self, file_path):
+        super().__init__()
+        self.file_path = file_path
+        self.cancel_token = CancelToken()
         
-        # Add legend with clear color coding
-        self.ax.legend(loc='upper right', framealpha=0.9)
+    def stop(self):
+        """Stop following; returns at once, the thread finishes shortly after"""
+        self.cancel_token.cancel()
         
-        # Improve layout
-        self.figure.tight_layout()
-        self.canvas.draw()
+    def run(self):
+        try:
+            from core.live import LIVE_POLL_INTERVAL, LogTailer
+            
+            tailer = LogTailer(self.file_path)
+            while not self.cancel_token.cancelled:
+                rows = tailer.poll()
+                if rows is not None:
+                    self.rows_ready.emit(rows)
+                    
+                # A file with more unread lines is read again at once
+                if not tailer.behind:
+                    self.cancel_token.wait(LIVE_POLL_INTERVAL)
+        except Exception as e:
+            if not self.cancel_token.cancelled:
+                self.error_occurred.emit(str(e))
+
+class ModuleLoader(QThread):
+    """Background thread importing modules ahead of their first use"""
+    
+    def __init__(self, modules):
+        super().__init__()
+        self.modules = modules
         
-    def reset_graph(self):
-        """Clear the current graph and allow reloading fresh data"""
-        self.ax.clear()
-        self.ax.set_title("HALog - LINAC Water System Analysis")
-        self.ax.set_xlabel("Time")
-        self.ax.set_ylabel("Parameter Values")
-        self.ax.text(0.5, 0.5, "No data loaded\nUse File > Open to load LINAC log data", 
-                    ha='center', va='center', transform=self.ax.transAxes, 
-                    fontsize=12, alpha=0.6)
-        self.canvas.draw()
+    def run(self):
+        for name in self.modules:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                # Reported when the module is imported again where it is needed
+                pass
 
 class MainWindow(QMainWindow):
     """Main application window with Windows 11 styling"""
     
-    def __init__(self):
+    # Seconds per startup stage, emitted once the graph is ready
+    startup_finished = pyqtSignal(dict)
+    
+    def __init__(self, startup_timer=None):
         super().__init__()
         self.data = None
+        self.data_index = None  # DatasetIndex of data, for window statistics
+        self.data_summary = None  # StreamingSummary of data, when its load kept one
+        self.summary_window = (None, None)  # Time range the summary describes
+        self.alarm_rules = []    # Rules loaded from File > Load Alarm Rules
+        self.rule_results = None # RuleViolations of the rules over data
         self.processing_thread = None
+        self.cancelled_threads = set()  # Cancelled loads kept alive until their threads finish
+        self.module_loader = None
+        self.parse_cache = None
+        self.load_timings = {}
+        self.pending_partial = None  # Latest partial dataset not drawn yet
+        self.file_states = []  # [name, bytes_done, total_bytes, error] per file of a multi-file load
+        self.live_thread = None
+        self.live_buffer = None  # LiveBuffer of the followed log
+        self.live_dirty = False  # Whether rows arrived since the last live frame
+        self.live_rewritten = set()  # Parameters whose earlier rows changed since the last live frame
+        self.startup_timer = startup_timer
+        self.graph_widget = None
         self.init_ui()
         
+        # Live rows are drawn on a fixed clock rather than as they arrive
+        self.live_timer = QTimer(self)
+        self.live_timer.setInterval(LIVE_FRAME_INTERVAL)
+        self.live_timer.timeout.connect(self.draw_live)
+        
     def init_ui(self):
         """Initialize the user interface"""
         # Set window properties with correct title
@@ -226,10 +333,17 @@ class MainWindow(QMainWindow):
         # Create status bar
         self.create_status_bar()
         
-        # Create progress bar (initially hidden)
+        # Create progress bar and cancel button (initially hidden)
+        progress_layout = QHBoxLayout()
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
-        main_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.progress_bar)
+        
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel_loading)
+        self.cancel_button.setVisible(False)
+        progress_layout.addWidget(self.cancel_button)
+        main_layout.addLayout(progress_layout)
         
     def create_menu_bar(self):
         """Create Windows 11 style menu bar positioned at top-left"""
@@ -239,12 +353,40 @@ class MainWindow(QMainWindow):
         file_menu = menubar.addMenu('File')
         
         # Open action
-        open_action = QAction('Open Log File...', self)
+        open_action = QAction('Open Log Files...', self)
         open_action.setShortcut('Ctrl+O')
-        open_action.setStatusTip('Open LINAC log file for analysis')
+        open_action.setStatusTip('Open one or more LINAC log files for analysis')
         open_action.triggered.connect(self.open_file)
         file_menu.addAction(open_action)
         
+        # History store action
+        history_action = QAction('Open History...', self)
+        history_action.setShortcut('Ctrl+H')
+        history_action.setStatusTip('Show a window of a machine history stored with --ingest')
+        history_action.triggered.connect(self.open_history)
+        file_menu.addAction(history_action)
+        
+        # Live monitoring actions
+        follow_action = QAction('Follow Live Log...', self)
+        follow_action.setShortcut('Ctrl+L')
+        follow_action.setStatusTip('Follow a log file as it is written')
+        follow_action.triggered.connect(self.open_live_file)
+        file_menu.addAction(follow_action)
+        
+        self.stop_following_action = QAction('Stop Following', self)
+        self.stop_following_action.setStatusTip('Stop following the live log')
+        self.stop_following_action.setEnabled(False)
+        self.stop_following_action.triggered.connect(self.stop_following)
+        file_menu.addAction(self.stop_following_action)
+        
+        file_menu.addSeparator()
+        
+        # Alarm rules action
+        rules_action = QAction('Load Alarm Rules...', self)
+        rules_action.setStatusTip('Load threshold and drift rules and shade their violations')
+        rules_action.triggered.connect(self.open_rules_file)
+        file_menu.addAction(rules_action)
+        
         file_menu.addSeparator()
         
         # Exit action
@@ -305,7 +447,7 @@ class MainWindow(QMainWindow):
         controls_group = QGroupBox("Controls")
         controls_layout = QVBoxLayout()
         
-        self.load_button = QPushButton("Load Log File")
+        self.load_button = QPushButton("Load Log Files")
         self.load_button.clicked.connect(self.open_file)
         controls_layout.addWidget(self.load_button)
         
@@ -332,16 +474,43 @@ class MainWindow(QMainWindow):
         graph_group = QGroupBox("LINAC Water System Analysis")
         graph_layout = QVBoxLayout()
         
-        # Create graph widget
-        self.graph_widget = GraphWidget()
-        graph_layout.addWidget(self.graph_widget)
+        # The graph widget replaces this placeholder once matplotlib is loaded
+        self.graph_placeholder = QLabel("Loading graph...")
+        self.graph_placeholder.setAlignment(Qt.AlignCenter)
+        graph_layout.addWidget(self.graph_placeholder)
         
+        self.graph_layout = graph_layout
         graph_group.setLayout(graph_layout)
         right_layout.addWidget(graph_group)
         
         right_widget.setLayout(right_layout)
         return right_widget
         
+    def showEvent(self, event):
+        """Start loading the heavy modules once the window is first shown"""
+        super().showEvent(event)
+        
+        if self.module_loader is None:
+            self.module_loader = ModuleLoader(BACKGROUND_MODULES)
+            self.module_loader.finished.connect(self.create_graph_widget)
+            QTimer.singleShot(0, self.module_loader.start)
+            
+    def create_graph_widget(self):
+        """Swap the placeholder for the graph, importing it now if still needed"""
+        if self.graph_widget is not None:
+            return
+            
+        from ui.graph_widget import GraphWidget
+        
+        self.graph_widget = GraphWidget()
+        self.graph_widget.view_changed.connect(self.update_summary)
+        self.graph_layout.replaceWidget(self.graph_placeholder, self.graph_widget)
+        self.graph_placeholder.deleteLater()
+        
+        if self.startup_timer is not None:
+            self.startup_timer.lap('graph')
+            self.startup_finished.emit(dict(self.startup_timer.timings))
+            
     def create_status_bar(self):
         """Create status bar"""
         self.status_bar = QStatusBar()
@@ -349,23 +518,236 @@ class MainWindow(QMainWindow):
         self.status_bar.showMessage("Ready - Load a LINAC log file to begin analysis")
         
     def open_file(self):
-        """Open file dialog and load LINAC log file"""
-        file_path, _ = QFileDialog.getOpenFileName(
+        """Open file dialog and load one LINAC log file, or several as one timeline"""
+        file_paths, _ = QFileDialog.getOpenFileNames(
             self,
-            "Open LINAC Log File",
+            "Open LINAC Log Files",
             "",
             "Log Files (*.log *.txt *.csv);;All Files (*)"
         )
         
+        if len(file_paths) == 1:
+            self.load_file(file_paths[0])
+        elif file_paths:
+            self.load_files(file_paths)
+            
+    def open_history(self):
+        """Ask for a history store, a machine and a number of days, then load that window"""
+        from core.store import DEFAULT_STORE_PATH, HistoryStore
+        
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Open History Store",
+            os.path.dirname(DEFAULT_STORE_PATH),
+            "History Stores (*.db);;All Files (*)"
+        )
+        if not file_path:
+            return
+            
+        try:
+            with HistoryStore(file_path) as store:
+                machines = store.machines()
+        except Exception as e:
+            QMessageBox.warning(self, "History", f"Could not open the history store:\n\n{e}")
+            return
+        if not machines:
+            QMessageBox.information(self, "History", "The history store holds no data yet.")
+            return
+            
+        machine, accepted = machines[0], True
+        if len(machines) > 1:
+            machine, accepted = QInputDialog.getItem(self, "History", "Machine:", machines, 0, False)
+        if not accepted:
+            return
+            
+        days, accepted = QInputDialog.getInt(
+            self, "History Window", "Days of history up to the latest record:", 30, 1, 100 * 365
+        )
+        if accepted:
+            self.load_history(file_path, machine, days)
+            
+    def load_history(self, store_path, machine, days=None):
+        """
+        Load a window of a machine's stored history, replacing any load in progress
+        
+        Args:
+            store_path (str): History store database
+            machine (str): Machine name
+            days (int): Days up to the latest record (None = whole history)
+        """
+        self.cancel_loading()
+        self.stop_following()
+        
+        self.status_bar.showMessage(f"Loading history of {machine}")
+        self.show_progress(True)
+        self.progress_bar.setValue(0)
+        self.file_info_label.setText(
+            f"History: {machine}\n"
+            f"Window: {f'last {days} days' if days else 'all records'}\n"
+            f"Store: {store_path}"
+        )
+        
+        self.start_loading(HistoryQueryThread(store_path, machine, days))
+        
+    def open_live_file(self):
+        """Ask for a log file and a retention window, then follow the file"""
+        from core.live import DEFAULT_RETENTION_MINUTES
+        
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Follow LINAC Log File",
+            "",
+            "Log Files (*.log *.txt);;All Files (*)"
+        )
+        if not file_path:
+            return
+            
+        minutes, accepted = QInputDialog.getInt(
+            self, "Retention Window", "Minutes of log history to keep:", DEFAULT_RETENTION_MINUTES, 1, 7 * 24 * 60
+        )
+        if accepted:
+            self.follow_file(file_path, minutes)
+            
+    def open_rules_file(self):
+        """Ask for an alarm rules file and check the loaded data against it"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Load Alarm Rules",
+            "",
+            "Rule Files (*.txt *.rules);;All Files (*)"
+        )
         if file_path:
-            self.load_file(file_path)
+            self.load_alarm_rules(file_path)
+            
+    def load_alarm_rules(self, file_path):
+        """
+        Replace the alarm rules with those of a file
+        
+        Args:
+            file_path (str): Text file with one rule per line, such as
+                "pump_pressure < 40" or "target_flow drift > 10%"
+        """
+        from core.rules import load_rules
+        
+        try:
+            self.alarm_rules = load_rules(file_path)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Alarm Rules", f"Could not load alarm rules:\n\n{e}")
+            return
+            
+        self.status_bar.showMessage(f"Loaded {len(self.alarm_rules)} alarm rules from {os.path.basename(file_path)}")
+        self.evaluate_alarm_rules()
+        
+    def evaluate_alarm_rules(self):
+        """Check the loaded data against the alarm rules, shade violations and list them in the summary"""
+        from core.rules import evaluate_rules, violation_spans
+        
+        self.rule_results = None
+        if self.data_index is not None and self.alarm_rules:
+            try:
+                self.rule_results = evaluate_rules(self.data, self.alarm_rules)
+            except ValueError as e:
+                self.status_bar.showMessage(f"Alarm rules not checked: {e}")
+                
+        if self.graph_widget is not None:
+            self.graph_widget.set_violations(violation_spans(self.rule_results or []))
+        self.update_summary(*self.summary_window)
+        
+    def follow_file(self, file_path, retention_minutes=None):
+        """
+        Follow a log file as it is written
+        
+        Args:
+            file_path (str): Path to a line-oriented log file
+            retention_minutes (int): Minutes of log time kept and plotted
+                (default: DEFAULT_RETENTION_MINUTES)
+        """
+        from core.live import DEFAULT_RETENTION_MINUTES, LiveBuffer
+        from core.pyramid import MINUTE
+        
+        self.cancel_loading()
+        self.stop_following()
+        
+        retention_minutes = retention_minutes or DEFAULT_RETENTION_MINUTES
+        self.live_buffer = LiveBuffer(retention_minutes * MINUTE)
+        self.live_dirty = False
+        self.live_rewritten = set()
+        self.data = None
+        self.data_index = None
+        self.data_summary = None
+        self.evaluate_alarm_rules()  # Clears the previous data's violations
+        
+        self.file_info_label.setText(
+            f"Following: {os.path.basename(file_path)}\n"
+            f"Retention: {retention_minutes} minutes\n"
+            f"Path: {file_path}"
+        )
+        self.status_bar.showMessage(f"Following {os.path.basename(file_path)} - waiting for new lines")
+        
+        self.live_thread = LiveTailThread(file_path)
+        self.live_thread.rows_ready.connect(self.live_rows_loaded)
+        self.live_thread.error_occurred.connect(self.live_error)
+        self.live_thread.finished.connect(self.loading_finished)
+        self.live_thread.start()
+        self.live_timer.start()
+        self.stop_following_action.setEnabled(True)
+        
+    def stop_following(self):
+        """Stop following the live log without waiting for its thread"""
+        thread = self.live_thread
+        if thread is None:
+            return
             
+        self.live_thread = None
+        self.live_timer.stop()
+        self.stop_following_action.setEnabled(False)
+        thread.stop()
+        if thread.isRunning():
+            self.cancelled_threads.add(thread)
+        self.status_bar.showMessage(f"Stopped following {os.path.basename(thread.file_path)}")
+        
+    def live_rows_loaded(self, rows):
+        """Add new rows of the followed log to the window; they are drawn on the next frame"""
+        if self.sender() is not self.live_thread:
+            return
+        self.live_rewritten |= self.live_buffer.append(rows)
+        self.live_dirty = True
+        
+    def draw_live(self):
+        """Draw the rows of the followed log that arrived since the last frame"""
+        if not self.live_dirty or self.live_thread is None or not self.live_buffer.parameters:
+            return
+        self.live_dirty = False
+        rewritten, self.live_rewritten = self.live_rewritten, set()
+        
+        self.create_graph_widget()
+        self.graph_widget.update_live(self.live_buffer, rewritten)
+        
+        start, end = self.live_buffer.time_range()
+        self.summary_text.setPlainText(
+            f"Records in window: {len(self.live_buffer)}\n"
+            f"Parameters: {', '.join(self.live_buffer.parameters)}\n"
+            f"Window: {start} to {end}\n"
+        )
+        self.status_bar.showMessage(f"Following {os.path.basename(self.live_thread.file_path)} - last record at {end}")
+        
+    def live_error(self, error_message):
+        """Stop following after the live log could not be read"""
+        if self.sender() is not self.live_thread:
+            return
+        self.stop_following()
+        self.handle_error(error_message)
+        
     def load_file(self, file_path):
-        """Load and process the selected file"""
+        """Load and process the selected file, replacing any load in progress"""
         try:
+            # One load per window: a newer file supersedes the one still parsing
+            self.cancel_loading()
+            self.stop_following()
+            
             # Update UI
             self.status_bar.showMessage(f"Loading file: {os.path.basename(file_path)}")
-            self.progress_bar.setVisible(True)
+            self.show_progress(True)
             self.progress_bar.setValue(0)
             
             # Update file info
@@ -378,57 +760,240 @@ class MainWindow(QMainWindow):
             )
             
             # Start background processing
-            self.processing_thread = DataProcessingThread(file_path)
-            self.processing_thread.progress_updated.connect(self.update_progress)
-            self.processing_thread.data_ready.connect(self.data_loaded)
-            self.processing_thread.error_occurred.connect(self.handle_error)
-            self.processing_thread.start()
+            self.start_loading(DataProcessingThread(file_path, self.get_parse_cache()))
             
         except Exception as e:
             self.handle_error(f"Error loading file: {str(e)}")
             
-    def update_progress(self, value):
-        """Update progress bar"""
-        self.progress_bar.setValue(value)
+    def load_files(self, file_paths):
+        """Load several files concurrently and show them as one merged timeline"""
+        try:
+            self.cancel_loading()
+            self.stop_following()
+            
+            self.status_bar.showMessage(f"Loading {len(file_paths)} files")
+            self.show_progress(True)
+            self.progress_bar.setValue(0)
+            
+            self.file_states = [[os.path.basename(path), 0, os.path.getsize(path), None] for path in file_paths]
+            self.show_file_states()
+            
+            thread = MultiFileProcessingThread(file_paths, self.get_parse_cache())
+            thread.file_progress.connect(self.update_file_progress)
+            thread.files_ready.connect(self.files_loaded)
+            self.start_loading(thread)
+            
+        except Exception as e:
+            self.handle_error(f"Error loading files: {str(e)}")
+            
+    def get_parse_cache(self):
+        """Return the window's parse cache, creating it on first use"""
+        if self.parse_cache is None:
+            from core.parse_cache import ParseCache
+            self.parse_cache = ParseCache()
+        return self.parse_cache
+        
+    def start_loading(self, thread):
+        """Connect a processing thread to the window and start it as the current load"""
+        self.processing_thread = thread
+        self.data_index = None
+        self.data_summary = None
+        self.evaluate_alarm_rules()  # Clears the previous data's violations
+        thread.progress_updated.connect(self.update_progress)
+        thread.partial_ready.connect(self.partial_loaded)
+        thread.timings_ready.connect(self.timings_loaded)
+        thread.summary_ready.connect(self.summary_loaded)
+        thread.data_ready.connect(self.data_loaded)
+        thread.error_occurred.connect(self.handle_error)
+        thread.finished.connect(self.loading_finished)
+        thread.start()
+        
+    def cancel_loading(self):
+        """Stop the load in progress without waiting for its thread"""
+        thread = self.processing_thread
+        if thread is None:
+            return
+            
+        self.processing_thread = None
+        self.show_progress(False)
+        if thread.isRunning():
+            thread.cancel()
+            self.cancelled_threads.add(thread)
+            self.status_bar.showMessage("Loading cancelled")
+            
+    def loading_finished(self):
+        """Drop a cancelled load once its thread has stopped"""
+        self.cancelled_threads.discard(self.sender())
+        
+    def is_current_load(self):
+        """Whether the signal being handled comes from the load in progress"""
+        sender = self.sender()
+        return not isinstance(sender, DataProcessingThread) or sender is self.processing_thread
+        
+    def show_progress(self, visible):
+        """Show or hide the progress bar and its cancel button"""
+        self.progress_bar.setVisible(visible)
+        self.cancel_button.setVisible(visible)
+        
+    def update_progress(self, bytes_done, total_bytes):
+        """Update progress bar from the bytes parsed so far"""
+        if not self.is_current_load():
+            return
+        self.progress_bar.setValue(100 * bytes_done // total_bytes if total_bytes else 100)
         
+    def update_file_progress(self, index, bytes_done, total_bytes):
+        """Update one file's progress and the overall progress bar of a multi-file load"""
+        if not self.is_current_load():
+            return
+            
+        self.file_states[index][1:3] = [bytes_done, total_bytes]
+        done = sum(state[1] for state in self.file_states)
+        total = sum(state[2] for state in self.file_states)
+        self.progress_bar.setValue(100 * done // total if total else 100)
+        self.show_file_states()
+        
+    def files_loaded(self, results):
+        """Show which files of a multi-file load failed"""
+        if not self.is_current_load():
+            return
+            
+        for state, result in zip(self.file_states, results):
+            state[1], state[3] = state[2], result['error']
+        self.show_file_states()
+        
+    def show_file_states(self):
+        """List the files of a multi-file load with their progress"""
+        lines = [f"Files: {len(self.file_states)}"]
+        for name, bytes_done, total_bytes, error in self.file_states:
+            if error:
+                lines.append(f"{name}: failed - {error}")
+            else:
+                lines.append(f"{name}: {100 * bytes_done // total_bytes if total_bytes else 100}%")
+        self.file_info_label.setText("\n".join(lines))
+        
+    def partial_loaded(self, data):
+        """Queue the records parsed so far for drawing"""
+        if not self.is_current_load():
+            return
+            
+        # Partials arriving while one is drawn replace each other; only the latest is shown
+        if self.pending_partial is None:
+            QTimer.singleShot(0, self.show_partial)
+        self.pending_partial = data
+        
+    def show_partial(self):
+        """Draw the latest partial result of the load in progress"""
+        data, self.pending_partial = self.pending_partial, None
+        if data is None or self.processing_thread is None:
+            return
+            
+        self.create_graph_widget()
+        self.graph_widget.plot_data(data)
+        _, end = data.time_range()
+        self.status_bar.showMessage(f"Loading... showing {len(data)} records up to {end}")
+        
+    def timings_loaded(self, timings):
+        """Keep the stage timings of the load in progress"""
+        if self.is_current_load():
+            self.load_timings = timings
+            
+    def summary_loaded(self, summary):
+        """Keep the summary statistics gathered while the load in progress was parsed"""
+        if self.is_current_load():
+            self.data_summary = summary
+            
     def data_loaded(self, data):
         """Handle data loading completion"""
-        self.data = data
-        self.progress_bar.setVisible(False)
-        
-        if data is not None and not data.empty:
-            # Update summary
-            summary = f"Records: {len(data)}\n"
-            if 'avg' in data.columns:
-                summary += f"Average range: {data['avg'].min():.2f} - {data['avg'].max():.2f}\n"
-            if 'min' in data.columns:
-                summary += f"Minimum value: {data['min'].min():.2f}\n"
-            if 'max' in data.columns:
-                summary += f"Maximum value: {data['max'].max():.2f}\n"
+        if not self.is_current_load():
+            return
             
-            self.summary_text.setPlainText(summary)
+        from core.query import DatasetIndex
+        
+        self.data = data
+        self.data_index = None
+        self.pending_partial = None
+        self.show_progress(False)
+        
+        if data is not None and len(data) > 0:
+            # Check alarm rules and update the summary; it follows the
+            # visible range once the graph is drawn
+            self.data_index = DatasetIndex(data)
+            self.summary_window = (None, None)
+            self.create_graph_widget()
+            self.evaluate_alarm_rules()
             
             # Plot the data
             self.graph_widget.plot_data(data)
-            self.status_bar.showMessage("Data loaded successfully - Graph updated")
+            self.status_bar.showMessage(
+                f"Data loaded successfully - Graph updated ({format_timings(self.load_timings)})"
+            )
         else:
             self.handle_error("No valid data found in file")
             
+    def update_summary(self, start=None, end=None):
+        """
+        Show per-parameter statistics of the loaded data between two times (default: all of it)
+        
+        While all of the data is in the window, the statistics gathered during
+        parsing are shown, with spread and quantiles; otherwise the window's
+        statistics come from the DatasetIndex.
+        """
+        if self.data_index is None:
+            return
+            
+        import pandas as pd
+        from core.query import format_window_stats
+        from core.rules import format_violations
+        from core.summary import format_summary
+        
+        self.summary_window = (start, end)
+        summary = f"Records: {len(self.data)}\n"
+        summary += f"Parameters: {', '.join(self.data.parameters)}\n"
+        if start is not None:
+            summary += f"Visible: {pd.Timestamp(start):%Y-%m-%d %H:%M:%S} to {pd.Timestamp(end):%Y-%m-%d %H:%M:%S}\n"
+            
+        first, last = self.data_summary.time_range() if self.data_summary is not None else (None, None)
+        if first is not None and (start is None or start <= first) and (end is None or end >= last):
+            summary += "\n".join(format_summary(stats) for stats in self.data_summary.stats())
+        else:
+            summary += "\n".join(format_window_stats(stats) for stats in self.data_index.summary(start, end))
+        if self.rule_results:
+            summary += "\n\nAlarm rules (whole file):\n"
+            summary += "\n".join(format_violations(result) for result in self.rule_results)
+        
+        self.summary_text.setPlainText(summary)
+        
     def handle_error(self, error_message):
         """Handle errors during file processing"""
-        self.progress_bar.setVisible(False)
+        if not self.is_current_load():
+            return
+            
+        self.show_progress(False)
         self.status_bar.showMessage(f"Error: {error_message}")
         
         QMessageBox.critical(self, "Error", f"An error occurred:\n\n{error_message}")
         
     def reset_graph(self):
         """Reset graph and clear data"""
+        self.cancel_loading()
+        self.stop_following()
         self.data = None
-        self.graph_widget.reset_graph()
+        self.data_index = None
+        self.data_summary = None
+        if self.graph_widget is not None:
+            self.graph_widget.reset_graph()
         self.summary_text.setPlainText("Load a log file to see data summary...")
         self.file_info_label.setText("No file loaded")
         self.status_bar.showMessage("Graph reset - Load a LINAC log file to begin analysis")
         
+    def closeEvent(self, event):
+        """Stop loads in progress before the window goes away"""
+        self.cancel_loading()
+        self.stop_following()
+        for thread in list(self.cancelled_threads):
+            thread.wait()
+        super().closeEvent(event)
+        
     def show_about(self):
         """Show about dialog"""
         QMessageBox.about(